@@ -1,7 +1,53 @@
+import sys
+import threading
+import plotly.io.json
+from _plotly_utils.utils import NotEncodable, PlotlyJSONEncoder
 from dash import Dash, html, page_container
 from dash.long_callback import DiskcacheLongCallbackManager
 import diskcache
 import dash_bootstrap_components as dbc
+from werkzeug.serving import is_running_from_reloader
+from upload_api import register_upload_routes
+from job_api import register_job_routes
+from progress_api import register_progress_routes
+from metrics_api import register_metrics_routes
+from job_worker import start_job_workers
+from dbutils import prewarm_imports
+from config import JOB_WORKERS, STARTUP_PREWARM
+
+def _wait_for_pandas_in_json_encoder() -> None:
+    """
+    Makes the JSON encoding of Dash responses wait for an import of pandas that is in progress.
+
+    pandas is imported on first use, by a callback or the prewarm thread. plotly looks
+    pandas up in sys.modules and fails on a half-imported module: with orjson once per
+    response, with the json module whenever a value needs its encode_as_pandas. Until
+    pandas is imported, responses are encoded with the json module, whose pandas lookup
+    waits; `import pandas` blocks on the module's import lock until the import in
+    progress has finished.
+    """
+    to_json_plotly = plotly.io.json.to_json_plotly
+    encode_as_pandas = PlotlyJSONEncoder.encode_as_pandas
+
+    def pandas_imported() -> bool:
+        if "pandas" not in sys.modules:
+            return False
+        import pandas  # noqa: F401
+        return True
+
+    def to_json_after_pandas(plotly_object, pretty=False, engine=None):
+        return to_json_plotly(plotly_object, pretty, engine if pandas_imported() else "json")
+
+    def encode_as_pandas_after_import(obj):
+        if not pandas_imported():
+            raise NotEncodable
+        return encode_as_pandas(obj)
+
+    # Dash imports to_json_plotly from plotly.io.json on every call
+    plotly.io.json.to_json_plotly = to_json_after_pandas
+    PlotlyJSONEncoder.encode_as_pandas = staticmethod(encode_as_pandas_after_import)
+
+_wait_for_pandas_in_json_encoder()
 
 # Initialize the cache in a directory called 'cache'
 cache = diskcache.Cache("./cache")
@@ -22,5 +68,24 @@ app.layout = dbc.Container([
     page_container
 ])
 
+# Resumable chunked uploads go straight to Flask, bypassing the callback payload
+register_upload_routes(app.server)
+
+# Stage-by-stage progress of uploads and append jobs
+register_progress_routes(app.server)
+
+# Append jobs are queued in SQLite and run by separate worker processes
+register_job_routes(app.server)
+
+# Prometheus metrics, liveness and readiness probes, and callback timings
+register_metrics_routes(app.server)
+
+# The first response does not wait for pandas, the Databricks SDK and the connector; they load in the background
+if STARTUP_PREWARM:
+    threading.Thread(target=prewarm_imports, name="prewarm-imports", daemon=True).start()
+
 if __name__ == "__main__":
+    # With the debug reloader only the serving child process starts workers
+    if is_running_from_reloader():
+        start_job_workers(JOB_WORKERS)
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+from validation_engine import base_type
+
+# Larger integers lose precision as JavaScript numbers and are sent as strings
+_MAX_SAFE_INTEGER = 2**53 - 1
+
+# Display kinds of Databricks type names, for payloads built from a table schema
+_TYPE_KINDS = {
+    "TINYINT": "integer", "SMALLINT": "integer", "INT": "integer", "INTEGER": "integer", "BIGINT": "integer",
+    "FLOAT": "float", "DOUBLE": "float", "REAL": "float",
+    "DECIMAL": "decimal", "DEC": "decimal", "NUMERIC": "decimal",
+    "BOOLEAN": "boolean",
+    "DATE": "date",
+    "TIMESTAMP": "timestamp", "TIMESTAMP_NTZ": "timestamp", "TIMESTAMP_LTZ": "timestamp",
+    "ARRAY": "json", "MAP": "json", "STRUCT": "json", "VARIANT": "json",
+}
+
+
+def _column_values(values: pa.ChunkedArray) -> Tuple[str, List[Any]]:
+    """
+    Returns the display kind of a column and its values in a JSON-ready form.
+
+    Conversions run as Arrow kernels on the whole column; formatting for display is left
+    to the browser, which receives timestamps as epoch milliseconds (UTC).
+    """
+    data_type = values.type
+
+    if pa.types.is_boolean(data_type):
+        return "boolean", values.to_pylist()
+    if pa.types.is_integer(data_type):
+        bounds = pc.min_max(values)
+        low, high = bounds["min"].as_py(), bounds["max"].as_py()
+        if low is not None and (low < -_MAX_SAFE_INTEGER or high > _MAX_SAFE_INTEGER):
+            return "integer", pc.cast(values, pa.string()).to_pylist()
+        return "integer", values.to_pylist()
+    if pa.types.is_floating(data_type):
+        # NaN and infinities are not valid JSON
+        finite = pc.is_finite(values)
+        return "float", pc.if_else(finite, values, pa.scalar(None, data_type)).to_pylist()
+    if pa.types.is_decimal(data_type):
+        # Exact digits matter more than arithmetic in a preview
+        return "decimal", pc.cast(values, pa.string()).to_pylist()
+    if pa.types.is_timestamp(data_type):
+        millis = pc.cast(values, pa.timestamp("ms", tz=data_type.tz), safe=False)
+        return "timestamp", pc.cast(millis, pa.int64()).to_pylist()
+    if pa.types.is_date(data_type):
+        return "date", pc.cast(values, pa.string()).to_pylist()
+    if pa.types.is_string(data_type) or pa.types.is_large_string(data_type) or pa.types.is_null(data_type):
+        return "string", values.to_pylist()
+    if pa.types.is_nested(data_type):
+        return "json", values.to_pylist()
+
+    try:
+        return "string", pc.cast(values, pa.string()).to_pylist()
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+        return "string", [None if value is None else str(value) for value in values.to_pylist()]
+
+
+def columnar_payload(table: pa.Table, exclude: Tuple[str, ...] = ("_rescued_data",)) -> Dict[str, Any]:
+    """
+    Converts an Arrow table into a compact column-oriented payload for the preview grids.
+
+    Returns:
+        Dict: {"fields": [{"name", "kind"}, ...], "columns": [[values], ...], "num_rows": int};
+            the browser transposes the columns into grid rows.
+    """
+    fields = []
+    columns = []
+    for name, values in zip(table.column_names, table.columns):
+        if name in exclude:
+            continue
+        kind, column = _column_values(values)
+        fields.append({"name": name, "kind": kind})
+        columns.append(column)
+    return {"fields": fields, "columns": columns, "num_rows": table.num_rows}
+
+
+def schema_payload(columns: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Returns a payload without rows for a table schema, as returned by table_columns.
+
+    It sets the grid's columns without reading the table; the rows come from the grid's
+    own block requests.
+    """
+    return {
+        "fields": [{"name": name, "kind": _TYPE_KINDS.get(base_type(data_type), "string")} for name, data_type in columns.items()],
+        "columns": [[] for _ in columns],
+        "num_rows": 0,
+    }
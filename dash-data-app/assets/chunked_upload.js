@@ -0,0 +1,163 @@
+// Resumable chunked upload client for the /api/uploads endpoints.
+//
+// Renders a file input inside the "chunked-upload" container (Dash has no file
+// input component), sends the selected file as raw binary chunks in parallel and
+// remembers the upload id in localStorage so that selecting the same file again
+// resumes where it stopped. When the server has
+// PUT the assembled file to the volume, the result is written to the
+// "chunked-upload-result" dcc.Store.
+(function () {
+    const MAX_RETRIES = 3;
+
+    function resumeKey(file) {
+        return `chunked-upload:${file.name}:${file.size}:${file.lastModified}`;
+    }
+
+    function setStatus(text, percent) {
+        const status = document.getElementById("chunked-upload-status");
+        if (status) {
+            status.textContent = text;
+        }
+        const bar = document.getElementById("chunked-upload-bar");
+        if (bar && percent !== undefined) {
+            bar.style.width = `${percent}%`;
+            bar.setAttribute("aria-valuenow", percent);
+        }
+    }
+
+    async function request(method, url, body, headers) {
+        const response = await fetch(url, {method, body, headers});
+        const payload = response.status === 204 ? {} : await response.json();
+        if (!response.ok) {
+            const error = new Error(payload.error || `HTTP ${response.status}`);
+            error.status = response.status;
+            throw error;
+        }
+        return payload;
+    }
+
+    async function startOrResume(file) {
+        const uploadId = localStorage.getItem(resumeKey(file));
+        if (uploadId) {
+            try {
+                return await request("GET", `/api/uploads/${uploadId}`);
+            } catch (error) {
+                if (error.status !== 404) {
+                    throw error;
+                }
+                localStorage.removeItem(resumeKey(file));
+            }
+        }
+        const upload = await request(
+            "POST", "/api/uploads",
+            JSON.stringify({filename: file.name, size: file.size}),
+            {"Content-Type": "application/json"}
+        );
+        localStorage.setItem(resumeKey(file), upload.upload_id);
+        return upload;
+    }
+
+    async function sendChunk(file, upload, index) {
+        const offset = index * upload.chunk_size;
+        const blob = file.slice(offset, Math.min(offset + upload.chunk_size, file.size));
+        for (let attempt = 1; ; attempt++) {
+            try {
+                return await request(
+                    "PUT", `/api/uploads/${upload.upload_id}/chunks?offset=${offset}`,
+                    blob, {"Content-Type": "application/octet-stream"}
+                );
+            } catch (error) {
+                if (attempt >= MAX_RETRIES || (error.status && error.status < 500)) {
+                    throw error;
+                }
+                await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt));
+            }
+        }
+    }
+
+    // The volume transfer runs on the server; its progress is estimated there from earlier transfers
+    async function reportTransfer(file, uploadId) {
+        try {
+            const progress = await request("GET", `/api/progress/${uploadId}`);
+            const stage = progress.stages[0];
+            if (stage.state !== "running" || stage.percent === null) {
+                return;
+            }
+            const left = stage.eta === null ? "" : ` (about ${Math.round(stage.eta)}s left)`;
+            setStatus(`Transferring ${file.name} to the volume: ${Math.round(stage.percent)}%${left}`, Math.round(stage.percent));
+        } catch (error) {
+            // Progress is informational only
+        }
+    }
+
+    async function uploadFile(file, parallelism) {
+        const upload = await startOrResume(file);
+        const received = new Set(upload.received);
+        const pending = [];
+        for (let index = 0; index < upload.chunk_count; index++) {
+            if (!received.has(index)) {
+                pending.push(index);
+            }
+        }
+
+        let done = received.size;
+        const report = () => {
+            const percent = Math.round((100 * done) / upload.chunk_count);
+            setStatus(`Uploading ${file.name}: ${percent}%`, percent);
+        };
+        report();
+
+        // A fixed number of workers pull chunk indices from the shared queue
+        const workers = Array.from({length: Math.max(1, parallelism)}, async () => {
+            while (pending.length) {
+                await sendChunk(file, upload, pending.shift());
+                done++;
+                report();
+            }
+        });
+        await Promise.all(workers);
+
+        setStatus(`Transferring ${file.name} to the volume...`, 0);
+        const poll = setInterval(() => reportTransfer(file, upload.upload_id), 1000);
+        try {
+            const result = await request("POST", `/api/uploads/${upload.upload_id}/complete`);
+            localStorage.removeItem(resumeKey(file));
+            return result;
+        } finally {
+            clearInterval(poll);
+        }
+    }
+
+    document.addEventListener("change", async (event) => {
+        const input = event.target;
+        if (!input || input.id !== "chunked-upload-input" || !input.files.length) {
+            return;
+        }
+        const file = input.files[0];
+        const container = document.getElementById("chunked-upload");
+        const parallelism = parseInt((container && container.dataset.parallelism) || "4", 10);
+        try {
+            const result = await uploadFile(file, parallelism);
+            setStatus(`File uploaded successfully: ${result.filename}`, 100);
+            window.dash_clientside.set_props("chunked-upload-result", {data: result});
+        } catch (error) {
+            setStatus(`Upload interrupted: ${error.message}. Select the same file again to resume.`);
+        } finally {
+            input.value = "";
+        }
+    });
+
+    // Pages are rendered by Dash after load, so watch for the container to appear
+    function ensureInput() {
+        const container = document.getElementById("chunked-upload");
+        if (container && !document.getElementById("chunked-upload-input")) {
+            const input = document.createElement("input");
+            input.type = "file";
+            input.id = "chunked-upload-input";
+            input.className = "form-control";
+            input.accept = container.dataset.accept || "";
+            container.appendChild(input);
+        }
+    }
+    new MutationObserver(ensureInput).observe(document.documentElement, {childList: true, subtree: true});
+})();
@@ -0,0 +1,91 @@
+// Rendering of the column-oriented preview payloads (see arrow_payload.py).
+//
+// The server sends {fields: [{name, kind}], columns: [[...]], num_rows} straight from
+// Arrow without stringifying cells. Here the columns are transposed into AG Grid rows
+// for the infinite row model and each column gets a formatter and filter for its
+// kind, so display formatting happens in the browser.
+(function () {
+    const NUMERIC_KINDS = new Set(["integer", "float", "decimal"]);
+
+    function pad(value, width) {
+        return String(value).padStart(width, "0");
+    }
+
+    function formatTimestamp(millis) {
+        // Epoch milliseconds in UTC, shown the way the warehouse prints timestamps
+        const date = new Date(millis);
+        const text = `${date.getUTCFullYear()}-${pad(date.getUTCMonth() + 1, 2)}-${pad(date.getUTCDate(), 2)} ` +
+            `${pad(date.getUTCHours(), 2)}:${pad(date.getUTCMinutes(), 2)}:${pad(date.getUTCSeconds(), 2)}`;
+        const fraction = date.getUTCMilliseconds();
+        return fraction ? `${text}.${pad(fraction, 3)}` : text;
+    }
+
+    function formatPreviewValue(value, kind) {
+        if (value === null || value === undefined) {
+            return "";
+        }
+        switch (kind) {
+            case "integer":
+                // As in the file: no grouping separators in IDs, years or codes
+                return String(value);
+            case "float":
+                return value.toLocaleString(undefined, {maximumFractionDigits: 15});
+            case "timestamp":
+                return formatTimestamp(value);
+            case "boolean":
+                return value ? "true" : "false";
+            case "json":
+                return JSON.stringify(value);
+            default:
+                return String(value);
+        }
+    }
+
+    window.dashAgGridFunctions = Object.assign(window.dashAgGridFunctions || {}, {
+        formatPreviewValue: formatPreviewValue
+    });
+
+    function transpose(payload) {
+        const rows = new Array(payload.num_rows);
+        for (let row = 0; row < payload.num_rows; row++) {
+            const record = {};
+            for (let col = 0; col < payload.fields.length; col++) {
+                record[`c${col}`] = payload.columns[col][row];
+            }
+            rows[row] = record;
+        }
+        return rows;
+    }
+
+    function columnDef(field, col) {
+        const numeric = NUMERIC_KINDS.has(field.kind);
+        // Positional field ids avoid problems with dots or spaces in column names
+        return {
+            field: `c${col}`,
+            headerName: field.name,
+            headerTooltip: `${field.name} (${field.kind})`,
+            type: numeric ? "rightAligned" : undefined,
+            filter: numeric ? "agNumberColumnFilter" : "agTextColumnFilter",
+            valueFormatter: {"function": `formatPreviewValue(params.value, "${field.kind}")`}
+        };
+    }
+
+    window.dash_clientside = window.dash_clientside || {};
+    window.dash_clientside.preview_grid = {
+        // Sets the columns from the head of a new file or table and drops cached blocks,
+        // so the grid requests its rows again
+        render: function (payload, gridId) {
+            if (window.dash_ag_grid) {
+                window.dash_ag_grid.getApiAsync(gridId).then((api) => api.purgeInfiniteCache());
+            }
+            return payload && payload.fields ? payload.fields.map(columnDef) : [];
+        },
+        // Answers the grid's getRowsRequest with a block of rows
+        page: function (payload) {
+            if (!payload || !payload.fields) {
+                return window.dash_clientside.no_update;
+            }
+            return {rowData: transpose(payload), rowCount: payload.row_count};
+        }
+    };
+})();
@@ -0,0 +1,22 @@
+// Starts following the progress of a dcc.Upload before its contents reach the server.
+//
+// A new operation id is written to the "<prefix>-operation" store, which triggers the
+// server callback that processes the upload under that id, and the progress poll
+// interval is enabled so the stages can be shown while that callback runs.
+(function () {
+    function operationId() {
+        const bytes = new Uint8Array(16);
+        window.crypto.getRandomValues(bytes);
+        return Array.from(bytes, (b) => b.toString(16).padStart(2, "0")).join("");
+    }
+
+    window.dash_clientside = window.dash_clientside || {};
+    window.dash_clientside.progress = {
+        begin: function (contents) {
+            if (!contents) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            return [operationId(), false];
+        }
+    };
+})();
@@ -0,0 +1,257 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+from dbutils import describe_table, get_not_null_columns, stage_upload
+from job_queue import FINISHED_STATES, SUCCEEDED
+from job_worker import get_job_queue, submit_append_job
+from staging import UploadStats, decode_to_file, staged_file_path
+from compressed_files import INVALID_FILE_MESSAGE, is_csv_file
+from tracing import current_span, traced
+from validation_engine import table_columns, validate_csv_file
+from config import (
+    DATABRICKS_VOLUME_PATH,
+    LOCAL_STAGING_DIR,
+    MAX_UPLOAD_SIZE_MB,
+    JOB_POLL_INTERVAL,
+    SQL_POOL_MAX_SIZE,
+    UPLOAD_DECODE_CHUNK_SIZE,
+    VALIDATION_BLOCK_SIZE
+)
+
+
+@dataclass
+class BatchFile:
+    """One file of a batch append and its progress."""
+    name: str
+    local_path: str
+    size: int
+    sha256: str
+    line_count: int
+    batch_id: str = ""
+    status: str = "queued"
+    rows: int = 0
+    seconds: float = 0.0
+    message: str = ""
+    job_id: str = ""
+
+
+def decode_batch_file(encoded_content: str, file_name: str, batch_dir: str) -> BatchFile:
+    """
+    Decodes one file of a multi-file dcc.Upload into the batch directory.
+
+    The directory name is the batch id, which prefixes the file's staged and volume names.
+
+    Raises:
+        ValueError: If the file is not a CSV file, not valid base64 or too large.
+    """
+    file_name = os.path.basename(file_name)
+    if not is_csv_file(file_name):
+        raise ValueError(INVALID_FILE_MESSAGE)
+
+    os.makedirs(batch_dir, exist_ok=True)
+    local_path = os.path.join(batch_dir, file_name)
+    stats = decode_to_file(
+        encoded_content,
+        local_path,
+        max_size=MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+        chunk_size=UPLOAD_DECODE_CHUNK_SIZE
+    )
+    return BatchFile(
+        name=file_name,
+        local_path=local_path,
+        size=stats.size,
+        sha256=stats.sha256,
+        line_count=stats.line_count,
+        batch_id=os.path.basename(os.path.normpath(batch_dir))
+    )
+
+
+@traced()
+def _append_file(
+    item: BatchFile,
+    catalog: str,
+    schema: str,
+    table: str,
+    expected_columns: Dict[str, str],
+    not_null_columns: Set[str],
+    csv_settings: Dict[str, Any],
+    update: Callable[[BatchFile], None],
+) -> None:
+    """
+    Runs PUT and full-file validation for one file and queues its append job, reporting each step through `update`.
+
+    The INSERT runs as an append job in a job worker, with its retries and heartbeats;
+    this thread waits for the job so the batch can report it.
+    """
+    started = time.monotonic()
+    current_span().set_attributes(**{"file.name": item.name, "file.bytes": item.size})
+    try:
+        item.status = "uploading"
+        update(item)
+        file_path = stage_upload(
+            item.local_path,
+            DATABRICKS_VOLUME_PATH,
+            item.name,
+            UploadStats(size=item.size, sha256=item.sha256, line_count=item.line_count),
+            prefix=item.batch_id
+        )
+        # Validation and later previews read the staged copy instead of the volume
+        local_path = staged_file_path(LOCAL_STAGING_DIR, file_path.split("/")[-1])
+
+        item.status = "validating"
+        update(item)
+        report = validate_csv_file(
+            local_path,
+            expected_columns,
+            not_null_columns,
+            block_size=VALIDATION_BLOCK_SIZE,
+            **csv_settings
+        )
+        if not report.ok:
+            item.status = "invalid"
+            item.message = _report_summary(report)
+            return
+
+        item.job_id = submit_append_job(catalog, schema, table, file_path, csv_settings)
+        item.status = "inserting"
+        item.message = f"Append job {item.job_id}"
+        update(item)
+        job = get_job_queue().get(item.job_id)
+        while job is not None and job["state"] not in FINISHED_STATES:
+            time.sleep(JOB_POLL_INTERVAL)
+            job = get_job_queue().get(item.job_id)
+        if job is None:
+            raise RuntimeError(f"Append job {item.job_id} was removed from the queue")
+        if job["state"] != SUCCEEDED:
+            item.status = "failed"
+            item.message = job["error"] or f"The append job was {job['state']}."
+            return
+        item.rows = job["result"]["rows"]
+        item.status = "done"
+        item.message = ""
+
+    except Exception as e:
+        print(f"Error in batch append of {item.name}: {str(e)}")
+        item.status = "failed"
+        item.message = str(e)
+
+    finally:
+        item.seconds = round(time.monotonic() - started, 1)
+        update(item)
+
+
+def _report_summary(report) -> str:
+    problems = []
+    if report.missing_columns:
+        problems.append(f"missing columns: {', '.join(report.missing_columns)}")
+    if report.extra_columns:
+        problems.append(f"extra columns: {', '.join(report.extra_columns)}")
+    if report.rescued_rows:
+        problems.append(f"{report.rescued_rows:,} unparseable rows")
+    for column in report.columns.values():
+        if column.invalid_count:
+            problems.append(f"{column.name}: {column.invalid_count:,} invalid values")
+        if column.not_null_violations:
+            problems.append(f"{column.name}: {column.not_null_violations:,} empty values")
+    return "; ".join(problems)
+
+
+@traced()
+def run_batch(
+    files: List[Dict[str, Any]],
+    catalog: str,
+    schema: str,
+    table: str,
+    csv_settings: Dict[str, Any],
+    concurrency: int,
+    on_progress: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    progress_interval: float = 1.0,
+) -> Dict[str, Any]:
+    """
+    Appends a batch of decoded files to one table with a bounded pool of workers.
+
+    Each worker runs PUT and validation for one file at a time and then waits for the
+    file's append job, so at most `concurrency` files are in flight. The INSERTs run in
+    the job workers and survive a restart of this process. The table schema is read once
+    for the batch.
+
+    Each file holds a pooled connection for its whole PUT, so `concurrency` is capped at
+    SQL_POOL_MAX_SIZE; more workers would fail with PoolTimeout whenever statements
+    outlast SQL_POOL_ACQUIRE_TIMEOUT.
+
+    Args:
+        files (List[Dict]): BatchFile dicts as returned by decode_batch_file.
+        catalog (str): Target catalog.
+        schema (str): Target schema.
+        table (str): Target table.
+        csv_settings (Dict): delimiter, quote_char, header and encoding.
+        concurrency (int): Maximum number of files processed at the same time, at most SQL_POOL_MAX_SIZE.
+        on_progress (Optional[Callable]): Called with the current file dicts at most every
+            `progress_interval` seconds and once at the end.
+
+    Returns:
+        Dict: Aggregated summary with counts, rows, bytes, elapsed seconds and throughput.
+    """
+    items = [BatchFile(**f) for f in files]
+    concurrency = max(1, min(concurrency, SQL_POOL_MAX_SIZE))
+    expected_columns = table_columns(describe_table(catalog, schema, table))
+    not_null_columns = get_not_null_columns(catalog, schema, table)
+
+    # Workers only assign attributes of their own item, so snapshots need no lock
+    changed = threading.Event()
+
+    def update(_item):
+        changed.set()
+
+    def snapshot():
+        return [asdict(item) for item in items]
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-append") as pool:
+        # Each file runs in a copy of this context, so its spans belong to the batch's trace
+        futures = [
+            pool.submit(contextvars.copy_context().run, _append_file, item, catalog, schema, table, expected_columns, not_null_columns, csv_settings, update)
+            for item in items
+        ]
+        # Progress is reported from this thread only, whatever the workers do
+        while not all(future.done() for future in futures):
+            if changed.wait(progress_interval):
+                changed.clear()
+                if on_progress is not None:
+                    on_progress(snapshot())
+    elapsed = time.monotonic() - started
+
+    # Files that never reached the staging directory are not needed anymore
+    for item in items:
+        if os.path.exists(item.local_path):
+            os.remove(item.local_path)
+    for batch_dir in {os.path.dirname(item.local_path) for item in items}:
+        try:
+            os.rmdir(batch_dir)
+        except OSError:
+            pass
+
+    results = snapshot()
+    if on_progress is not None:
+        on_progress(results)
+
+    done = [item for item in results if item["status"] == "done"]
+    total_bytes = sum(item["size"] for item in done)
+    total_rows = sum(item["rows"] for item in done)
+    return {
+        "files": len(results),
+        "succeeded": len(done),
+        "invalid": sum(item["status"] == "invalid" for item in results),
+        "failed": sum(item["status"] == "failed" for item in results),
+        "rows": total_rows,
+        "bytes": total_bytes,
+        "seconds": round(elapsed, 1),
+        "files_per_minute": round(len(results) / elapsed * 60, 1) if elapsed else 0.0,
+        "rows_per_second": round(total_rows / elapsed) if elapsed else 0,
+        "mb_per_second": round(total_bytes / elapsed / 1024 / 1024, 2) if elapsed else 0.0,
+        "concurrency": concurrency,
+    }
@@ -0,0 +1,179 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class CatalogSnapshot:
+    """
+    Schema and table listing of one catalog as loaded from its information_schema.
+    """
+
+    def __init__(self, catalog: str):
+        self.catalog = catalog
+        # schema name -> table name -> table type
+        self.schemas: Dict[str, Dict[str, str]] = {}
+        self.watermark_micros: Optional[int] = None  # newest last_altered seen, in epoch microseconds
+        self.loaded_at = 0.0
+        self.refreshed_at = 0.0
+
+    def merge(self, df: "pd.DataFrame") -> None:
+        """
+        Merges rows of (schema_name, table_name, table_type, last_altered) into the snapshot.
+
+        Readers list `schemas` without a lock, so published dicts are never changed: the
+        merge copies the schemas it touches and swaps the new dict in with one assignment.
+        """
+        schemas = dict(self.schemas)
+        copied = set()
+        for row in df.itertuples(index=False):
+            if row.schema_name not in copied:
+                schemas[row.schema_name] = dict(schemas.get(row.schema_name, {}))
+                copied.add(row.schema_name)
+            if isinstance(row.table_name, str):
+                schemas[row.schema_name][row.table_name] = row.table_type
+        self.schemas = schemas
+
+        if "last_altered" in df.columns and not df.empty:
+            import pandas as pd
+            newest = pd.to_datetime(df["last_altered"], utc=True).max()
+            if not pd.isna(newest):
+                micros = newest.value // 1000
+                if self.watermark_micros is None or micros > self.watermark_micros:
+                    self.watermark_micros = micros
+
+
+class CatalogTreeLoader:
+    """
+    Serves schema and table listings from per-catalog snapshots.
+
+    A snapshot is loaded with a single information_schema query instead of one
+    SHOW statement per navigation step. Snapshots older than `refresh_interval`
+    seconds are refreshed incrementally by fetching only objects whose
+    `last_altered` is newer than the snapshot, and fully reloaded after
+    `full_reload_interval` seconds so that dropped objects disappear.
+
+    Args:
+        run_query (Callable): Executes a SQL statement and returns a DataFrame.
+        refresh_interval (float): Seconds after which a snapshot is refreshed incrementally.
+        full_reload_interval (float): Seconds after which a snapshot is reloaded from scratch.
+    """
+
+    def __init__(
+        self,
+        run_query: Callable[[str], "pd.DataFrame"],
+        refresh_interval: float = 60.0,
+        full_reload_interval: float = 900.0,
+    ):
+        self._run_query = run_query
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self._snapshots: Dict[str, CatalogSnapshot] = {}
+        self._unsupported: Dict[str, float] = {}  # catalogs without information_schema
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def schemas(self, catalog: str) -> Optional[List[str]]:
+        """
+        Returns the sorted schema names of a catalog, or None if the catalog has no information_schema.
+        """
+        snapshot = self.get(catalog)
+        if snapshot is None:
+            return None
+        return sorted(snapshot.schemas)
+
+    def tables(self, catalog: str, schema: str) -> Optional[List[str]]:
+        """
+        Returns the sorted table names of a schema, or None if the catalog has no information_schema.
+        """
+        snapshot = self.get(catalog)
+        if snapshot is None:
+            return None
+        return sorted(snapshot.schemas.get(schema, {}))
+
+    def get(self, catalog: str) -> Optional[CatalogSnapshot]:
+        """
+        Returns an up-to-date snapshot of the catalog, loading or refreshing it as needed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            failed_at = self._unsupported.get(catalog)
+            if failed_at is not None and now - failed_at < self.full_reload_interval:
+                return None
+            snapshot = self._snapshots.get(catalog)
+            if snapshot is not None and now - snapshot.refreshed_at < self.refresh_interval:
+                return snapshot
+            catalog_lock = self._locks.setdefault(catalog, threading.Lock())
+
+        with catalog_lock:
+            # Another thread may have refreshed the snapshot while we were waiting
+            with self._lock:
+                snapshot = self._snapshots.get(catalog)
+            now = time.monotonic()
+            if snapshot is not None and now - snapshot.refreshed_at < self.refresh_interval:
+                return snapshot
+
+            try:
+                if snapshot is None or now - snapshot.loaded_at >= self.full_reload_interval:
+                    snapshot = self._load(catalog)
+                else:
+                    self._refresh(snapshot)
+            except Exception as e:
+                print(f"Error loading catalog tree for {catalog}: {str(e)}")
+                with self._lock:
+                    self._unsupported[catalog] = time.monotonic()
+                    self._snapshots.pop(catalog, None)
+                return None
+
+            with self._lock:
+                self._snapshots[catalog] = snapshot
+                self._unsupported.pop(catalog, None)
+            return snapshot
+
+    def invalidate(self, catalog: Optional[str] = None) -> None:
+        """
+        Drops the snapshot of one catalog, or of all catalogs when no catalog is given.
+        """
+        with self._lock:
+            if catalog is None:
+                self._snapshots.clear()
+                self._unsupported.clear()
+            else:
+                self._snapshots.pop(catalog, None)
+                self._unsupported.pop(catalog, None)
+
+    def _load(self, catalog: str) -> CatalogSnapshot:
+        query = f"""
+            SELECT s.schema_name, t.table_name, t.table_type,
+                   greatest(s.last_altered, t.last_altered) AS last_altered
+            FROM `{catalog}`.information_schema.schemata s
+            LEFT JOIN `{catalog}`.information_schema.tables t
+              ON t.table_schema = s.schema_name
+        """
+        snapshot = CatalogSnapshot(catalog)
+        snapshot.merge(self._run_query(query))
+        snapshot.loaded_at = snapshot.refreshed_at = time.monotonic()
+        return snapshot
+
+    def _refresh(self, snapshot: CatalogSnapshot) -> None:
+        if snapshot.watermark_micros is None:
+            # Nothing to compare against (empty catalog); fetch everything again
+            fresh = self._load(snapshot.catalog)
+            snapshot.schemas = fresh.schemas
+            snapshot.watermark_micros = fresh.watermark_micros
+            snapshot.refreshed_at = fresh.refreshed_at
+            return
+
+        query = f"""
+            SELECT schema_name, NULL AS table_name, NULL AS table_type, last_altered
+            FROM `{snapshot.catalog}`.information_schema.schemata
+            WHERE unix_micros(last_altered) >= {snapshot.watermark_micros}
+            UNION ALL
+            SELECT table_schema AS schema_name, table_name, table_type, last_altered
+            FROM `{snapshot.catalog}`.information_schema.tables
+            WHERE unix_micros(last_altered) >= {snapshot.watermark_micros}
+        """
+        snapshot.merge(self._run_query(query))
+        snapshot.refreshed_at = time.monotonic()
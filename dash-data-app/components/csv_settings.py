@@ -1,6 +1,14 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc
 
+ENCODING_OPTIONS = [
+    {"label": "UTF-8", "value": "utf-8"},
+    {"label": "ASCII", "value": "ascii"},
+    {"label": "ISO-8859-1", "value": "iso-8859-1"},
+    {"label": "Windows-1252", "value": "windows-1252"},
+    {"label": "UTF-16", "value": "utf-16"}
+]
+
 def get_csv_settings_modal():
     return dbc.Modal([
         dbc.ModalHeader("CSV Import Settings"),
@@ -51,12 +59,7 @@ def get_csv_settings_modal():
             dbc.Label("File Encoding"),
             dcc.Dropdown(
                 id="file-encoding",
-                options=[
-                    {"label": "UTF-8", "value": "utf-8"},
-                    {"label": "ASCII", "value": "ascii"},
-                    {"label": "ISO-8859-1", "value": "iso-8859-1"},
-                    {"label": "UTF-16", "value": "utf-16"}
-                ],
+                options=ENCODING_OPTIONS,
                 value="utf-8",
                 clearable=False,
                 className="mb-3"
@@ -0,0 +1,49 @@
+import dash_ag_grid as dag
+from dash import html, dcc, clientside_callback, ClientsideFunction, Input, Output, State
+from config import PAGED_PREVIEW_BLOCK_ROWS
+
+def get_preview_grid(grid_id: str):
+    """
+    Returns an infinite-scroll preview grid fed by columnar payloads (see arrow_payload.columnar_payload).
+
+    Callbacks write the head of the data to the "<grid_id>-payload" store, which sets the
+    columns, and answer the grid's getRowsRequest by writing blocks of rows to the
+    "<grid_id>-page" store. The browser transposes payloads into rows and formats values
+    by column type (assets/preview_grid.js).
+    """
+    return html.Div([
+        dcc.Store(id=f"{grid_id}-payload"),
+        dcc.Store(id=f"{grid_id}-page"),
+        dag.AgGrid(
+            id=grid_id,
+            columnDefs=[],
+            rowModelType="infinite",
+            defaultColDef={"resizable": True, "sortable": True, "minWidth": 100},
+            dashGridOptions={
+                "cacheBlockSize": PAGED_PREVIEW_BLOCK_ROWS,
+                "maxBlocksInCache": 20,
+                # Responses are matched to the latest request, so fetch one block at a time
+                "maxConcurrentDatasourceRequests": 1,
+                "tooltipShowDelay": 300
+            },
+            columnSize="autoSize",
+            className="ag-theme-alpine",
+            style={"width": "100%", "height": "400px"}
+        )
+    ])
+
+def register_preview_grid_callbacks(grid_id: str):
+    """
+    Registers the clientside callbacks that render the payload stores into the grid.
+    """
+    clientside_callback(
+        ClientsideFunction(namespace="preview_grid", function_name="render"),
+        Output(grid_id, "columnDefs"),
+        Input(f"{grid_id}-payload", "data"),
+        State(grid_id, "id")
+    )
+    clientside_callback(
+        ClientsideFunction(namespace="preview_grid", function_name="page"),
+        Output(grid_id, "getRowsResponse"),
+        Input(f"{grid_id}-page", "data")
+    )
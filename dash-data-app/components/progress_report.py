@@ -0,0 +1,52 @@
+import dash_bootstrap_components as dbc
+from dash import html
+
+def _format_amount(value, unit) -> str:
+    if unit == "bytes":
+        return f"{value / 1024 / 1024:,.1f} MB"
+    return f"{value:,} {unit}"
+
+def _format_seconds(seconds) -> str:
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    return f"{seconds // 60}m {seconds % 60:02d}s"
+
+def _stage_text(stage) -> str:
+    parts = []
+    if stage["done"] is not None and stage["total"]:
+        parts.append(f"{_format_amount(stage['done'], stage['unit'])} of {_format_amount(stage['total'], stage['unit'])}")
+    elif stage["total"]:
+        parts.append(_format_amount(stage["total"], stage["unit"]))
+    if stage["rate"] and stage["unit"] == "bytes" and stage["state"] != "pending":
+        parts.append(f"{stage['rate'] / 1024 / 1024:,.1f} MB/s" + (" expected" if stage["estimated"] else ""))
+    if stage["state"] == "running" and stage["eta"] is not None:
+        parts.append(("about " if stage["estimated"] else "") + f"{_format_seconds(stage['eta'])} left")
+    elif stage["state"] == "done" and stage["elapsed"] is not None:
+        parts.append(f"took {_format_seconds(stage['elapsed'])}")
+    if stage["detail"]:
+        parts.append(stage["detail"])
+    return " · ".join(parts)
+
+def get_progress_report(progress) -> html.Div:
+    """Renders a progress.read_progress snapshot as one bar per stage with rate and remaining time"""
+    rows = []
+    for stage in progress["stages"]:
+        color = {"done": "success", "failed": "danger", "skipped": "secondary"}.get(stage["state"], "primary")
+        percent = stage["percent"] if stage["percent"] is not None else (100 if stage["state"] in ("running", "skipped") else 0)
+        rows.append(html.Div([
+            html.Div(stage["label"], className="small fw-bold"),
+            dbc.Progress(
+                value=percent,
+                color=color,
+                # Stages without measured progress show an animated bar
+                striped=stage["state"] == "running" and (stage["percent"] is None or stage["estimated"]),
+                animated=stage["state"] == "running" and (stage["percent"] is None or stage["estimated"]),
+                style={"height": "8px"}
+            ),
+            html.Div(_stage_text(stage), className="text-muted small")
+        ], className="mb-2"))
+
+    if progress["eta"] and progress["current"]:
+        rows.append(html.Div(f"About {_format_seconds(progress['eta'])} remaining", className="small"))
+    return html.Div(rows, className="text-start")
@@ -0,0 +1,49 @@
+from dash import html
+
+def get_validation_report(report) -> html.Div:
+    """Renders a ValidationReport as a list of issues, or a success message"""
+    issues = []
+
+    if report.missing_columns:
+        issues.append(f"Missing columns in file: {', '.join(report.missing_columns)}")
+    if report.extra_columns:
+        issues.append(f"Extra columns in file: {', '.join(report.extra_columns)}")
+    if report.rescued_rows:
+        issues.append(f"{report.rescued_rows:,} rows could not be parsed with the current CSV settings")
+
+    for column in report.columns.values():
+        if column.invalid_count:
+            samples = ", ".join(repr(value) for value in column.invalid_samples)
+            issues.append(
+                f"Column '{column.name}': {column.invalid_count:,} values are not valid "
+                f"{column.expected_type.upper()}" + (f" (e.g. {samples})" if samples else "")
+            )
+        if column.not_null_violations:
+            issues.append(f"Column '{column.name}': {column.not_null_violations:,} empty values in a NOT NULL column")
+
+    scope = {"local": "whole file", "warehouse": "whole file, in the warehouse"}.get(report.mode, report.mode)
+    summary = html.Div(
+        f"Checked {report.rows:,} rows ({scope})",
+        className="text-muted small mb-2"
+    )
+
+    if issues:
+        return html.Div([
+            html.H6("Validation Results:", className="mt-3 mb-3"),
+            summary,
+            *[
+                html.Div([
+                    html.I(className="fas fa-times-circle me-2"),
+                    issue
+                ], className="text-danger mb-2")
+                for issue in issues
+            ]
+        ])
+
+    return html.Div([
+        summary,
+        html.Div([
+            html.I(className="fas fa-check-circle me-2"),
+            "Validation successful!"
+        ], className="text-success")
+    ])
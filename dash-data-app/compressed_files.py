@@ -0,0 +1,100 @@
+import gzip
+import os
+import shutil
+import zipfile
+from typing import Optional, Tuple
+import pyarrow as pa
+
+# Upload file types; gzip and zstd files are read by read_files as they are
+CSV_SUFFIXES = (".csv", ".csv.gz", ".csv.zst", ".zip")
+# For the browser's file picker, which only compares the last extension
+UPLOAD_ACCEPT = ".csv,.gz,.zst,.zip"
+INVALID_FILE_MESSAGE = "Invalid file format. Please upload a CSV file (.csv, .csv.gz, .csv.zst or .zip)."
+
+_CODECS = {".gz": "gzip", ".zst": "zstd"}
+
+
+def is_csv_file(file_name: str) -> bool:
+    """
+    Returns True for the file names accepted as uploads.
+    """
+    return file_name.lower().endswith(CSV_SUFFIXES)
+
+
+def compression_of(file_name: str) -> Optional[str]:
+    """
+    Returns "gzip", "zstd" or "zip" for compressed files, and None for plain CSV files.
+    """
+    name = file_name.lower()
+    if name.endswith(".zip"):
+        return "zip"
+    return _CODECS.get(os.path.splitext(name)[1])
+
+
+def csv_stem(file_name: str) -> str:
+    """
+    Returns a file name without its CSV and compression extensions.
+    """
+    name = os.path.basename(file_name)
+    for suffix in sorted(CSV_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return os.path.splitext(name)[0]
+
+
+def open_decompressed(local_path: str, file_name: Optional[str] = None) -> pa.NativeFile:
+    """
+    Opens a gzip, zstd or plain file as a stream of its decompressed bytes.
+
+    Args:
+        file_name (Optional[str]): Name that determines the compression, if the local path has no extension.
+    """
+    codec = compression_of(file_name or local_path)
+    if codec == "zip":
+        raise ValueError("ZIP files are repacked with repack_zip before they are read")
+    return pa.input_stream(local_path, compression=codec)
+
+
+def count_lines(local_path: str, file_name: Optional[str] = None, chunk_size: int = 1024 * 1024) -> int:
+    """
+    Counts the lines of a file's decompressed content in one streaming pass.
+    """
+    newlines = 0
+    last_byte = b""
+    with open_decompressed(local_path, file_name) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            newlines += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+    # A final line without a trailing newline still counts
+    return newlines + (1 if last_byte and last_byte != b"\n" else 0)
+
+
+def repack_zip(local_path: str, file_name: str, compresslevel: int = 1) -> Tuple[str, str]:
+    """
+    Streams the single CSV file of a ZIP archive into a gzip file next to it, and removes the archive.
+
+    read_files cannot read ZIP archives, but reads gzip files as they are, so the file
+    stays compressed on its way to the volume. Level 1 keeps the repacking fast; the
+    upload from the browser, the slow part, has already happened.
+
+    Returns:
+        Tuple[str, str]: Local path and file name ("<archive name>.csv.gz") of the gzip file.
+
+    Raises:
+        ValueError: If the archive does not contain exactly one CSV file.
+    """
+    with zipfile.ZipFile(local_path) as archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(".csv") and not info.filename.startswith("__MACOSX/")
+        ]
+        if len(members) != 1:
+            raise ValueError(f"The ZIP file must contain exactly one CSV file, found {len(members)}")
+
+        gzip_name = f"{csv_stem(file_name)}.csv.gz"
+        gzip_path = os.path.join(os.path.dirname(local_path), f"repacked-{gzip_name}")
+        with archive.open(members[0]) as source, gzip.open(gzip_path, "wb", compresslevel=compresslevel) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+
+    os.remove(local_path)
+    return gzip_path, gzip_name
@@ -1,4 +1,117 @@
 # config.py
+import os
 
 # Databricks Volume Path Configuration
-DATABRICKS_VOLUME_PATH = "/Volumes/dbdemos_steventan/app/internal_app_volume"
\ No newline at end of file
+DATABRICKS_VOLUME_PATH = "/Volumes/dbdemos_steventan/app/internal_app_volume"
+
+# SQL Warehouse connection pool configuration
+SQL_POOL_MIN_SIZE = int(os.getenv("SQL_POOL_MIN_SIZE", "0"))
+SQL_POOL_MAX_SIZE = int(os.getenv("SQL_POOL_MAX_SIZE", "8"))
+SQL_POOL_IDLE_TIMEOUT = float(os.getenv("SQL_POOL_IDLE_TIMEOUT", "300"))  # seconds
+SQL_POOL_ACQUIRE_TIMEOUT = float(os.getenv("SQL_POOL_ACQUIRE_TIMEOUT", "30"))  # seconds
+SQL_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("SQL_POOL_HEALTH_CHECK_INTERVAL", "60"))  # seconds
+
+# Unity Catalog metadata cache configuration
+METADATA_CACHE_TTLS = {
+    "catalogs": float(os.getenv("METADATA_CACHE_TTL_CATALOGS", "600")),  # seconds
+    "schemas": float(os.getenv("METADATA_CACHE_TTL_SCHEMAS", "300")),
+    "tables": float(os.getenv("METADATA_CACHE_TTL_TABLES", "120")),
+    "describe": float(os.getenv("METADATA_CACHE_TTL_DESCRIBE", "300")),
+}
+METADATA_CACHE_STALE_TTL = float(os.getenv("METADATA_CACHE_STALE_TTL", "600"))  # seconds
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "2048"))
+METADATA_CACHE_MAX_BYTES = int(os.getenv("METADATA_CACHE_MAX_MB", "64")) * 1024 * 1024
+METADATA_INVALIDATION_DIR = os.getenv("METADATA_INVALIDATION_DIR", "./cache/metadata-invalidations")
+
+# Catalog tree prefetch (schema and table listings from information_schema)
+CATALOG_TREE_ENABLED = os.getenv("CATALOG_TREE_ENABLED", "true").lower() == "true"
+CATALOG_TREE_REFRESH_INTERVAL = float(os.getenv("CATALOG_TREE_REFRESH_INTERVAL", "60"))  # seconds
+CATALOG_TREE_FULL_RELOAD_INTERVAL = float(os.getenv("CATALOG_TREE_FULL_RELOAD_INTERVAL", "900"))  # seconds
+
+# Upload configuration
+MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "100"))
+UPLOAD_DECODE_CHUNK_SIZE = int(os.getenv("UPLOAD_DECODE_CHUNK_SIZE", str(1024 * 1024)))  # bytes
+
+# Resumable chunked upload configuration (must stay below /tmp, the PUT staging path)
+CHUNKED_UPLOAD_DIR = os.getenv("CHUNKED_UPLOAD_DIR", "/tmp/chunked-uploads")
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.getenv("CHUNKED_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))  # bytes
+CHUNKED_UPLOAD_PARALLELISM = int(os.getenv("CHUNKED_UPLOAD_PARALLELISM", "4"))
+CHUNKED_UPLOAD_MAX_SIZE_MB = int(os.getenv("CHUNKED_UPLOAD_MAX_SIZE_MB", "10240"))
+CHUNKED_UPLOAD_EXPIRY = float(os.getenv("CHUNKED_UPLOAD_EXPIRY", "86400"))  # seconds
+
+# Local copies of uploaded files used for in-process previews (must stay below /tmp)
+LOCAL_STAGING_DIR = os.getenv("LOCAL_STAGING_DIR", "/tmp/staged-files")
+LOCAL_STAGING_MAX_MB = int(os.getenv("LOCAL_STAGING_MAX_MB", "20480"))
+
+# File preview cache shared by all worker processes
+PREVIEW_CACHE_DIR = os.getenv("PREVIEW_CACHE_DIR", "./cache/previews")
+PREVIEW_CACHE_MAX_MB = int(os.getenv("PREVIEW_CACHE_MAX_MB", "256"))
+
+# Full-file validation of locally staged uploads
+VALIDATION_BLOCK_SIZE = int(os.getenv("VALIDATION_BLOCK_SIZE", str(8 * 1024 * 1024)))  # bytes per record batch
+VALIDATION_MODE = os.getenv("VALIDATION_MODE", "auto")  # auto: local when staged, else warehouse; warehouse: always push down
+
+# Asynchronous statements that a newer callback invocation can cancel
+STATEMENT_POLL_INTERVAL = float(os.getenv("STATEMENT_POLL_INTERVAL", "0.5"))  # seconds between status polls
+STATEMENT_REGISTRY_DIR = os.getenv("STATEMENT_REGISTRY_DIR", "./cache/statements")
+
+# Paged (infinite-scroll) previews of whole files and tables
+PAGED_PREVIEW_DIR = os.getenv("PAGED_PREVIEW_DIR", "./cache/paged-previews")
+PAGED_PREVIEW_MAX_MB = int(os.getenv("PAGED_PREVIEW_MAX_MB", "10240"))
+PAGED_PREVIEW_BLOCK_ROWS = int(os.getenv("PAGED_PREVIEW_BLOCK_ROWS", "100"))  # rows per grid request
+
+# Batch appends of many files to one table
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))  # files processed at the same time
+BATCH_UPLOAD_DIR = os.getenv("BATCH_UPLOAD_DIR", "/tmp/batch-uploads")  # must be below /tmp
+
+# Ingestion of uploaded files into tables
+INGESTION_MODE = os.getenv("INGESTION_MODE", "insert")  # insert: INSERT ... SELECT FROM read_files; copy_into: idempotent COPY INTO
+COPY_INTO_MAX_RETRIES = int(os.getenv("COPY_INTO_MAX_RETRIES", "5"))
+COPY_INTO_RETRY_BACKOFF = float(os.getenv("COPY_INTO_RETRY_BACKOFF", "2"))  # seconds, doubled after each attempt
+
+# Persistent append job queue and its worker processes
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "./jobs/jobs.sqlite")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # worker processes started with the app; 0 to run them separately
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "10"))  # seconds, doubled after each attempt
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))  # seconds between queue polls of an idle worker
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))  # seconds
+JOB_HEARTBEAT_TIMEOUT = float(os.getenv("JOB_HEARTBEAT_TIMEOUT", "60"))  # seconds before a silent running job is taken over
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "604800"))  # seconds finished jobs are kept
+
+# Stage-by-stage progress of uploads and appends
+PROGRESS_DIR = os.getenv("PROGRESS_DIR", "./cache/progress")
+PROGRESS_EXPIRY = float(os.getenv("PROGRESS_EXPIRY", "86400"))  # seconds progress is kept after the last update
+PROGRESS_UPDATE_INTERVAL = float(os.getenv("PROGRESS_UPDATE_INTERVAL", "0.25"))  # minimum seconds between published updates
+
+# CSV dialect and encoding detection of uploaded files
+CSV_DETECT_SAMPLE_KB = int(os.getenv("CSV_DETECT_SAMPLE_KB", "256"))  # read from both the start and the end of the file
+
+# Typed Parquet conversion of uploads before they are put to the volume
+PARQUET_CONVERSION = os.getenv("PARQUET_CONVERSION", "false").lower() == "true"
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")  # zstd, snappy, gzip or none
+PARQUET_ROW_GROUP_ROWS = int(os.getenv("PARQUET_ROW_GROUP_ROWS", "1000000"))
+PARQUET_CONVERSION_DIR = os.getenv("PARQUET_CONVERSION_DIR", "/tmp/parquet-conversions")  # must be below /tmp
+
+# SQL backend: the Databricks SQL Warehouse, or a local DuckDB stand-in for development and load tests
+SQL_BACKEND = os.getenv("SQL_BACKEND", "databricks")  # databricks or duckdb
+LOCAL_WAREHOUSE_DIR = os.getenv("LOCAL_WAREHOUSE_DIR", "./local-warehouse")  # DuckDB catalogs and /Volumes of the stand-in
+
+# Prometheus metrics and health endpoints
+METRICS_DIR = os.getenv("METRICS_DIR", "./cache/metrics")  # snapshots of every process, merged by /metrics
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))  # seconds between snapshots of a process
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "30"))  # seconds a warehouse round trip's result is reused
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "10"))  # seconds before the warehouse counts as unreachable
+
+# Tracing of callbacks, dbutils functions and warehouse statements, written as OTLP JSON lines
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_FILE = os.getenv("TRACE_FILE", "./traces/traces.jsonl")
+TRACE_FILE_MAX_MB = int(os.getenv("TRACE_FILE_MAX_MB", "256"))  # rotated to <file>.1 when exceeded
+
+# Local log of SQL statements behind the query analytics page
+QUERY_LOG_ENABLED = os.getenv("QUERY_LOG_ENABLED", "true").lower() == "true"
+QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH", "./cache/query-log.sqlite")
+QUERY_LOG_MAX_ROWS = int(os.getenv("QUERY_LOG_MAX_ROWS", "100000"))  # oldest statements are removed beyond this
+
+# Startup: modules deferred at import are loaded by a background thread once the app is up
+STARTUP_PREWARM = os.getenv("STARTUP_PREWARM", "true").lower() == "true"
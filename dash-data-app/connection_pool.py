@@ -0,0 +1,259 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class _PooledConnection:
+    """A connection together with the bookkeeping the pool needs."""
+
+    __slots__ = ("connection", "created_at", "last_used", "last_checked")
+
+    def __init__(self, connection: Any):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of long-lived DB-API connections.
+
+    Connections are handed out most-recently-used first so that warm sessions are
+    reused, idle connections above `min_size` are closed after `idle_timeout`
+    seconds, and a connection that has not been used for `health_check_interval`
+    seconds is probed with a trivial statement before it is handed out again.
+
+    Args:
+        connect (Callable): Factory returning a new open connection.
+        min_size (int): Number of connections kept open even when idle.
+        max_size (int): Maximum number of open connections (idle + in use).
+        idle_timeout (float): Seconds after which an idle connection is closed.
+        acquire_timeout (float): Seconds to wait for a free connection before raising PoolTimeout.
+        health_check_interval (float): Seconds of inactivity after which a connection is probed.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 0,
+        max_size: int = 8,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 30.0,
+        health_check_interval: float = 60.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle: List[_PooledConnection] = []  # most recently used at the end
+        self._size = 0  # open connections, idle and in use
+        self._closed = False
+
+        # Statistics
+        self._acquisitions = 0
+        self._created = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Context manager that checks a connection out of the pool and returns it afterwards.
+        """
+        entry = self.acquire()
+        try:
+            yield entry.connection
+        except Exception:
+            # The statement failed; make sure the session is still usable before reusing it
+            entry.last_checked = float("-inf")
+            raise
+        finally:
+            self.release(entry)
+
+    def acquire(self) -> _PooledConnection:
+        """
+        Checks out a connection, opening a new one if the pool is below max_size.
+        """
+        start = time.monotonic()
+        deadline = start + self.acquire_timeout
+        while True:
+            entry, expired = self._checkout(deadline)
+            self._close_all(expired)
+
+            if entry is None:
+                try:
+                    entry = _PooledConnection(self._connect())
+                except Exception:
+                    self._forget()
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif not self._is_healthy(entry):
+                self._close_all([entry])
+                self._forget(discarded=True)
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._acquisitions += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            return entry
+
+    def release(self, entry: _PooledConnection) -> None:
+        """
+        Returns a connection to the pool, closing it if it is no longer usable.
+        """
+        if self._closed or not getattr(entry.connection, "open", True):
+            self._close_all([entry])
+            self._forget(discarded=True)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def prefill(self) -> None:
+        """
+        Opens connections until the pool holds at least min_size of them.
+        """
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = _PooledConnection(self._connect())
+            except Exception as e:
+                print(f"Error pre-filling connection pool: {str(e)}")
+                self._forget()
+                return
+            with self._cond:
+                self._created += 1
+            self.release(entry)
+
+    def close(self) -> None:
+        """
+        Closes all idle connections; in-use connections are closed when released.
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        self._close_all(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of pool size and wait-time statistics.
+        """
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "acquisitions": self._acquisitions,
+                "created": self._created,
+                "discarded": self._discarded,
+                "timeouts": self._timeouts,
+                "wait_time_total": self._wait_time_total,
+                "wait_time_max": self._wait_time_max,
+                "wait_time_avg": self._wait_time_total / self._acquisitions if self._acquisitions else 0.0,
+            }
+
+    def _checkout(self, deadline: float):
+        """
+        Waits for an idle connection or a free slot. Returns (entry or None, expired entries to close).
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                expired = self._pop_expired_locked()
+                if self._idle:
+                    return self._idle.pop(), expired
+                if self._size < self.max_size:
+                    # Reserve a slot; the connection is opened outside the lock
+                    self._size += 1
+                    return None, expired
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No connection available after {self.acquire_timeout}s (max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+    def _pop_expired_locked(self) -> List[_PooledConnection]:
+        """
+        Removes idle connections past idle_timeout, keeping at least min_size open.
+        """
+        now = time.monotonic()
+        expired = []
+        # Oldest idle connections are at the front of the list
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0].last_used > self.idle_timeout
+        ):
+            expired.append(self._idle.pop(0))
+            self._size -= 1
+            self._discarded += 1
+        return expired
+
+    def _is_healthy(self, entry: _PooledConnection) -> bool:
+        if not getattr(entry.connection, "open", True):
+            return False
+        now = time.monotonic()
+        if now - entry.last_checked < self.health_check_interval:
+            return True
+        try:
+            with entry.connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            entry.last_checked = now
+            return True
+        except Exception as e:
+            print(f"Discarding unhealthy pooled connection: {str(e)}")
+            return False
+
+    def _forget(self, discarded: bool = False) -> None:
+        """
+        Releases a reserved slot after a connection failed to open or was closed.
+        """
+        with self._cond:
+            self._size -= 1
+            if discarded:
+                self._discarded += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_all(entries: List[_PooledConnection]) -> None:
+        for entry in entries:
+            try:
+                entry.connection.close()
+            except Exception as e:
+                print(f"Error closing pooled connection: {str(e)}")
@@ -0,0 +1,296 @@
+import codecs
+import csv
+import os
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+from charset_normalizer import from_bytes
+from staging import staged_file_path
+from compressed_files import compression_of, open_decompressed
+
+# Candidates offered by the CSV settings, most common first so ties keep the usual choice
+DELIMITERS = [",", ";", "\t", "|", " "]
+QUOTE_CHARS = ['"', "'"]
+
+# Byte order marks, longest first; UTF-8 files with a BOM are read fine as UTF-8
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Python codec names of charset_normalizer mapped to the charset names the warehouse expects
+_CHARSETS = {
+    "ascii": "utf-8",
+    "utf_8": "utf-8",
+    "utf_16": "utf-16",
+    "utf_16_le": "utf-16le",
+    "utf_16_be": "utf-16be",
+    "utf_32": "utf-32",
+    "latin_1": "iso-8859-1",
+    "cp1252": "windows-1252",
+    "cp1250": "windows-1250",
+    "cp1251": "windows-1251",
+    "iso8859_15": "iso-8859-15",
+    "shift_jis": "shift_jis",
+    "cp932": "windows-31j",
+    "euc_jp": "euc-jp",
+    "gb2312": "gb2312",
+    "gb18030": "gb18030",
+    "big5": "big5",
+    "euc_kr": "euc-kr",
+}
+
+_PREFERRED_CHARSETS = ("cp1252", "latin_1", "iso8859_15")
+
+_NUMBER = re.compile(r"^[+-]?(\d+([.,]\d*)?|[.,]\d+)([eE][+-]?\d+)?$")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?")
+
+
+@dataclass
+class CsvDialect:
+    """Detected CSV settings of a file, with a confidence between 0 and 1 per setting."""
+    delimiter: str = ","
+    quote_char: str = '"'
+    header: bool = True
+    encoding: str = "utf-8"
+    confidence: float = 0.0
+    confidences: Dict[str, float] = field(default_factory=dict)
+
+    def settings(self) -> Dict[str, object]:
+        """
+        Returns the settings in the shape of the csv-settings store.
+        """
+        return asdict(self)
+
+
+def _read_samples(local_path: str, sample_size: int) -> Tuple[bytes, bytes]:
+    """
+    Returns the first and last `sample_size` bytes of a file; the tail is empty for small files.
+
+    Of gzip and zstd files only the head of the decompressed content is sampled, since
+    their end cannot be reached without decompressing everything before it.
+    """
+    if compression_of(local_path):
+        with open_decompressed(local_path) as f:
+            return f.read(sample_size), b""
+    size = os.path.getsize(local_path)
+    with open(local_path, "rb") as f:
+        head = f.read(sample_size)
+        if size <= 2 * sample_size:
+            return head + f.read(), b""
+        f.seek(size - sample_size)
+        tail = f.read()
+    # The seek may land inside a UTF-8 character; its continuation bytes would make the
+    # sample invalid UTF-8. The first tail line is cut in half and dropped anyway.
+    skip = 0
+    while skip < min(3, len(tail)) and 0x80 <= tail[skip] <= 0xBF:
+        skip += 1
+    return head, tail[skip:]
+
+
+def detect_encoding(head: bytes, tail: bytes = b"") -> Tuple[str, float]:
+    """
+    Returns the charset of the sampled bytes and a confidence, from a BOM, a strict
+    UTF-8 decode or charset_normalizer, in that order.
+    """
+    for bom, charset in _BOMS:
+        if head.startswith(bom):
+            return charset, 1.0
+
+    sample = head + b"\n" + tail
+    try:
+        # A sample may end in the middle of a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8", 1.0 if max(sample, default=0) > 0x7F else 0.9
+    except UnicodeDecodeError:
+        pass
+
+    matches = from_bytes(sample)
+    best = matches.best()
+    if best is None:
+        return "iso-8859-1", 0.3
+    # Short samples often decode identically in several single-byte code pages; prefer the common ones
+    encoding = next((name for name in _PREFERRED_CHARSETS if name in best.could_be_from_charset), best.encoding)
+    charset = _CHARSETS.get(encoding, encoding.replace("_", "-"))
+    # charset_normalizer reports chaos (0 = clean text) rather than a probability
+    return charset, round(max(0.3, 1.0 - best.chaos), 2)
+
+
+def _decode(sample: bytes, encoding: str) -> str:
+    return codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample, final=False)
+
+
+def _complete_lines(text: str, drop_first: bool) -> List[str]:
+    """
+    Splits sampled text into lines, dropping the lines the sample boundaries cut in half.
+    """
+    lines = text.splitlines()
+    if drop_first and lines:
+        lines = lines[1:]
+    if lines and not text.endswith(("\n", "\r")):
+        lines = lines[:-1] or lines
+    return [line for line in lines if line.strip()]
+
+
+def _field_counts(lines: List[str], delimiter: str, quote_char: str) -> List[int]:
+    reader = csv.reader(lines, delimiter=delimiter, quotechar=quote_char or None, quoting=csv.QUOTE_MINIMAL if quote_char else csv.QUOTE_NONE)
+    try:
+        return [len(row) for row in reader]
+    except csv.Error:
+        return []
+
+
+def detect_delimiter(lines: List[str], quote_char: str = '"') -> Tuple[str, float]:
+    """
+    Picks the delimiter that splits the most lines into the same number of fields (more than one).
+    """
+    best, best_score = ",", 0.0
+    for delimiter in DELIMITERS:
+        counts = _field_counts(lines, delimiter, quote_char)
+        if not counts:
+            continue
+        width, rows = Counter(counts).most_common(1)[0]
+        if width < 2:
+            continue
+        consistency = rows / len(counts)
+        # Spaces also occur inside values, so they only win when clearly consistent
+        score = consistency * (0.8 if delimiter == " " else 1.0)
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best, round(best_score, 2)
+
+
+def detect_quote_char(lines: List[str], delimiter: str) -> Tuple[str, float]:
+    """
+    Picks the quote character seen most often at field boundaries.
+    """
+    text = "\n".join(lines)
+    boundary = re.escape(delimiter)
+    counts = {}
+    for quote in QUOTE_CHARS:
+        q = re.escape(quote)
+        counts[quote] = len(re.findall(rf"(?:^|{boundary}){q}|{q}(?:{boundary}|$)", text, re.MULTILINE))
+    quote, hits = max(counts.items(), key=lambda item: item[1])
+    if not hits:
+        # No quoting in the sample, so every quote character reads it the same way
+        return '"', 1.0
+    other = sum(counts.values()) - hits
+    return quote, round(hits / (hits + other), 2)
+
+
+def _cell_kind(value: str) -> str:
+    value = value.strip()
+    if not value:
+        return "empty"
+    if _NUMBER.match(value):
+        return "number"
+    if _DATE.match(value):
+        return "date"
+    if value.lower() in ("true", "false"):
+        return "boolean"
+    return "text"
+
+
+def detect_header(lines: List[str], delimiter: str, quote_char: str) -> Tuple[bool, float]:
+    """
+    Decides whether the first line is a header by comparing it with the column types below it.
+
+    A column whose values are numbers, dates or booleans but whose first value is text votes
+    for a header; a first value of the same kind votes against it. All-text columns vote for
+    a header only when the first value never repeats below.
+    """
+    reader = csv.reader(lines[:200], delimiter=delimiter, quotechar=quote_char or None, quoting=csv.QUOTE_MINIMAL if quote_char else csv.QUOTE_NONE)
+    try:
+        rows = list(reader)
+    except csv.Error:
+        return True, 0.0
+    if len(rows) < 2:
+        return True, 0.0
+
+    first, rest = rows[0], rows[1:]
+    votes = 0
+    columns = 0
+    for index, value in enumerate(first):
+        kinds = Counter(_cell_kind(row[index]) for row in rest if index < len(row))
+        kinds.pop("empty", None)
+        if not kinds:
+            continue
+        kind = kinds.most_common(1)[0][0]
+        first_kind = _cell_kind(value)
+        if kind != "text":
+            columns += 1
+            votes += 1 if first_kind == "text" else -1
+        elif first_kind != "text":
+            columns += 1
+            votes -= 1
+
+    if votes:
+        return votes > 0, round(abs(votes) / columns, 2)
+
+    # Only text columns: a header's names are non-empty, distinct and do not reappear as values
+    values = [value.strip() for value in first]
+    distinct = all(values) and len(set(values)) == len(values)
+    repeated = any(row[:len(first)] and any(a == b for a, b in zip(row, first)) for row in rest)
+    return distinct and not repeated, 0.3
+
+
+def detect_csv_dialect(local_path: str, sample_size: int = 256 * 1024) -> CsvDialect:
+    """
+    Detects delimiter, quote character, header and encoding of a local CSV file.
+
+    Only the first and last `sample_size` bytes are read, so detection takes the same
+    few milliseconds for any file size and never touches the warehouse.
+
+    Returns:
+        CsvDialect: The detected settings with per-setting confidences; the overall
+            confidence is the lowest of them.
+    """
+    head, tail = _read_samples(local_path, sample_size)
+    encoding, encoding_confidence = detect_encoding(head, tail)
+
+    lines = _complete_lines(_decode(head, encoding), drop_first=False)
+    tail_lines = _complete_lines(_decode(tail, encoding), drop_first=True) if tail else []
+    if not lines:
+        return CsvDialect(encoding=encoding, confidences={"encoding": encoding_confidence})
+
+    # Settle the delimiter first with double quotes, then check which quote character is used
+    delimiter, delimiter_confidence = detect_delimiter(lines + tail_lines)
+    quote_char, quote_confidence = detect_quote_char(lines + tail_lines, delimiter)
+    if quote_char != '"':
+        delimiter, delimiter_confidence = detect_delimiter(lines + tail_lines, quote_char)
+    header, header_confidence = detect_header(lines, delimiter, quote_char)
+
+    confidences = {
+        "delimiter": delimiter_confidence,
+        "quote_char": quote_confidence,
+        "header": header_confidence,
+        "encoding": encoding_confidence,
+    }
+    return CsvDialect(
+        delimiter=delimiter,
+        quote_char=quote_char,
+        header=header,
+        encoding=encoding,
+        confidence=min(confidences.values()),
+        confidences=confidences
+    )
+
+
+def staged_csv_settings(staging_dir: str, file_path: str, sample_size: int) -> Optional[Dict[str, object]]:
+    """
+    Returns the detected settings of an uploaded file's local copy, or None if it is not staged.
+    """
+    local_path = staged_file_path(staging_dir, file_path.split("/")[-1])
+    if local_path is None:
+        return None
+    try:
+        settings = detect_csv_dialect(local_path, sample_size).settings()
+    except Exception as e:
+        print(f"Error detecting CSV settings of {file_path}: {str(e)}")
+        return None
+    settings["file_path"] = file_path
+    return settings
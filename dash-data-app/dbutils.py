@@ -1,188 +1,1155 @@
 import os
-import base64
-from databricks import sql
-from databricks.sdk.core import Config
-import pandas as pd
+import sys
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+import pyarrow as pa
 import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+from connection_pool import ConnectionPool, PoolTimeout
+from metadata_cache import InvalidationLog, MetadataCache
+from catalog_tree import CatalogTreeLoader
+from statement_registry import StatementRegistry
+from staging import UploadStats, decode_to_file, decoded_size, file_stats, keep_staged_file, pin_staged_file, staged_file_path, staged_file_pinned, staged_file_stats
+from progress import ProgressReporter
+from metrics import increment, measure
+from tracing import current_span, span, traced
+from query_log import log_statement
+from parquet_conversion import UnsupportedConversion, convert_csv_to_parquet
+from compressed_files import compression_of, csv_stem, repack_zip
+from preview_engine import read_csv_preview_arrow
+from validation_engine import ValidationReport, build_pushdown_query, parse_pushdown_result, quote_identifier, table_columns
+from config import (
+    SQL_POOL_MIN_SIZE,
+    SQL_POOL_MAX_SIZE,
+    SQL_POOL_IDLE_TIMEOUT,
+    SQL_POOL_ACQUIRE_TIMEOUT,
+    SQL_POOL_HEALTH_CHECK_INTERVAL,
+    METADATA_CACHE_TTLS,
+    METADATA_CACHE_STALE_TTL,
+    METADATA_CACHE_MAX_ENTRIES,
+    METADATA_CACHE_MAX_BYTES,
+    METADATA_INVALIDATION_DIR,
+    CATALOG_TREE_ENABLED,
+    CATALOG_TREE_REFRESH_INTERVAL,
+    CATALOG_TREE_FULL_RELOAD_INTERVAL,
+    MAX_UPLOAD_SIZE_MB,
+    UPLOAD_DECODE_CHUNK_SIZE,
+    LOCAL_STAGING_DIR,
+    LOCAL_STAGING_MAX_MB,
+    STATEMENT_POLL_INTERVAL,
+    STATEMENT_REGISTRY_DIR,
+    INGESTION_MODE,
+    COPY_INTO_MAX_RETRIES,
+    COPY_INTO_RETRY_BACKOFF,
+    PARQUET_CONVERSION,
+    PARQUET_COMPRESSION,
+    PARQUET_ROW_GROUP_ROWS,
+    PARQUET_CONVERSION_DIR,
+    SQL_BACKEND,
+    LOCAL_WAREHOUSE_DIR
+)
 
-def sqlQuery(query: str) -> pd.DataFrame:
+# pandas, the SQL connector and the Databricks SDK take seconds to import, so they are imported
+# on first use: the connector with the first connection, pandas with the first DataFrame
+if TYPE_CHECKING:
+    import pandas as pd
+    from databricks.sdk.core import Config
+
+_config: Optional["Config"] = None
+_pools: Dict[Hashable, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_metadata_cache = MetadataCache(
+    ttls=METADATA_CACHE_TTLS,
+    stale_ttl=METADATA_CACHE_STALE_TTL,
+    max_entries=METADATA_CACHE_MAX_ENTRIES,
+    max_bytes=METADATA_CACHE_MAX_BYTES
+)
+# Invalidations of other processes (job workers, background callbacks) apply to this one too
+_invalidation_log = InvalidationLog(
+    METADATA_INVALIDATION_DIR,
+    expire=max(METADATA_CACHE_TTLS.values()) + METADATA_CACHE_STALE_TTL
+)
+_catalog_tree = CatalogTreeLoader(
+    lambda query: sqlQuery(query),
+    refresh_interval=CATALOG_TREE_REFRESH_INTERVAL,
+    full_reload_interval=CATALOG_TREE_FULL_RELOAD_INTERVAL
+)
+_statement_registry = StatementRegistry(STATEMENT_REGISTRY_DIR)
+
+class StatementCancelled(Exception):
+    """Raised when an asynchronous statement was cancelled before it finished."""
+
+def _get_config() -> "Config":
+    """
+    Returns the process-wide Databricks SDK config, resolving it on first use.
+    """
+    global _config
+    if _config is None:
+        from databricks.sdk.core import Config
+        _config = Config()
+    return _config
+
+def prewarm_imports() -> None:
+    """
+    Imports the modules that are deferred to speed up startup, so that the first statement does not wait for them.
+
+    Requests served meanwhile may find pandas half-imported; app.py makes the JSON
+    encoder of Dash responses wait for it.
+    """
+    started = time.perf_counter()
+    try:
+        import pandas  # noqa: F401
+        if SQL_BACKEND == "duckdb":
+            import duckdb_warehouse  # noqa: F401
+        else:
+            import databricks.sql.client  # noqa: F401
+            from databricks.sdk.core import Config  # noqa: F401
+        print(f"Prewarmed deferred imports in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        print(f"Error prewarming imports: {str(e)}")
+
+def _connection_factory(http_path: str, identity: Optional[str]) -> Callable[[], Any]:
+    """
+    Returns the function that opens a new connection to the configured SQL backend.
+
+    SQL_BACKEND=duckdb replaces the warehouse with the local DuckDB stand-in, whose
+    connections implement the subset of the connector's API used in this module.
+    """
+    if SQL_BACKEND == "duckdb":
+        # duckdb is only needed for local runs, so it is imported on demand
+        from duckdb_warehouse import DuckDBWarehouse
+        return DuckDBWarehouse(LOCAL_WAREHOUSE_DIR).connect
+
+    cfg = _get_config()
+    if identity:
+        auth = {"access_token": identity}
+    else:
+        auth = {"credentials_provider": lambda: cfg.authenticate}
+
+    def connect():
+        from databricks import sql
+        return sql.connect(
+            server_hostname=cfg.host,
+            http_path=http_path,
+            staging_allowed_local_path="/tmp",  # Required for file ingestion commands
+            **auth
+        )
+    return connect
+
+def _get_pool(identity: Optional[str] = None) -> ConnectionPool:
+    """
+    Returns the connection pool for the given identity, creating it on first use.
+
+    Args:
+        identity (Optional[str]): An access token to connect on behalf of a user.
+            Connections are pooled per identity; None uses the app's own credentials.
+    """
+    if SQL_BACKEND == "duckdb":
+        http_path = f"duckdb:{LOCAL_WAREHOUSE_DIR}"
+    else:
+        http_path = f"/sql/1.0/warehouses/{os.getenv('DATABRICKS_WAREHOUSE_ID')}"
+    # Never keep raw tokens as dictionary keys
+    identity_key = hashlib.sha256(identity.encode()).hexdigest() if identity else None
+    key = (http_path, identity_key)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool
+
+        pool = ConnectionPool(
+            _connection_factory(http_path, identity),
+            min_size=SQL_POOL_MIN_SIZE,
+            max_size=SQL_POOL_MAX_SIZE,
+            idle_timeout=SQL_POOL_IDLE_TIMEOUT,
+            acquire_timeout=SQL_POOL_ACQUIRE_TIMEOUT,
+            health_check_interval=SQL_POOL_HEALTH_CHECK_INTERVAL
+        )
+        _pools[key] = pool
+
+    if SQL_POOL_MIN_SIZE > 0:
+        threading.Thread(target=pool.prefill, daemon=True).start()
+    return pool
+
+def _reset_pools_after_fork() -> None:
+    # Connections must not be shared with forked workers (e.g. background callbacks)
+    global _pools, _pools_lock
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Returns size and wait-time statistics for every connection pool in this process.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {
+        f"{http_path}|{'user:' + identity_key[:12] if identity_key else 'app'}": pool.stats()
+        for (http_path, identity_key), pool in pools
+    }
+
+# Statements are cut in spans; INSERT ... VALUES can be megabytes long
+_MAX_TRACED_QUERY_CHARS = 4096
+_STATEMENT_KINDS = {"show": "show", "describe": "describe", "insert": "insert", "put": "put", "copy": "copy_into", "select": "select", "with": "select"}
+
+def _statement_kind(query: str) -> str:
+    """
+    Returns the metrics label of a statement: its leading keyword, or "read_files" for queries of files.
+    """
+    words = query.split(None, 1)
+    kind = _STATEMENT_KINDS.get(words[0].lower(), "other") if words else "other"
+    if kind == "select" and "read_files(" in query:
+        return "read_files"
+    return kind
+
+class _Execution:
+    """Statement id and result of one statement, reported to its span and the query log."""
+
+    def __init__(self, statement_span: Any):
+        self.span = statement_span
+        self.statement_id: Any = None
+        self.result: Optional[pa.Table] = None
+
+    def submitted(self, statement_id: Any) -> None:
+        self.statement_id = statement_id
+        self.span.set_attribute("databricks.statement_id", statement_id)
+
+    def fetched(self, result: pa.Table) -> None:
+        self.result = result
+        self.span.set_attributes(**{"db.response.returned_rows": result.num_rows, "db.response.bytes": result.nbytes})
+
+@contextmanager
+def _executing(query: str, kind: str, session_id: Optional[str] = None):
+    """
+    Traces one statement on the warehouse and records it in the query log.
+
+    The time waiting for a pooled connection is not included; the caller reports the
+    statement id and result on the yielded _Execution.
+    """
+    started_at, started = time.time(), time.perf_counter()
+    error = None
+    with span("cursor.execute", kind="client", **{"db.system": SQL_BACKEND, "db.operation.name": kind, "db.query.text": query.strip()[:_MAX_TRACED_QUERY_CHARS]}) as statement_span:
+        execution = _Execution(statement_span)
+        try:
+            yield execution
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            raise
+        finally:
+            result = execution.result
+            log_statement(
+                query,
+                kind,
+                started_at,
+                time.perf_counter() - started,
+                rows=result.num_rows if result is not None else None,
+                nbytes=result.nbytes if result is not None else None,
+                statement_id=execution.statement_id,
+                error=error,
+                session_id=session_id
+            )
+
+@traced()
+def sqlQueryArrow(query: str, identity: Optional[str] = None) -> pa.Table:
+    """
+    Executes a query against the Databricks SQL Warehouse and returns the result as an Arrow table.
+
+    Connections are borrowed from a per-identity pool and kept open between calls.
+    """
+    kind = _statement_kind(query)
+    try:
+        with measure("sql_statement_seconds", kind=kind):
+            with _get_pool(identity).connection() as connection:
+                with connection.cursor() as cursor, _executing(query, kind) as execution:
+                    cursor.execute(query)
+                    execution.submitted(cursor.query_id)
+                    execution.fetched(cursor.fetchall_arrow())
+                    return execution.result
+    except Exception:
+        increment("sql_statement_errors_total", kind=kind)
+        raise
+
+def sqlQuery(query: str, identity: Optional[str] = None) -> "pd.DataFrame":
     """
     Executes a query against the Databricks SQL Warehouse and returns the result as a Pandas DataFrame.
     """
-    cfg = Config()
-    with sql.connect(
-        server_hostname=cfg.host,
-        http_path=f"/sql/1.0/warehouses/{os.getenv('DATABRICKS_WAREHOUSE_ID')}",
-        credentials_provider=lambda: cfg.authenticate,
-        staging_allowed_local_path="/tmp"  # Required for file ingestion commands
-    ) as connection:
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            return cursor.fetchall_arrow().to_pandas()
+    return sqlQueryArrow(query, identity).to_pandas()
+
+@traced()
+def sqlQueryAsync(query: str, identity: Optional[str] = None, on_submit: Optional[Callable[[Any], None]] = None, should_cancel: Optional[Callable[[], bool]] = None, on_state: Optional[Callable[[str], None]] = None, session_id: Optional[str] = None) -> pa.Table:
+    """
+    Submits a query without blocking on it, polls its state and returns the result as an Arrow table.
+
+    Args:
+        query (str): The statement to execute.
+        identity (Optional[str]): An access token to run the statement on behalf of a user.
+        on_submit (Optional[Callable]): Called with the statement's command id once it is submitted,
+            e.g. to record it so that another process can cancel it with cancel_statement.
+        should_cancel (Optional[Callable]): Checked between polls; when it returns True the
+            statement is cancelled on the warehouse and StatementCancelled is raised.
+        on_state (Optional[Callable]): Called with the statement's state ("pending", "running", ...)
+            whenever it changes, e.g. to show whether it waits for the warehouse or executes.
+        session_id (Optional[str]): Browser session the statement runs for, recorded in the query log.
+
+    Returns:
+        pa.Table: The statement's result.
+    """
+    kind = _statement_kind(query)
+    try:
+        with measure("sql_statement_seconds", kind=kind):
+            with _get_pool(identity).connection() as connection:
+                with connection.cursor() as cursor, _executing(query, kind, session_id) as execution:
+                    cursor.execute_async(query)
+                    execution.submitted(cursor.query_id)
+                    if on_submit is not None:
+                        on_submit(cursor.active_command_id)
+
+                    state = None
+                    while True:
+                        current = cursor.get_query_state()
+                        if current != state:
+                            state = current
+                            # Events show how long the statement queued before it ran
+                            execution.span.add_event(state.name.lower())
+                            if on_state is not None:
+                                on_state(state.name.lower())
+                        if state.name not in ("PENDING", "RUNNING"):
+                            break
+                        if should_cancel is not None and should_cancel():
+                            cursor.cancel()
+                            raise StatementCancelled(f"Statement {cursor.query_id} was superseded")
+                        time.sleep(STATEMENT_POLL_INTERVAL)
+
+                    # Raises if the statement failed or was cancelled elsewhere
+                    cursor.get_async_execution_result()
+                    execution.fetched(cursor.fetchall_arrow())
+                    return execution.result
+    except StatementCancelled:
+        increment("sql_statements_cancelled_total", kind=kind)
+        raise
+    except Exception:
+        increment("sql_statement_errors_total", kind=kind)
+        raise
+
+@traced()
+def cancel_statement(command_id: Any, identity: Optional[str] = None) -> None:
+    """
+    Cancels a running statement on the warehouse by its command id.
+
+    The statement may have been submitted by another process, which need not be alive anymore.
+    """
+    with _get_pool(identity).connection() as connection:
+        connection.session.backend.cancel_command(command_id)
+
+@traced()
+def sqlQueryLatest(scope: str, session_id: str, query: str, identity: Optional[str] = None) -> pa.Table:
+    """
+    Runs a query asynchronously as the latest invocation of `scope` for a browser session.
+
+    A newer call with the same scope and session cancels the statement of this one, both
+    directly by command id and through the superseded worker's own polling. This keeps
+    abandoned statements (e.g. previews of a table the user already moved away from)
+    from occupying warehouse slots.
+
+    Raises:
+        StatementCancelled: If a newer invocation superseded this one.
+    """
+    token, superseded = _statement_registry.claim(scope, session_id)
+    if superseded is not None:
+        try:
+            cancel_statement(superseded, identity)
+        except Exception as e:
+            # The statement may already have finished
+            print(f"Error cancelling superseded statement: {str(e)}")
+
+    try:
+        # If a newer call claimed the slot meanwhile, the first poll cancels the statement
+        return sqlQueryAsync(
+            query,
+            identity,
+            on_submit=lambda command_id: _statement_registry.attach(scope, session_id, token, command_id),
+            should_cancel=lambda: not _statement_registry.is_current(scope, session_id, token),
+            session_id=session_id
+        )
+    finally:
+        _statement_registry.release(scope, session_id, token)
+
+def _cached_metadata(kind: str, key: tuple, query: str) -> "pd.DataFrame":
+    """
+    Runs a metadata query through the shared metadata cache.
+
+    Callers get their own copy so they can rename or reorder columns freely.
+    """
+    _apply_published_invalidations()
+    return _metadata_cache.get(kind, key, lambda: sqlQuery(query)).copy()
+
+def _invalidate_local(catalog: Optional[str] = None, schema: Optional[str] = None, table: Optional[str] = None) -> int:
+    if table is None:
+        # Schemas or tables may have been added or dropped
+        _catalog_tree.invalidate(catalog)
+    path = tuple(part for part in (catalog, schema, table) if part is not None)
+    return _metadata_cache.invalidate(*path)
+
+def _apply_published_invalidations() -> None:
+    """
+    Applies the invalidations published by other processes since the last lookup.
+    """
+    try:
+        paths = _invalidation_log.unseen()
+    except Exception as e:
+        print(f"Error reading metadata invalidations: {str(e)}")
+        return
+    for path in paths:
+        _invalidate_local(*(path or ()))
 
-def list_catalogs() -> pd.DataFrame:
+def invalidate_metadata(catalog: Optional[str] = None, schema: Optional[str] = None, table: Optional[str] = None) -> int:
+    """
+    Drops cached catalog metadata so that it is reloaded from the warehouse.
+
+    Without arguments everything is invalidated; otherwise only the entries for the
+    given catalog, schema or table and everything below it. The invalidation is also
+    published to the other processes, e.g. the web server after an append job.
+
+    Returns:
+        int: Number of cache entries removed in this process.
+    """
+    try:
+        _invalidation_log.publish((catalog, schema, table))
+    except Exception as e:
+        print(f"Error publishing metadata invalidation: {str(e)}")
+    return _invalidate_local(catalog, schema, table)
+
+def get_metadata_cache_stats() -> Dict[str, Any]:
+    """
+    Returns hit/miss and size statistics of the metadata cache.
+    """
+    return _metadata_cache.stats()
+
+@traced()
+def list_catalogs() -> "pd.DataFrame":
     """
     Returns the list of catalogs in the Databricks SQL Warehouse.
     """
     query = "SHOW CATALOGS"
-    return sqlQuery(query)
+    return _cached_metadata("catalogs", (), query)
 
-def list_schemas(catalog: str) -> pd.DataFrame:
+@traced()
+def list_schemas(catalog: str) -> "pd.DataFrame":
     """
     Returns the list of schemas in a specific catalog.
+
+    Served from the catalog tree snapshot when the catalog has an information_schema.
     """
+    if CATALOG_TREE_ENABLED:
+        _apply_published_invalidations()
+        schemas = _catalog_tree.schemas(catalog)
+        if schemas is not None:
+            import pandas as pd
+            return pd.DataFrame({"databaseName": schemas})
     query = f"SHOW SCHEMAS IN {catalog}"
-    return sqlQuery(query)
+    return _cached_metadata("schemas", (catalog,), query)
 
-def list_tables(catalog: str, schema: str) -> pd.DataFrame:
+@traced()
+def list_tables(catalog: str, schema: str) -> "pd.DataFrame":
     """
     Returns the list of tables in a specific catalog and schema.
+
+    Served from the catalog tree snapshot when the catalog has an information_schema.
     """
+    if CATALOG_TREE_ENABLED:
+        _apply_published_invalidations()
+        tables = _catalog_tree.tables(catalog, schema)
+        if tables is not None:
+            import pandas as pd
+            return pd.DataFrame({"database": schema, "tableName": tables, "isTemporary": False})
     query = f"SHOW TABLES IN {catalog}.{schema}"
-    return sqlQuery(query)
+    return _cached_metadata("tables", (catalog, schema), query)
 
-def describe_table(catalog: str, schema: str, table: str) -> pd.DataFrame:
+@traced()
+def describe_table(catalog: str, schema: str, table: str) -> "pd.DataFrame":
     """
     Returns the schema of a specified table.
     """
     query = f"DESCRIBE TABLE {catalog}.{schema}.{table}"
-    return sqlQuery(query)
+    return _cached_metadata("describe", (catalog, schema, table), query)
 
-def get_sample_data(catalog: str, schema: str, table: str, limit: int = 10) -> pd.DataFrame:
+@traced()
+def get_not_null_columns(catalog: str, schema: str, table: str) -> Set[str]:
     """
-    Retrieves sample data from a specified table.
+    Returns the names of the table's columns declared NOT NULL.
+
+    Catalogs without an information_schema (e.g. hive_metastore) yield an empty set.
+    """
+    query = f"""
+        SELECT column_name
+        FROM `{catalog}`.information_schema.columns
+        WHERE table_schema = '{schema}' AND table_name = '{table}' AND is_nullable = 'NO'
+    """
+    try:
+        df = _cached_metadata("not_null", (catalog, schema, table), query)
+    except Exception as e:
+        print(f"Error reading column nullability of {catalog}.{schema}.{table}: {str(e)}")
+        return set()
+    return set(df["column_name"].tolist())
+
+@traced()
+def get_sample_arrow(catalog: str, schema: str, table: str, limit: int = 10, session_id: Optional[str] = None) -> pa.Table:
+    """
+    Retrieves sample data from a specified table as an Arrow table.
 
     Args:
         catalog (str): The catalog name.
         schema (str): The schema name.
         table (str): The table name.
         limit (int): Number of sample rows to fetch (default: 10).
+        session_id (Optional[str]): The browser session asking for the sample. When given, a
+            newer request from the same session cancels this one's statement.
 
     Returns:
-        pd.DataFrame: DataFrame containing sample rows from the table.
+        pa.Table: Sample rows from the table, as fetched from the warehouse.
     """
     query = f"SELECT * FROM {catalog}.{schema}.{table} LIMIT {limit}"
-    return sqlQuery(query)
+    if session_id:
+        return sqlQueryLatest("sample_data", session_id, query)
+    return sqlQueryArrow(query)
 
-def save_file_to_volume(encoded_content: str, volume_path: str, file_name: str, overwrite: bool = True) -> str:
+def get_sample_data(catalog: str, schema: str, table: str, limit: int = 10, session_id: Optional[str] = None) -> "pd.DataFrame":
     """
-    Saves an uploaded file to a Databricks volume using the PUT command.
+    Retrieves sample data from a specified table.
+
+    See get_sample_arrow for the arguments.
+
+    Returns:
+        pd.DataFrame: DataFrame containing sample rows from the table.
+    """
+    return get_sample_arrow(catalog, schema, table, limit, session_id).to_pandas()
+
+@traced()
+def put_file_to_volume(local_path: str, volume_path: str, file_name: str, overwrite: bool = True) -> str:
+    """
+    Uploads a local file to a Databricks volume using the PUT command.
 
     Args:
-        encoded_content (str): Base64 encoded file content.
-        volume_path (str): The target Databricks volume path (e.g., "dbfs:/Volumes/my_catalog/uploads/").
-        file_name (str): The name of the file to be saved.
+        local_path (str): Path of the local file; must be below the connection's staging_allowed_local_path.
+        volume_path (str): The target Databricks volume path.
+        file_name (str): The name of the file in the volume.
         overwrite (bool): Whether to overwrite the existing file.
 
     Returns:
         str: The full path of the saved file.
     """
-    try:
-        # Check file size (limit to 100MB for example)
-        content_string = encoded_content.split(",")[1]
-        file_size = len(base64.b64decode(content_string))
-        max_size = 100 * 1024 * 1024  # 100MB
+    # Construct the Databricks volume file path
+    databricks_file_path = f"{volume_path}/{file_name}"
+    overwrite_option = "OVERWRITE" if overwrite else ""
+
+    # Execute the Databricks SQL command to upload file
+    query = f"PUT '{local_path}' INTO '{databricks_file_path}' {overwrite_option}"
+    current_span().set_attribute("file.bytes", os.path.getsize(local_path))
+    sqlQuery(query)
 
-        if file_size > max_size:
-            raise ValueError(f"File size exceeds maximum limit of {max_size/1024/1024}MB")
+    print(f"File successfully uploaded to: {databricks_file_path}")
+    return databricks_file_path
 
-        # Decode base64 content and save to a temporary local file
-        content_string = encoded_content.split(",")[1]
-        decoded = base64.b64decode(content_string)
-        local_temp_path = f"/tmp/{file_name}"
+@traced()
+def stage_upload(local_path: str, volume_path: str, file_name: str, stats: UploadStats, overwrite: bool = True, progress: Optional[ProgressReporter] = None, prefix: Optional[str] = None) -> str:
+    """
+    Puts an uploaded file to the volume and moves it into the local staging directory.
+
+    With PARQUET_CONVERSION the PUT is deferred: the file is only staged, pinned so that
+    it is not evicted, and insert_data_to_table puts its typed Parquet conversion instead.
+    gzip and zstd files are put as they are; the CSV file inside a ZIP archive is
+    repacked as "<archive name>.csv.gz", since read_files cannot read ZIP archives.
+
+    Args:
+        progress (Optional[ProgressReporter]): Receives the "put" stage.
+        prefix (Optional[str]): Prepended to the file name in the volume and the staging
+            directory, so that files of the same name in concurrent batches do not overwrite each other.
 
-        with open(local_temp_path, "wb") as f:
-            f.write(decoded)
+    Returns:
+        str: The volume path of the file; with a deferred PUT nothing exists there yet.
+    """
+    if prefix:
+        file_name = f"{prefix}-{file_name}"
+    if compression_of(file_name) == "zip":
+        local_path, file_name = repack_zip(local_path, file_name)
+        stats = file_stats(local_path)
 
-        # Construct the Databricks volume file path
-        databricks_file_path = f"{volume_path}/{file_name}"
-        overwrite_option = "OVERWRITE" if overwrite else ""
+    databricks_file_path = f"{volume_path}/{file_name}"
+    if PARQUET_CONVERSION:
+        if progress is not None:
+            progress.skip("put", "Deferred until the append, which uploads the file as Parquet")
+    else:
+        # The PUT sends the file in one request, so its progress is estimated from earlier uploads
+        if progress is not None:
+            progress.start("put", total=stats.size)
+        databricks_file_path = put_file_to_volume(local_path, volume_path, file_name, overwrite)
+        if progress is not None:
+            progress.finish("put", stats.size)
 
-        # Execute the Databricks SQL command to upload file
-        query = f"PUT '{local_temp_path}' INTO '{databricks_file_path}' {overwrite_option}"
-        sqlQuery(query)
+    # Keep the local copy so previews can be parsed without the warehouse
+    keep_staged_file(local_path, LOCAL_STAGING_DIR, file_name, stats, LOCAL_STAGING_MAX_MB * 1024 * 1024, pinned=PARQUET_CONVERSION)
+    return databricks_file_path
 
-        print(f"File successfully uploaded to: {databricks_file_path}")
-        os.remove(local_temp_path)  # Cleanup local temp file
-        return databricks_file_path
+@traced()
+def save_file_to_volume(encoded_content: str, volume_path: str, file_name: str, overwrite: bool = True, progress: Optional[ProgressReporter] = None) -> str:
+    """
+    Saves an uploaded file to a Databricks volume using the PUT command.
+
+    Args:
+        encoded_content (str): Base64 encoded file content.
+        volume_path (str): The target Databricks volume path (e.g., "dbfs:/Volumes/my_catalog/uploads/").
+        file_name (str): The name of the file to be saved.
+        overwrite (bool): Whether to overwrite the existing file.
+        progress (Optional[ProgressReporter]): Receives the "decode" and "put" stages.
+
+    Returns:
+        str: The full path of the saved file.
+    """
+    local_temp_path = None
+    stage = "decode"
+    try:
+        # Stream-decode the base64 content into a temporary local file
+        fd, local_temp_path = tempfile.mkstemp(prefix="upload-", suffix=f"-{file_name}", dir="/tmp")
+        os.close(fd)
+        if progress is not None:
+            progress.start("decode", total=decoded_size(encoded_content))
+        stats = decode_to_file(
+            encoded_content,
+            local_temp_path,
+            max_size=MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+            chunk_size=UPLOAD_DECODE_CHUNK_SIZE,
+            on_progress=(lambda size: progress.update("decode", size)) if progress is not None else None
+        )
+        print(f"Decoded {file_name}: {stats.size} bytes, {stats.line_count} lines, sha256={stats.sha256}")
+
+        stage = "put"
+        if progress is not None:
+            progress.finish("decode", stats.size)
+        return stage_upload(local_temp_path, volume_path, file_name, stats, overwrite, progress)
 
     except Exception as e:
         print(f"Error uploading file to volume: {str(e)}")
+        if progress is not None:
+            progress.fail(stage, str(e))
         raise
+
+    finally:
+        # Cleanup local temp file
+        if local_temp_path and os.path.exists(local_temp_path):
+            os.remove(local_temp_path)
     
-def read_file_from_volume(volume_path: str, file_name: str, delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8", limit: int = 10) -> pd.DataFrame:
+def read_files_source(file_path: str, header: bool = True, delimiter: str = ",", quote_char: str = '"', encoding: str = "utf-8", infer_types: bool = True) -> str:
     """
-    Reads a CSV file from a Databricks volume using read_files function.
+    Returns a read_files(...) table-valued function call for a CSV file in a volume.
     """
-    try:
-        file_path = f"{volume_path}/{file_name}"
-        
-        query = f"""
-        SELECT * FROM read_files(
+    infer_option = "" if infer_types else ",\n            inferColumnTypes => false"
+    return f"""read_files(
             '{file_path}',
             format => 'csv',
             header => {str(header).lower()},
             delimiter => '{delimiter}',
             quote => '{quote_char}',
-            charset => '{encoding}'
-        )
+            charset => '{encoding}'{infer_option}
+        )"""
+
+def _normalize_preview_columns(table: pa.Table, header: bool) -> pa.Table:
+    """
+    Applies the column naming used for file previews.
+    """
+    names = table.column_names
+    # Generate column names only if no header
+    if not header:
+        names = [
+            col if col == "_rescued_data" else f"col_{i}"
+            for i, col in enumerate(names)
+        ]
+    
+    # Ensure all column names are strings
+    return table.rename_columns([str(col).strip() for col in names])
+
+@traced()
+def read_file_arrow(volume_path: str, file_name: str, delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8", limit: int = 10) -> pa.Table:
+    """
+    Reads a CSV file from a Databricks volume using read_files function, as an Arrow table.
+
+    If the file is still staged locally from its upload, it is parsed in-process
+    instead and the warehouse is not queried.
+    """
+    try:
+        local_path = staged_file_path(LOCAL_STAGING_DIR, file_name)
+        if local_path:
+            try:
+                table = read_csv_preview_arrow(local_path, delimiter, quote_char, header, encoding, limit)
+                return _normalize_preview_columns(table, header)
+            except Exception as e:
+                print(f"Error parsing local copy of {file_name}, falling back to warehouse: {str(e)}")
+
+        file_path = f"{volume_path}/{file_name}"
+        
+        query = f"""
+        SELECT * FROM {read_files_source(file_path, header, delimiter, quote_char, encoding)}
         LIMIT {limit}
         """
         
-        df = sqlQuery(query)
+        table = sqlQueryArrow(query)
         
-        if df.empty:
-            return df
+        if table.num_rows == 0:
+            return table
             
-        # Generate column names only if no header
-        if not header:
-            df.columns = [f"col_{i}" for i in range(len(df.columns))]
-        
-        # Ensure all column names are strings
-        df.columns = [str(col).strip() for col in df.columns]
-        
-        return df
+        return _normalize_preview_columns(table, header)
 
     except Exception as e:
         print(f"Error reading file from volume: {str(e)}")
-        return pd.DataFrame()
+        return pa.table({})
+
+def read_file_from_volume(volume_path: str, file_name: str, delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8", limit: int = 10) -> "pd.DataFrame":
+    """
+    Reads a CSV file from a Databricks volume into a Pandas DataFrame.
+
+    See read_file_arrow for where the rows come from.
+    """
+    return read_file_arrow(volume_path, file_name, delimiter, quote_char, header, encoding, limit).to_pandas()
+
+@traced()
+def source_columns(source: str, cache_key: tuple) -> List[str]:
+    """
+    Returns the column names of a FROM-clause source without scanning it.
+
+    Args:
+        source (str): A table name or table-valued function call such as read_files(...).
+        cache_key (tuple): Metadata cache key for the result, e.g. (catalog, schema, table).
+    """
+    return [str(col) for col in _cached_metadata("columns", cache_key, f"SELECT * FROM {source} LIMIT 0").columns]
+
+@traced()
+def count_source_rows(source: str, cache_key: tuple, where: Optional[str] = None) -> int:
+    """
+    Returns the number of rows of a FROM-clause source matching an optional filter.
+
+    Counts are cached per (cache_key, where), so scrolling through a filtered view
+    does not recount; keys starting with (catalog, schema, table) are dropped by
+    invalidate_metadata after an append, in every process.
+    """
+    query = f"SELECT count(*) AS row_count FROM {source}" + (f" WHERE {where}" if where else "")
+    return int(_cached_metadata("row_count", cache_key + (where,), query).iloc[0]["row_count"])
+
+@traced()
+def query_page(source: str, offset: int, limit: int, where: Optional[str] = None, order_by: Optional[str] = None, session_id: Optional[str] = None) -> pa.Table:
+    """
+    Returns one page of rows from a FROM-clause source, with filter and sort pushed down to the warehouse.
+
+    Args:
+        source (str): A table name or table-valued function call such as read_files(...).
+        offset (int): Number of rows to skip.
+        limit (int): Maximum number of rows to return.
+        where (Optional[str]): SQL filter condition.
+        order_by (Optional[str]): SQL ORDER BY expression list.
+        session_id (Optional[str]): The browser session asking for the page. When given, a
+            newer page request from the same session cancels this one's statement.
+
+    Returns:
+        pa.Table: The rows of the page.
+    """
+    query = f"SELECT * FROM {source}"
+    if where:
+        query += f"\nWHERE {where}"
+    if order_by:
+        query += f"\nORDER BY {order_by}"
+    query += f"\nLIMIT {int(limit)} OFFSET {int(offset)}"
+    if session_id:
+        return sqlQueryLatest("query_page", session_id, query)
+    return sqlQueryArrow(query)
+
+@traced()
+def validate_file_in_warehouse(file_path: str, expected_columns: Dict[str, str], not_null_columns: Optional[Set[str]] = None, header: bool = True, delimiter: str = ",", quote_char: str = '"', encoding: str = "utf-8") -> ValidationReport:
+    """
+    Validates a whole file in a volume with a single aggregate query on the warehouse.
+
+    Every column is read as STRING and checked with try_cast against the table type, so
+    only one summary row is returned and no file data moves into the app process.
+
+    Args:
+        file_path (str): Full volume path of the CSV file.
+        expected_columns (Dict[str, str]): Column name -> data type of the target table.
+        not_null_columns (Optional[Set[str]]): Columns declared NOT NULL in the table.
+
+    Returns:
+        ValidationReport: Row count, column mismatches and per-column error counts.
+    """
+    source = read_files_source(file_path, header, delimiter, quote_char, encoding, infer_types=False)
+
+    # Resolve the file's columns without scanning it
+    file_columns = [str(col) for col in sqlQuery(f"SELECT * FROM {source} LIMIT 0").columns]
+
+    query = build_pushdown_query(source, file_columns, expected_columns, header)
+    result = sqlQuery(query)
+    return parse_pushdown_result(result, file_columns, expected_columns, not_null_columns, header)
+
+def _rows_from_insert_result(result: "pd.DataFrame") -> Optional[int]:
+    """
+    Returns the inserted row count reported by an INSERT statement, if any.
+    """
+    import pandas as pd
+    for column in ("num_inserted_rows", "num_affected_rows"):
+        if column in result.columns and not result.empty and not pd.isna(result.iloc[0][column]):
+            return int(result.iloc[0][column])
+    return None
+
+_current_user: Optional[str] = None
+
+def _warehouse_user() -> str:
+    """
+    Returns the user the app's statements run as, read once per process.
+    """
+    global _current_user
+    if _current_user is None:
+        _current_user = str(sqlQuery("SELECT current_user() AS user_name").iloc[0]["user_name"])
+    return _current_user
 
-def insert_data_to_table(catalog: str, schema: str, table: str, data: pd.DataFrame, file_path: str, header: bool = True, delimiter: str = ",", quote_char: str = '"', encoding: str = "utf-8") -> int:
+def _table_version(catalog: str, schema: str, table: str) -> Optional[int]:
+    """
+    Returns the current Delta version of a table, or None if it has no history.
+    """
+    try:
+        history = sqlQuery(f"DESCRIBE HISTORY {catalog}.{schema}.{table} LIMIT 1")
+    except Exception as e:
+        print(f"Error reading the version of {catalog}.{schema}.{table}: {str(e)}")
+        return None
+    return None if history.empty else int(history.iloc[0]["version"])
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    # MAP columns arrive either as a dict or as a list of (key, value) pairs, STRUCT columns as a dict
+    return dict(value) if isinstance(value, (dict, list, tuple)) else {}
+
+@traced()
+def _rows_from_table_history(catalog: str, schema: str, table: str, version_before: Optional[int]) -> Optional[int]:
+    """
+    Returns numOutputRows of the commit of an INSERT, from the table's history.
+
+    The commit is the first one after `version_before`, the version read before the
+    INSERT. It must be an append by this app's user outside of a job; if it is not, or
+    another such commit follows, the commit cannot be told apart from another writer's
+    and None is returned.
+    """
+    if version_before is None:
+        return None
+    history = sqlQuery(f"DESCRIBE HISTORY {catalog}.{schema}.{table} LIMIT 20")
+    commits = history[history["version"] > version_before].sort_values("version")
+    if commits.empty or int(commits.iloc[0]["version"]) != version_before + 1:
+        return None
+
+    def is_own_append(commit) -> bool:
+        # The app's statements run on a SQL warehouse, never as part of a job
+        return (
+            commit.get("operation") == "WRITE"
+            and commit.get("userName") == _warehouse_user()
+            and not _as_dict(commit.get("job")).get("jobId")
+            and _as_dict(commit.get("operationParameters")).get("mode") == "Append"
+        )
+
+    first = commits.iloc[0]
+    if not is_own_append(first) or sum(is_own_append(commit) for _, commit in commits.iloc[1:].iterrows()):
+        return None
+    metrics = _as_dict(first.get("operationMetrics"))
+    return int(metrics["numOutputRows"]) if "numOutputRows" in metrics else None
+
+# Statement states as shown in progress reports
+_STATEMENT_STATE_LABELS = {
+    "pending": "Waiting for the warehouse",
+    "running": "Running on the warehouse",
+    "succeeded": "Statement finished",
+}
+
+def _verify_row_count(rows: int, stats: Optional[UploadStats], header: bool) -> str:
+    """
+    Compares the rows written with the data lines of the staged upload, when it is still staged.
+    """
+    if stats is None:
+        return f"{rows:,} rows written"
+    expected = max(stats.line_count - (1 if header else 0), 0)
+    if expected == rows:
+        return f"{rows:,} rows written, matching the file's {expected:,} data lines"
+    # Quoted line breaks and blank lines make the two differ legitimately
+    return f"{rows:,} rows written; the file has {expected:,} data lines (quoted line breaks and blank lines count differently)"
+
+@traced()
+def _put_parquet_conversion(catalog: str, schema: str, table: str, file_path: str, header: bool, delimiter: str, quote_char: str, encoding: str, progress: Optional[ProgressReporter]) -> Optional[Tuple[str, List[str]]]:
+    """
+    Converts the staged copy of an uploaded CSV file to Parquet typed to the table and puts it next to the CSV.
+
+    Returns:
+        Optional[Tuple[str, List[str]]]: The Parquet file's volume path and column names, or None
+            if the file is not staged or cannot be converted. The CSV is then ingested as before,
+            after putting it to the volume if its PUT was deferred.
+    """
+    volume_dir, file_name = file_path.rsplit("/", 1)
+    local_path = staged_file_path(LOCAL_STAGING_DIR, file_name)
+    stats = staged_file_stats(LOCAL_STAGING_DIR, file_name)
+    if local_path is None or stats is None:
+        if progress is not None:
+            progress.skip("convert", "The file is not staged locally")
+            progress.skip("put")
+        return None
+
+    os.makedirs(PARQUET_CONVERSION_DIR, exist_ok=True)
+    fd, parquet_local_path = tempfile.mkstemp(suffix=".parquet", dir=PARQUET_CONVERSION_DIR)
+    os.close(fd)
+    try:
+        if progress is not None:
+            progress.start("convert", total=stats.size)
+        try:
+            conversion = convert_csv_to_parquet(
+                local_path,
+                parquet_local_path,
+                table_columns(describe_table(catalog, schema, table)),
+                delimiter,
+                quote_char,
+                header,
+                encoding,
+                compression=PARQUET_COMPRESSION,
+                row_group_rows=PARQUET_ROW_GROUP_ROWS,
+                on_progress=(lambda size: progress.update("convert", size)) if progress is not None else None
+            )
+        except UnsupportedConversion as e:
+            print(f"Ingesting {file_name} as CSV: {str(e)}")
+            if progress is not None:
+                progress.skip("convert", f"Ingesting the CSV instead: {str(e)}")
+            if staged_file_pinned(LOCAL_STAGING_DIR, file_name):
+                if progress is not None:
+                    progress.start("put", total=stats.size, detail="Uploading the CSV")
+                put_file_to_volume(local_path, volume_dir, file_name)
+                if progress is not None:
+                    progress.finish("put", stats.size)
+            elif progress is not None:
+                progress.skip("put")
+            return None
+
+        print(
+            f"Converted {file_name} to Parquet in {conversion.seconds}s: "
+            f"{conversion.input_bytes} -> {conversion.output_bytes} bytes, {conversion.rows} rows"
+        )
+        if progress is not None:
+            progress.finish("convert", stats.size, detail=f"{conversion.output_bytes / 1024 / 1024:,.1f} MB as Parquet")
+            progress.start("put", total=conversion.output_bytes)
+        # Named by content, so COPY INTO loads a changed file under the same name again
+        parquet_name = f"{csv_stem(file_name)}-{stats.sha256[:16]}.parquet"
+        parquet_path = put_file_to_volume(parquet_local_path, volume_dir, parquet_name)
+        if progress is not None:
+            progress.finish("put", conversion.output_bytes)
+        return parquet_path, conversion.columns
+
+    finally:
+        if os.path.exists(parquet_local_path):
+            os.remove(parquet_local_path)
+
+@traced()
+def insert_data_to_table(catalog: str, schema: str, table: str, data: Optional["pd.DataFrame"] = None, file_path: str = None, header: bool = True, delimiter: str = ",", quote_char: str = '"', encoding: str = "utf-8", progress: Optional[ProgressReporter] = None) -> int:
     """
     Insert data into a Databricks table.
+
+    The row count is taken from the INSERT statement's own result (num_inserted_rows)
+    or, if the warehouse does not report it, from the operationMetrics of the Delta
+    commit that follows the table version read before the INSERT.
+    With INGESTION_MODE=copy_into files are loaded with copy_into_table instead, so a
+    file that was already loaded is skipped and 0 is returned. With PARQUET_CONVERSION
+    the staged copy of the file is converted to Parquet typed to the table, put to the
+    volume and ingested instead of the CSV.
+
+    If `progress` is given, it receives the "insert" stage, with the statement's state and
+    the file size for estimates, and the "verify" stage; with PARQUET_CONVERSION also the
+    "convert" and "put" stages before them.
     
     Returns:
         int: Number of rows inserted
     """
+    stats = staged_file_stats(LOCAL_STAGING_DIR, file_path.split("/")[-1]) if file_path else None
+    stage = "insert"
+
     try:
-        # First, get the count of rows before insert
-        count_before = sqlQuery(f"SELECT COUNT(*) as count FROM {catalog}.{schema}.{table}").iloc[0]['count']
-        
-        # Construct the insert query with proper syntax
-        insert_query = f"""
-            INSERT INTO {catalog}.{schema}.{table}
-            SELECT * EXCEPT(_rescued_data) 
-            FROM read_files(
-                '{file_path}',
-                format => 'csv',
-                header => {str(header).lower()},
-                delimiter => '{delimiter}',
-                quote => '{quote_char}',
-                charset => '{encoding}'
-            )
-        """
-        
-        # Execute the insert
-        sqlQuery(insert_query)
-        
-        # Get the count after insert
-        count_after = sqlQuery(f"SELECT COUNT(*) as count FROM {catalog}.{schema}.{table}").iloc[0]['count']
-        
-        # Calculate rows inserted
-        rows_inserted = count_after - count_before
-        
+        parquet = None
+        if file_path and PARQUET_CONVERSION:
+            stage = "convert"
+            parquet = _put_parquet_conversion(catalog, schema, table, file_path, header, delimiter, quote_char, encoding, progress)
+            stage = "insert"
+        if progress is not None:
+            progress.start("insert", total=stats.size if stats else None, detail="Submitting statement")
+
+        if file_path and INGESTION_MODE == "copy_into":
+            if parquet:
+                volume_dir, file_name = parquet[0].rsplit("/", 1)
+                metrics = copy_into_table(catalog, schema, table, volume_dir, [file_name], file_format="PARQUET")
+            else:
+                volume_dir, file_name = file_path.rsplit("/", 1)
+                metrics = copy_into_table(catalog, schema, table, volume_dir, [file_name], header, delimiter, quote_char, encoding)
+            rows_inserted = metrics["num_inserted_rows"]
+        else:
+            # Construct the insert query with proper syntax
+            if parquet:
+                # Parquet columns are already typed; select them by name in the table's column order
+                parquet_path, columns = parquet
+                insert_query = f"""
+                    INSERT INTO {catalog}.{schema}.{table}
+                    SELECT {", ".join(quote_identifier(column) for column in columns)}
+                    FROM read_files({_sql_literal(parquet_path)}, format => 'parquet')
+                """
+            else:
+                insert_query = f"""
+                    INSERT INTO {catalog}.{schema}.{table}
+                    SELECT * EXCEPT(_rescued_data) 
+                    FROM {read_files_source(file_path, header, delimiter, quote_char, encoding)}
+                """
+            # Identifies the INSERT's commit in the history if the statement reports no row count
+            version_before = _table_version(catalog, schema, table)
+
+            # Execute the insert, reporting whether it is queued or running on the warehouse
+            result = sqlQueryAsync(
+                insert_query,
+                on_state=(lambda state: progress.update("insert", detail=_STATEMENT_STATE_LABELS.get(state, state))) if progress is not None else None
+            ).to_pandas()
+
+            # Get the number of rows inserted from the statement metrics
+            rows_inserted = _rows_from_insert_result(result)
+            stage = "verify"
+            if progress is not None:
+                progress.finish("insert", detail="Statement finished")
+                progress.start("verify", unit="rows", detail="Reading the row count")
+            if rows_inserted is None:
+                rows_inserted = _rows_from_table_history(catalog, schema, table, version_before)
+            if rows_inserted is None:
+                rows_inserted = 0
+                print(f"Row count not reported for insert into {catalog}.{schema}.{table}")
+
+        # The table has changed; make sure later lookups see fresh metadata
+        invalidate_metadata(catalog, schema, table)
+        if file_path and PARQUET_CONVERSION:
+            # The data is in the volume now, so the staged copy may be evicted again
+            pin_staged_file(LOCAL_STAGING_DIR, file_path.split("/")[-1], False)
+
+        if progress is not None:
+            if stage == "insert":
+                progress.finish("insert", detail="Statement finished")
+                progress.start("verify", unit="rows")
+            progress.finish("verify", rows_inserted, detail=_verify_row_count(rows_inserted, stats, header))
+
+        increment("rows_appended_total", rows_inserted, mode=INGESTION_MODE if file_path else "insert")
+        current_span().set_attributes(rows=rows_inserted, **{"file.bytes": stats.size if stats else None})
         return rows_inserted
             
     except Exception as e:
         print(f"Error in insert_data_to_table: {str(e)}")
-        raise Exception(f"Failed to insert data: {str(e)}")
\ No newline at end of file
+        if progress is not None:
+            progress.fail(stage, str(e))
+        raise Exception(f"Failed to insert data: {str(e)}")
+
+# Messages of server-side errors that are worth retrying
+_TRANSIENT_ERROR_MARKERS = ("TEMPORARILY_UNAVAILABLE", "429", "503", "timed out", "timeout", "Connection reset")
+
+def is_transient_error(e: Exception) -> bool:
+    """
+    Returns True for errors where retrying the same statement may succeed.
+    """
+    # The connector is imported with the first connection; until then none of its errors can occur
+    connector_errors = sys.modules.get("databricks.sql.exc")
+    if connector_errors is not None and isinstance(e, connector_errors.OperationalError):
+        return True
+    if isinstance(e, (PoolTimeout, ConnectionError, TimeoutError)):
+        return True
+    return any(marker.lower() in str(e).lower() for marker in _TRANSIENT_ERROR_MARKERS)
+
+def _sql_literal(value: str) -> str:
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def _copy_into_query(catalog: str, schema: str, table: str, source_path: str, files: Optional[List[str]], header: bool, delimiter: str, quote_char: str, encoding: str, force: bool, file_format: str = "CSV") -> str:
+    source = _sql_literal(source_path)
+    if files:
+        selection = "FILES = (" + ", ".join(_sql_literal(name) for name in files) + ")"
+    else:
+        # Compressed CSV files are decompressed by their extension
+        selection = "PATTERN = '*.parquet'" if file_format == "PARQUET" else "PATTERN = '*.{csv,csv.gz,csv.zst}'"
+
+    if file_format == "PARQUET":
+        # Parquet files carry their column names and types
+        return f"""
+        COPY INTO {catalog}.{schema}.{table}
+        FROM {source}
+        FILEFORMAT = PARQUET
+        {selection}
+        COPY_OPTIONS ('mergeSchema' = 'false', 'force' = '{str(bool(force)).lower()}')
+    """
+
+    if not header:
+        # Without a header the file columns are _c0, _c1, ... and map to the table by position
+        names = list(table_columns(describe_table(catalog, schema, table)))
+        select = ", ".join(f"_c{i} AS {quote_identifier(name)}" for i, name in enumerate(names))
+        source = f"(SELECT {select} FROM {source})"
+
+    format_options = {
+        "header": str(bool(header)).lower(),
+        "delimiter": delimiter,
+        "quote": quote_char,
+        "encoding": encoding,
+        "inferSchema": "true",
+    }
+    return f"""
+        COPY INTO {catalog}.{schema}.{table}
+        FROM {source}
+        FILEFORMAT = CSV
+        {selection}
+        FORMAT_OPTIONS ({", ".join(f"{_sql_literal(k)} = {_sql_literal(v)}" for k, v in format_options.items())})
+        COPY_OPTIONS ('mergeSchema' = 'false', 'force' = '{str(bool(force)).lower()}')
+    """
+
+@traced()
+def copy_into_table(catalog: str, schema: str, table: str, source_path: str, files: Optional[List[str]] = None, header: bool = True, delimiter: str = ",", quote_char: str = '"', encoding: str = "utf-8", force: bool = False, file_format: str = "CSV") -> Dict[str, Any]:
+    """
+    Loads CSV (or Parquet) files from a volume into a table with COPY INTO.
+
+    COPY INTO records which files a table has already loaded and skips them, so the
+    statement is idempotent: it is retried with exponential backoff on transient
+    errors without any risk of appending the same rows twice.
+
+    Args:
+        catalog (str): Target catalog.
+        schema (str): Target schema.
+        table (str): Target table.
+        source_path (str): Volume directory containing the files.
+        files (Optional[List[str]]): File names within `source_path`; None loads every file of `file_format` in it.
+        header (bool): Whether the files have a header row.
+        delimiter (str): Column delimiter.
+        quote_char (str): Quote character.
+        encoding (str): File encoding.
+        force (bool): Load the files even if they were loaded before.
+        file_format (str): CSV, or PARQUET for converted files; the CSV settings are then ignored.
+
+    Returns:
+        Dict[str, Any]: The engine's load metrics (num_affected_rows, num_inserted_rows,
+            num_skipped_corrupt_files) plus the number of attempts.
+    """
+    query = _copy_into_query(catalog, schema, table, source_path, files, header, delimiter, quote_char, encoding, force, file_format)
+
+    for attempt in range(COPY_INTO_MAX_RETRIES + 1):
+        try:
+            result = sqlQuery(query)
+            break
+        except Exception as e:
+            if attempt == COPY_INTO_MAX_RETRIES or not is_transient_error(e):
+                print(f"Error in copy_into_table: {str(e)}")
+                raise Exception(f"Failed to load data: {str(e)}")
+            delay = COPY_INTO_RETRY_BACKOFF * 2 ** attempt
+            print(f"Transient error loading into {catalog}.{schema}.{table}, retrying in {delay}s: {str(e)}")
+            time.sleep(delay)
+
+    # The table has changed; make sure later lookups see fresh metadata
+    invalidate_metadata(catalog, schema, table)
+
+    row = result.iloc[0].to_dict() if not result.empty else {}
+    metrics = {
+        column: int(row.get(column) or 0)
+        for column in ("num_affected_rows", "num_inserted_rows", "num_skipped_corrupt_files")
+    }
+    metrics["attempts"] = attempt + 1
+    return metrics
@@ -0,0 +1,483 @@
+import fcntl
+import os
+import re
+import shutil
+import threading
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+import duckdb
+import pyarrow as pa
+from databricks.sql.backend.types import CommandState
+
+_SPARK_TYPES = {
+    "TINYINT": "tinyint",
+    "SMALLINT": "smallint",
+    "INTEGER": "int",
+    "BIGINT": "bigint",
+    "HUGEINT": "decimal(38,0)",
+    "FLOAT": "float",
+    "DOUBLE": "double",
+    "BOOLEAN": "boolean",
+    "DATE": "date",
+    "TIMESTAMP": "timestamp_ntz",
+    "TIMESTAMP WITH TIME ZONE": "timestamp",
+    "VARCHAR": "string",
+    "BLOB": "binary",
+}
+_DUCKDB_TYPES = {"timestamp_ntz": "TIMESTAMP", "timestamp_ltz": "TIMESTAMPTZ"}
+_DUCKDB_FUNCTIONS = {"unix_micros": "epoch_us", "xxhash64": "hash"}
+# Statements that run under the shared lock on read-only attachments
+_READ_STATEMENTS = ("SELECT", "WITH", "SHOW", "DESCRIBE", "VALUES")
+# information_schema views that get Databricks' last_altered column
+_ALTERED_VIEWS = ("schemata", "tables")
+
+# Charsets of the CSV settings mapped to DuckDB's read_csv encodings
+_ENCODINGS = {
+    "utf-8": "utf-8",
+    "utf-16": "utf-16",
+    "utf-16le": "utf-16",
+    "utf-16be": "utf-16",
+    "iso-8859-1": "latin-1",
+    "windows-1252": "latin-1",
+}
+
+_TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<ident>`(?:[^`]|``)*`)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<op>.)
+""", re.VERBOSE | re.DOTALL)
+
+
+class UnsupportedStatement(Exception):
+    """Raised for Databricks statements the local warehouse does not emulate."""
+
+
+def _unescape(literal: str) -> str:
+    # Spark string literals use backslash escapes, DuckDB's doubled quotes
+    return re.sub(r"\\(.)", lambda m: {"n": "\n", "t": "\t", "r": "\r"}.get(m.group(1), m.group(1)), literal[1:-1])
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _tokenize(query: str) -> List[Tuple[str, str]]:
+    return [(match.lastgroup, match.group()) for match in _TOKEN.finditer(query)]
+
+
+def _alias(catalog: str) -> str:
+    # Catalogs are attached under an alias, since DuckDB reserves names such as "main"
+    return _identifier(f"uc_{catalog}")
+
+
+def _spark_type(duckdb_type: str) -> str:
+    if duckdb_type.startswith("DECIMAL"):
+        return duckdb_type.lower().replace(" ", "")
+    return _SPARK_TYPES.get(duckdb_type, duckdb_type.lower())
+
+
+class DuckDBWarehouse:
+    """
+    A local stand-in for the Databricks SQL Warehouse that runs statements on DuckDB.
+
+    With SQL_BACKEND=duckdb, dbutils opens connections with DuckDBWarehouse.connect instead
+    of databricks.sql.connect. The connections and cursors implement the part of the
+    connector's API that dbutils and the connection pool use. The app can then be run,
+    profiled and load-tested on a laptop or CI machine.
+
+    Statements are written in Databricks SQL and translated to DuckDB. Each catalog is a
+    DuckDB database file in `<root>/catalogs`. A volume path /Volumes/<catalog>/<schema>/<volume>/...
+    is the directory `<root>/volumes/<catalog>/<schema>/<volume>/...`. Emulated:
+
+        SHOW CATALOGS, SHOW SCHEMAS IN c, SHOW TABLES IN c.s, DESCRIBE TABLE c.s.t (Spark type names)
+        CREATE CATALOG [IF NOT EXISTS] c
+        PUT '<local file>' INTO '/Volumes/...' [OVERWRITE]
+        read_files('/Volumes/...', format => 'csv' | 'parquet', ...), with a _rescued_data
+            column and _c0, _c1, ... names without a header
+        INSERT INTO, returning num_affected_rows and num_inserted_rows
+        `quoted` identifiers, backslash escapes, SELECT * EXCEPT(...), TIMESTAMP_NTZ/_LTZ,
+            unix_micros and <catalog>.information_schema.<view>; schemata and tables get a
+            last_altered column, the modification time of the catalog's database file
+
+    COPY INTO and DESCRIBE HISTORY raise UnsupportedStatement.
+
+    A DuckDB file can be opened by many readers or by one writer, across all processes
+    (web server, background callbacks, job workers). Reads (SELECT, SHOW, DESCRIBE) hold a
+    shared file lock and attach the catalogs read-only, so they run concurrently; other
+    statements hold the lock exclusively. A statement waiting for the lock reports PENDING,
+    like one queued on a busy warehouse.
+
+    Args:
+        root (str): Directory holding the catalog database files and the volumes.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.catalog_dir = os.path.join(self.root, "catalogs")
+        self.volume_dir = os.path.join(self.root, "volumes")
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        os.makedirs(self.volume_dir, exist_ok=True)
+        self._lock_path = os.path.join(self.root, ".lock")
+        self._running: Dict[str, duckdb.DuckDBPyConnection] = {}
+        self._running_lock = threading.Lock()
+
+    def connect(self) -> "DuckDBConnection":
+        return DuckDBConnection(self)
+
+    def catalogs(self) -> List[str]:
+        return sorted(name[:-len(".duckdb")] for name in os.listdir(self.catalog_dir) if name.endswith(".duckdb"))
+
+    def _catalog_path(self, catalog: str) -> str:
+        return os.path.join(self.catalog_dir, catalog + ".duckdb")
+
+    def local_path(self, volume_path: str) -> str:
+        """
+        Returns the local path of a /Volumes/... path.
+        """
+        path = volume_path[len("dbfs:"):] if volume_path.startswith("dbfs:") else volume_path
+        if not path.startswith("/Volumes/"):
+            raise UnsupportedStatement(f"Only /Volumes paths are emulated: {volume_path}")
+        local = os.path.normpath(os.path.join(self.volume_dir, path[len("/Volumes/"):]))
+        if not local.startswith(self.volume_dir + os.sep):
+            raise UnsupportedStatement(f"Invalid volume path: {volume_path}")
+        return local
+
+    def cancel_command(self, command_id: str) -> None:
+        with self._running_lock:
+            connection = self._running.get(command_id)
+        # Statements of other processes are not reachable; they run to completion
+        if connection is not None:
+            connection.interrupt()
+
+    def execute(self, query: str, command_id: str, on_running=None) -> pa.Table:
+        """
+        Translates and runs one statement, holding the cross-process lock while it runs.
+        """
+        special = self._special_statement(query)
+        if special is not None and special[0] == "put":
+            return self._put(*special[1:])
+        read_only = special[0] != "create_catalog" if special is not None else (
+            query.lstrip().split(None, 1)[:1] or [""]
+        )[0].upper() in _READ_STATEMENTS
+
+        with open(self._lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH if read_only else fcntl.LOCK_EX)
+            if on_running is not None:
+                on_running()
+            connection = duckdb.connect(":memory:")
+            with self._running_lock:
+                self._running[command_id] = connection
+            try:
+                catalogs = self.catalogs()
+                for catalog in catalogs:
+                    connection.execute(
+                        f"ATTACH {_literal(self._catalog_path(catalog))} AS {_alias(catalog)}"
+                        + (" (READ_ONLY)" if read_only else "")
+                    )
+                if special is not None:
+                    return self._run_special(connection, special)
+                result = connection.execute(self.translate(query, catalogs))
+                table = result.to_arrow_table() if hasattr(result, "to_arrow_table") else result.fetch_arrow_table()
+                if query.lstrip().upper().startswith("INSERT"):
+                    rows = table.column(0)[0].as_py() if table.num_rows else 0
+                    return pa.table({"num_affected_rows": [rows], "num_inserted_rows": [rows]})
+                return table
+            finally:
+                with self._running_lock:
+                    self._running.pop(command_id, None)
+                connection.close()
+
+    def _special_statement(self, query: str) -> Optional[Tuple]:
+        statement = " ".join(query.split()).rstrip(";")
+        upper = statement.upper()
+        if upper == "SHOW CATALOGS":
+            return ("catalogs",)
+        match = re.fullmatch(r"SHOW SCHEMAS IN (\S+)", statement, re.IGNORECASE)
+        if match:
+            return ("schemas", self._names(match.group(1), 1))
+        match = re.fullmatch(r"SHOW TABLES IN (\S+)", statement, re.IGNORECASE)
+        if match:
+            return ("tables", self._names(match.group(1), 2))
+        match = re.fullmatch(r"DESCRIBE (?:TABLE )?(?!HISTORY )(\S+)", statement, re.IGNORECASE)
+        if match:
+            return ("describe", self._names(match.group(1), 3))
+        match = re.fullmatch(r"CREATE CATALOG (IF NOT EXISTS )?(\S+)", statement, re.IGNORECASE)
+        if match:
+            return ("create_catalog", self._names(match.group(2), 1)[0], bool(match.group(1)))
+        # Paths are matched in the original text, since they may contain runs of spaces
+        match = re.fullmatch(r"\s*PUT\s+'([^']*)'\s+INTO\s+'([^']*)'(\s+OVERWRITE)?\s*;?\s*", query, re.IGNORECASE)
+        if match:
+            return ("put", match.group(1), match.group(2), bool(match.group(3)))
+        if upper.startswith(("COPY INTO", "DESCRIBE HISTORY")):
+            raise UnsupportedStatement(f"Not emulated by the local DuckDB warehouse: {' '.join(statement.split()[:2])}")
+        return None
+
+    @staticmethod
+    def _names(dotted: str, count: int) -> List[str]:
+        names = [name.strip("`") for name in re.findall(r"`(?:[^`]|``)*`|[^.]+", dotted)]
+        if len(names) != count:
+            raise UnsupportedStatement(f"Expected a {count}-part name: {dotted}")
+        return names
+
+    def _put(self, source: str, target: str, overwrite: bool) -> pa.Table:
+        local_target = self.local_path(target)
+        if os.path.exists(local_target) and not overwrite:
+            raise FileExistsError(f"{target} already exists")
+        os.makedirs(os.path.dirname(local_target), exist_ok=True)
+        shutil.copyfile(source, local_target)
+        return pa.table({})
+
+    def _run_special(self, connection: duckdb.DuckDBPyConnection, special: Tuple) -> pa.Table:
+        kind = special[0]
+        if kind == "catalogs":
+            return pa.table({"catalog": self.catalogs()})
+        if kind == "create_catalog":
+            name, if_not_exists = special[1], special[2]
+            if name in self.catalogs() and not if_not_exists:
+                raise UnsupportedStatement(f"Catalog {name} already exists")
+            connection.execute(f"ATTACH {_literal(self._catalog_path(name))} AS {_alias(name)}")
+            return pa.table({})
+        if kind == "schemas":
+            rows = connection.execute(
+                "SELECT schema_name FROM duckdb_schemas() WHERE database_name = ? AND NOT internal ORDER BY 1",
+                [f"uc_{special[1][0]}"]
+            ).fetchall()
+            return pa.table({"databaseName": [row[0] for row in rows]})
+        if kind == "tables":
+            catalog, schema = special[1]
+            rows = connection.execute(
+                "SELECT table_name FROM duckdb_tables() WHERE database_name = ? AND schema_name = ? ORDER BY 1",
+                [f"uc_{catalog}", schema]
+            ).fetchall()
+            return pa.table({
+                "database": [schema] * len(rows),
+                "tableName": [row[0] for row in rows],
+                "isTemporary": [False] * len(rows),
+            })
+        # describe
+        catalog, schema, table = special[1]
+        rows = connection.execute(f"DESCRIBE {_alias(catalog)}.{_identifier(schema)}.{_identifier(table)}").fetchall()
+        return pa.table({
+            "col_name": [row[0] for row in rows],
+            "data_type": [_spark_type(row[1]) for row in rows],
+            "comment": [None] * len(rows),
+        })
+
+    def translate(self, query: str, catalogs: List[str]) -> str:
+        """
+        Rewrites a Databricks SQL statement in DuckDB's dialect.
+        """
+        tokens = _tokenize(query)
+        out: List[str] = []
+        i = 0
+        while i < len(tokens):
+            kind, text = tokens[i]
+            following = self._next_tokens(tokens, i + 1, 4)
+            if kind == "word" and text.lower() == "read_files" and following[:1] == ["("]:
+                call, i = self._read_files(tokens, i)
+                out.append(call)
+                continue
+            if (kind in ("word", "ident") and following[:3] == [".", "information_schema", "."]
+                    and len(following) == 4):
+                # <catalog>.information_schema.<view> becomes the view filtered to the catalog
+                catalog = text.strip("`")
+                view = following[3]
+                i = self._skip(tokens, i + 1, 4)
+                column = "catalog_name" if view.lower() == "schemata" else "table_catalog"
+                altered = f", {self._last_altered(catalog)} AS last_altered" if view.lower() in _ALTERED_VIEWS else ""
+                out.append(f"(SELECT *{altered} FROM information_schema.{view} WHERE {column} = {_literal('uc_' + catalog)})")
+                continue
+            if (kind in ("word", "ident") and text.strip("`") in catalogs and following[:1] == ["."]
+                    and self._previous(out) != "."):
+                out.append(_alias(text.strip("`")))
+                i += 1
+                continue
+            if kind == "str":
+                out.append(_literal(_unescape(text)))
+            elif kind == "ident":
+                out.append(_identifier(text[1:-1].replace("``", "`")))
+            elif kind == "word" and text.upper() == "EXCEPT" and self._previous(out) == "*":
+                out.append("EXCLUDE")
+            elif kind == "word" and text.lower() in _DUCKDB_FUNCTIONS and following[:1] == ["("]:
+                out.append(_DUCKDB_FUNCTIONS[text.lower()])
+            elif kind == "word":
+                out.append(_DUCKDB_TYPES.get(text.lower(), text))
+            else:
+                out.append(text)
+            i += 1
+        return "".join(out)
+
+    def _last_altered(self, catalog: str) -> str:
+        # DuckDB keeps no modification times, so every object of a catalog shares its file's
+        path = self._catalog_path(catalog)
+        modified = datetime.fromtimestamp(os.path.getmtime(path) if os.path.exists(path) else 0, timezone.utc)
+        return f"CAST({_literal(modified.strftime('%Y-%m-%d %H:%M:%S.%f'))} AS TIMESTAMP)"
+
+    @staticmethod
+    def _previous(out: List[str]) -> Optional[str]:
+        for text in reversed(out):
+            if text.strip():
+                return text
+        return None
+
+    @staticmethod
+    def _next_tokens(tokens: List[Tuple[str, str]], start: int, count: int) -> List[str]:
+        found = []
+        for kind, text in tokens[start:]:
+            if kind == "ws":
+                continue
+            found.append(text.lower() if kind == "word" else text)
+            if len(found) == count:
+                break
+        return found
+
+    @staticmethod
+    def _skip(tokens: List[Tuple[str, str]], start: int, count: int) -> int:
+        i = start
+        while count and i < len(tokens):
+            if tokens[i][0] != "ws":
+                count -= 1
+            i += 1
+        return i
+
+    def _read_files(self, tokens: List[Tuple[str, str]], start: int) -> Tuple[str, int]:
+        """
+        Replaces read_files(path, option => value, ...) with read_csv or read_parquet.
+        """
+        args: List[Any] = []
+        i = start + 1
+        while tokens[i][1] != "(":
+            i += 1
+        i += 1
+        current: List[Tuple[str, str]] = []
+        while i < len(tokens):
+            kind, text = tokens[i]
+            if kind == "op" and text in ",)":
+                args.append([token for token in current if token[0] != "ws"])
+                current = []
+                if text == ")":
+                    break
+            else:
+                current.append((kind, text))
+            i += 1
+
+        path = _unescape(args[0][0][1])
+        options = {}
+        for arg in args[1:]:
+            # name => value arrives as word, "=", ">", value
+            name, value = arg[0][1].lower(), arg[-1]
+            options[name] = _unescape(value[1]) if value[0] == "str" else value[1].lower()
+
+        local = _literal(self.local_path(path))
+        if options.get("format", "csv") == "parquet":
+            return f"read_parquet({local})", i + 1
+
+        header = options.get("header", "false") == "true"
+        csv_options = [
+            f"header = {str(header).lower()}",
+            f"delim = {_literal(options.get('delimiter', ','))}",
+            f"quote = {_literal(options.get('quote', chr(34)))}",
+            f"encoding = {_literal(_ENCODINGS.get(options.get('charset', 'utf-8').lower(), options.get('charset', 'utf-8')))}",
+            f"all_varchar = {str(options.get('infercolumntypes', 'true') == 'false').lower()}",
+        ]
+        source = f"read_csv({local}, {', '.join(csv_options)})"
+        # Spark names header-less columns _c0, _c1, ... and adds the _rescued_data column
+        columns = "*" if header else r"COLUMNS('^column0*(\d+)$') AS '_c\1'"
+        return f"(SELECT {columns}, CAST(NULL AS VARCHAR) AS _rescued_data FROM {source})", i + 1
+
+
+class DuckDBCursor:
+    """A cursor of DuckDBConnection, with the Databricks connector cursor's methods used by dbutils."""
+
+    def __init__(self, warehouse: DuckDBWarehouse):
+        self._warehouse = warehouse
+        self._result: Optional[pa.Table] = None
+        self._error: Optional[BaseException] = None
+        self._state = CommandState.CLOSED
+        self._thread: Optional[threading.Thread] = None
+        self.active_command_id: Optional[str] = None
+        self.query_id: Optional[str] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self, query: str) -> None:
+        try:
+            self._result = self._warehouse.execute(query, self.active_command_id, on_running=self._set_running)
+            self._state = CommandState.SUCCEEDED
+        except duckdb.InterruptException as e:
+            self._error = e
+            self._state = CommandState.CANCELLED
+        except Exception as e:
+            self._error = e
+            self._state = CommandState.FAILED
+
+    def _set_running(self) -> None:
+        if self._state == CommandState.PENDING:
+            self._state = CommandState.RUNNING
+
+    def _submit(self, query: str) -> None:
+        self.active_command_id = self.query_id = uuid.uuid4().hex
+        self._result, self._error = None, None
+        self._state = CommandState.PENDING
+
+    def execute(self, query: str) -> "DuckDBCursor":
+        self._submit(query)
+        self._run(query)
+        self.get_async_execution_result()
+        return self
+
+    def execute_async(self, query: str) -> None:
+        self._submit(query)
+        self._thread = threading.Thread(target=self._run, args=(query,), daemon=True)
+        self._thread.start()
+
+    def get_query_state(self) -> CommandState:
+        return self._state
+
+    def get_async_execution_result(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def cancel(self) -> None:
+        if self.active_command_id is not None:
+            self._warehouse.cancel_command(self.active_command_id)
+
+    def fetchall_arrow(self) -> pa.Table:
+        return self._result if self._result is not None else pa.table({})
+
+    def fetchall(self) -> List[tuple]:
+        table = self.fetchall_arrow()
+        return list(zip(*(column.to_pylist() for column in table.columns)))
+
+    def close(self) -> None:
+        if self._state in (CommandState.PENDING, CommandState.RUNNING):
+            self.cancel()
+
+
+class DuckDBConnection:
+    """A connection to the local warehouse; statements open their own DuckDB connection."""
+
+    def __init__(self, warehouse: DuckDBWarehouse):
+        self.session = SimpleNamespace(backend=warehouse)
+        self._warehouse = warehouse
+
+    def cursor(self) -> DuckDBCursor:
+        return DuckDBCursor(self._warehouse)
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,57 @@
+from flask import Flask, jsonify, request
+from job_queue import FINISHED_STATES
+from job_worker import JOB_KINDS, get_job_queue, submit_append_job
+
+_APPEND_PARAMS = ("catalog", "schema", "table", "file_path")
+_CSV_SETTINGS = {"header": True, "delimiter": ",", "quote_char": '"', "encoding": "utf-8"}
+
+
+def register_job_routes(server: Flask) -> None:
+    """
+    Registers the job status API on the Flask server underlying the Dash app.
+
+    Protocol:
+        GET  /api/jobs?state=<state>&limit=N  -> most recent jobs, newest first
+        POST /api/jobs                        {"kind": "append", "params": {...}} -> the queued job
+        GET  /api/jobs/<id>                   -> job state, attempts, result and last error
+        POST /api/jobs/<id>/cancel            -> cancel a job that has not started yet
+    """
+
+    @server.route("/api/jobs", methods=["GET"])
+    def list_jobs():
+        limit = min(max(request.args.get("limit", 100, type=int), 1), 1000)
+        return jsonify(jobs=get_job_queue().list(limit=limit, state=request.args.get("state")))
+
+    @server.route("/api/jobs", methods=["POST"])
+    def create_job():
+        body = request.get_json(silent=True) or {}
+        kind = body.get("kind")
+        params = body.get("params") or {}
+
+        if kind not in JOB_KINDS:
+            return jsonify(error=f"Unknown job kind. Expected one of: {', '.join(JOB_KINDS)}."), 400
+        missing = [name for name in _APPEND_PARAMS if not params.get(name)]
+        if missing:
+            return jsonify(error=f"Missing parameters: {', '.join(missing)}."), 400
+
+        csv_settings = {name: params.get(name, default) for name, default in _CSV_SETTINGS.items()}
+        job_id = submit_append_job(params["catalog"], params["schema"], params["table"], params["file_path"], csv_settings)
+        return jsonify(get_job_queue().get(job_id)), 201
+
+    @server.route("/api/jobs/<job_id>", methods=["GET"])
+    def get_job(job_id):
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify(error="Job not found."), 404
+        return jsonify(job)
+
+    @server.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+    def cancel_job(job_id):
+        queue = get_job_queue()
+        job = queue.get(job_id)
+        if job is None:
+            return jsonify(error="Job not found."), 404
+        if not queue.cancel(job_id):
+            state = "finished" if job["state"] in FINISHED_STATES else "already running"
+            return jsonify(error=f"Job is {state} and cannot be cancelled."), 409
+        return jsonify(queue.get(job_id))
@@ -0,0 +1,213 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state_run_after ON jobs (state, run_after);
+"""
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+class JobQueue:
+    """
+    Persistent job queue in a local SQLite database shared by the web and worker processes.
+
+    A job moves from queued to running when a worker claims it, and ends as succeeded,
+    failed or cancelled. Running jobs are kept alive by worker heartbeats; a job whose
+    heartbeat stops (worker killed, app restarted) is handed to the next worker that
+    asks for work, flagged as interrupted. Each call opens its own connection, so the
+    queue can be used from any thread or process.
+
+    Args:
+        path (str): Path of the SQLite database file.
+        heartbeat_timeout (float): Seconds without a heartbeat after which a running job
+            is considered abandoned.
+    """
+
+    def __init__(self, path: str, heartbeat_timeout: float = 60.0):
+        self.path = path
+        self.heartbeat_timeout = heartbeat_timeout
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            # WAL lets the status page read while workers write
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, kind: str, params: Dict[str, Any], max_attempts: int = 1) -> str:
+        """
+        Adds a job to the queue and returns its id.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, state, max_attempts, run_after, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), QUEUED, max(1, max_attempts), now, now)
+            )
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically takes the oldest due job for `worker`.
+
+        Returns:
+            Optional[Dict]: The job, with "interrupted" set if a previous worker abandoned
+                it while running, or None if no job is due.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs "
+                    "WHERE (state = ? AND run_after <= ?) OR (state = ? AND heartbeat_at < ?) "
+                    "ORDER BY run_after LIMIT 1",
+                    (QUEUED, now, RUNNING, now - self.heartbeat_timeout)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET state = ?, attempts = attempts + 1, started_at = ?, "
+                    "heartbeat_at = ?, worker = ? WHERE id = ?",
+                    (RUNNING, now, now, worker, row["id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        job = _row_to_job(row)
+        job["interrupted"] = row["state"] == RUNNING
+        job["attempts"] += 1
+        job["state"] = RUNNING
+        job["worker"] = worker
+        return job
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """
+        Marks a running job as alive. Returns False if the worker no longer owns it.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND state = ? AND worker = ?",
+                (time.time(), job_id, RUNNING, worker)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, error = NULL, finished_at = ? "
+                "WHERE id = ? AND worker = ?",
+                (SUCCEEDED, json.dumps(result), time.time(), job_id, worker)
+            )
+
+    def fail(self, job_id: str, worker: str, error: str, retry_in: Optional[float] = None) -> None:
+        """
+        Records a failed attempt. The job is queued again after `retry_in` seconds, or
+        marked failed if `retry_in` is None.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            if retry_in is None:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, error = ?, finished_at = ? WHERE id = ? AND worker = ?",
+                    (FAILED, error, now, job_id, worker)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, error = ?, run_after = ?, heartbeat_at = NULL "
+                    "WHERE id = ? AND worker = ?",
+                    (QUEUED, error, now + retry_in, job_id, worker)
+                )
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a job that has not started yet. Returns False if it is already running or finished.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, finished_at = ? WHERE id = ? AND state = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list(self, limit: int = 100, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the most recent jobs, newest first.
+        """
+        query = "SELECT * FROM jobs"
+        args: list = []
+        if state:
+            query += " WHERE state = ?"
+            args.append(state)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(query, args).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def purge(self, older_than: float) -> int:
+        """
+        Removes finished jobs that ended more than `older_than` seconds ago.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE state IN ({', '.join('?' for _ in FINISHED_STATES)}) AND finished_at < ?",
+                (*FINISHED_STATES, time.time() - older_than)
+            )
+            return cursor.rowcount
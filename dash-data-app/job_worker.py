@@ -0,0 +1,199 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from connection_pool import PoolTimeout
+from dbutils import insert_data_to_table, is_transient_error
+from job_queue import JobQueue
+from progress import ProgressReporter
+from tracing import current_traceparent, span
+from config import (
+    INGESTION_MODE,
+    JOB_QUEUE_PATH,
+    JOB_WORKERS,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF,
+    JOB_POLL_INTERVAL,
+    JOB_HEARTBEAT_INTERVAL,
+    JOB_HEARTBEAT_TIMEOUT,
+    JOB_RETENTION,
+    PARQUET_CONVERSION
+)
+
+
+@lru_cache(maxsize=None)
+def get_job_queue() -> JobQueue:
+    """
+    Returns the job queue of this process.
+    """
+    return JobQueue(JOB_QUEUE_PATH, heartbeat_timeout=JOB_HEARTBEAT_TIMEOUT)
+
+
+# Stages reported by append jobs (see dbutils.insert_data_to_table)
+APPEND_STAGES = (
+    [("convert", "Converting to Parquet"), ("put", "Uploading to the volume")] if PARQUET_CONVERSION else []
+) + [("insert", "Writing rows"), ("verify", "Verifying")]
+
+
+@dataclass
+class JobKind:
+    """How the workers run one kind of job."""
+    # Called with the job's parameters and id; the id doubles as its progress operation id
+    run: Callable[[Dict[str, Any], str], Dict[str, Any]]
+    # Whether a failed attempt may be run again, given the error it raised
+    is_retryable: Callable[[Exception], bool]
+    # Whether an attempt that was cut off by a restart may be run again
+    rerun_interrupted: Callable[[], bool]
+
+
+def _run_append(params: Dict[str, Any], job_id: str) -> Dict[str, Any]:
+    # Continues the trace of the callback that queued the job, if it was traced
+    with span("job_worker.append", traceparent=params.get("traceparent"), **{"job.id": job_id}):
+        rows = insert_data_to_table(
+            catalog=params["catalog"],
+            schema=params["schema"],
+            table=params["table"],
+            file_path=params["file_path"],
+            header=params.get("header", True),
+            delimiter=params.get("delimiter", ","),
+            quote_char=params.get("quote_char", '"'),
+            encoding=params.get("encoding", "utf-8"),
+            progress=ProgressReporter(job_id, APPEND_STAGES)
+        )
+    return {"rows": rows}
+
+
+def _error_chain(error: Exception) -> List[BaseException]:
+    # insert_data_to_table wraps the original error
+    chain = []
+    while error is not None and len(chain) < 5:
+        chain.append(error)
+        error = error.__context__
+    return chain
+
+
+def _append_is_retryable(error: Exception) -> bool:
+    # COPY INTO skips files it already loaded, so it can always be repeated. An INSERT is
+    # only repeated if it never reached the warehouse, otherwise rows could be appended twice.
+    if INGESTION_MODE == "copy_into":
+        return any(is_transient_error(e) for e in _error_chain(error))
+    return any(isinstance(e, PoolTimeout) for e in _error_chain(error))
+
+
+JOB_KINDS: Dict[str, JobKind] = {
+    "append": JobKind(
+        run=_run_append,
+        is_retryable=_append_is_retryable,
+        rerun_interrupted=lambda: INGESTION_MODE == "copy_into"
+    ),
+}
+
+
+def submit_append_job(catalog: str, schema: str, table: str, file_path: str, csv_settings: Dict[str, Any]) -> str:
+    """
+    Queues an append of a volume file to a table and returns the job id.
+    """
+    params = {"catalog": catalog, "schema": schema, "table": table, "file_path": file_path, **csv_settings}
+    if current_traceparent() is not None:
+        params["traceparent"] = current_traceparent()
+    return get_job_queue().enqueue("append", params, max_attempts=JOB_MAX_ATTEMPTS)
+
+
+def _keep_alive(queue: JobQueue, job_id: str, worker: str, done: threading.Event) -> None:
+    while not done.wait(JOB_HEARTBEAT_INTERVAL):
+        try:
+            queue.heartbeat(job_id, worker)
+        except Exception as e:
+            print(f"Error sending heartbeat for job {job_id}: {str(e)}")
+
+
+def run_job(queue: JobQueue, job: Dict[str, Any], worker: str) -> None:
+    """
+    Runs one claimed job and records its outcome, retrying with exponential backoff.
+    """
+    kind = JOB_KINDS.get(job["kind"])
+    if kind is None:
+        queue.fail(job["id"], worker, f"Unknown job kind: {job['kind']}")
+        return
+    if job["interrupted"] and not kind.rerun_interrupted():
+        queue.fail(
+            job["id"],
+            worker,
+            "The job was interrupted by a restart while running and may have been partially applied. "
+            "Check the table history before submitting it again."
+        )
+        return
+
+    done = threading.Event()
+    heartbeat = threading.Thread(target=_keep_alive, args=(queue, job["id"], worker, done), daemon=True)
+    heartbeat.start()
+    try:
+        result = kind.run(job["params"], job["id"])
+    except Exception as e:
+        print(f"Error in job {job['id']} (attempt {job['attempts']}): {str(e)}")
+        retry = job["attempts"] < job["max_attempts"] and kind.is_retryable(e)
+        queue.fail(job["id"], worker, str(e), JOB_RETRY_BACKOFF * 2 ** (job["attempts"] - 1) if retry else None)
+    else:
+        queue.complete(job["id"], worker, result)
+    finally:
+        done.set()
+        heartbeat.join()
+
+
+def run_worker(worker: str, parent_pid: Optional[int] = None) -> None:
+    """
+    Claims and runs jobs until the process is stopped or, if `parent_pid` is given, its parent exits.
+    """
+    queue = get_job_queue()
+    queue.purge(JOB_RETENTION)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+
+    while not stopping.is_set():
+        if parent_pid is not None and os.getppid() != parent_pid:
+            break
+        try:
+            job = queue.claim(worker)
+        except Exception as e:
+            print(f"Error claiming a job in {worker}: {str(e)}")
+            job = None
+        if job is None:
+            stopping.wait(JOB_POLL_INTERVAL)
+            continue
+        run_job(queue, job, worker)
+
+
+def start_job_workers(count: int = JOB_WORKERS) -> List[multiprocessing.Process]:
+    """
+    Starts `count` worker processes that stop when this process exits.
+
+    Workers are spawned rather than forked so they do not inherit the web process's
+    connection pool and threads.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(count):
+        worker = f"{socket.gethostname()}-{os.getpid()}-{index}"
+        process = context.Process(
+            target=run_worker,
+            args=(worker, os.getpid()),
+            name=f"job-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+    return processes
+
+
+if __name__ == "__main__":
+    # Run workers without the web app: python job_worker.py
+    processes = start_job_workers(max(1, JOB_WORKERS))
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,284 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import diskcache
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Returns the approximate in-memory size of a cached value in bytes.
+    """
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        # pandas DataFrame
+        return int(memory_usage(index=True, deep=True).sum())
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        # pyarrow Table / numpy array
+        return nbytes
+    return len(repr(value))
+
+
+class InvalidationLog:
+    """
+    Invalidations published to every process that caches metadata.
+
+    Appends run in job worker processes and background callbacks in their own processes,
+    while the preview that shows the table runs in the web server; each has its own
+    MetadataCache. An invalidation is published under an increasing version in a diskcache
+    directory shared by all of them, and each process applies the ones it has not seen
+    before its next lookup.
+
+    Args:
+        directory (str): diskcache directory shared by the processes.
+        expire (float): Seconds an invalidation is kept; a process that has not looked for
+            longer than that clears its whole cache instead.
+    """
+
+    def __init__(self, directory: str, expire: float):
+        self._directory = directory
+        self._expire = expire
+        self._cache: Optional[diskcache.Cache] = None
+        self._seen: Optional[int] = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        # The SQLite connections of the parent must not be used by a forked child
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def _get_cache(self) -> diskcache.Cache:
+        if self._cache is None:
+            self._cache = diskcache.Cache(self._directory)
+        return self._cache
+
+    def publish(self, path: Tuple[Optional[str], ...]) -> None:
+        """
+        Publishes the invalidation of a (catalog, schema, table) path; None parts are unset.
+        """
+        cache = self._get_cache()
+        with cache.transact():
+            version = cache.incr("version")
+            cache.set(("path", version), path, expire=self._expire)
+
+    def unseen(self) -> List[Optional[Tuple[Optional[str], ...]]]:
+        """
+        Returns the paths published since the last call of this process, oldest first.
+
+        A path that expired before it was seen is returned as None, meaning everything
+        must be invalidated. The first call only records the current version.
+        """
+        with self._lock:
+            cache = self._get_cache()
+            version = cache.get("version", 0)
+            seen, self._seen = self._seen, version
+            if seen is None or version <= seen:
+                return []
+            return [cache.get(("path", v), None) for v in range(seen + 1, version + 1)]
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "loaded_at", "expires_at", "refreshing")
+
+    def __init__(self, value: Any, size: int, ttl: float):
+        self.value = value
+        self.size = size
+        self.loaded_at = time.monotonic()
+        self.expires_at = self.loaded_at + ttl
+        self.refreshing = False
+
+
+class MetadataCache:
+    """
+    Thread-safe TTL/LRU cache for Unity Catalog metadata lookups.
+
+    Entries are addressed by a kind (e.g. "schemas") and a key tuple that starts
+    with the catalog/schema/table path, which allows invalidating a whole subtree.
+    Expired entries are served for up to `stale_ttl` more seconds while a
+    background thread reloads them (stale-while-revalidate).
+
+    Args:
+        ttls (Dict[str, float]): Time to live in seconds per kind.
+        default_ttl (float): Time to live for kinds missing from `ttls`.
+        stale_ttl (float): Seconds after expiry during which a stale value is still served.
+        max_entries (int): Maximum number of cached entries.
+        max_bytes (int): Maximum estimated size of all cached values.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 300.0,
+        stale_ttl: float = 600.0,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Tuple], _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._loading: Dict[Tuple[str, Tuple], threading.Event] = {}
+        # Loads still in flight when their entry is invalidated must not store their result.
+        # Every invalidation gets a sequence number; a load remembers the number it started
+        # at and is discarded if its key was invalidated after that.
+        self._sequence = 0
+        self._invalidated: Dict[Tuple[Optional[str], Tuple], int] = {}  # (kind, path) -> sequence
+        self._load_starts: Dict[int, int] = {}  # sequence at start -> loads in flight
+
+        # Statistics
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, kind: str, key: Tuple[Hashable, ...], loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for (kind, key), calling `loader` on a miss.
+
+        Concurrent misses for the same entry share a single load.
+        """
+        cache_key = (kind, tuple(key))
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                entry = self._entries.get(cache_key)
+                if entry is not None and now < entry.expires_at:
+                    self._entries.move_to_end(cache_key)
+                    self._hits += 1
+                    return entry.value
+
+                if entry is not None and now < entry.expires_at + self.stale_ttl:
+                    self._entries.move_to_end(cache_key)
+                    self._stale_hits += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        threading.Thread(
+                            target=self._refresh, args=(cache_key, entry, loader, self._begin_load()), daemon=True
+                        ).start()
+                    return entry.value
+
+                pending = self._loading.get(cache_key)
+                if pending is None:
+                    pending = self._loading[cache_key] = threading.Event()
+                    started = self._begin_load()
+                    self._misses += 1
+                    break
+
+            # Another thread is loading this entry; wait for it and look again
+            pending.wait()
+
+        try:
+            value = loader()
+            self._store(cache_key, value, started)
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(cache_key, None)
+                self._end_load(started)
+            pending.set()
+
+    def invalidate(self, *path: Hashable, kind: Optional[str] = None) -> int:
+        """
+        Drops cached entries whose key starts with `path`, optionally restricted to one kind.
+
+        Loads and refreshes of such entries that are still in flight are discarded when they
+        finish; those of other entries are stored as usual. Calling it without arguments
+        clears the whole cache. Returns the number of removed entries.
+        """
+        with self._lock:
+            self._sequence += 1
+            if self._load_starts:
+                self._invalidated[(kind, tuple(path))] = self._sequence
+                # Invalidations older than every load in flight cannot discard anything anymore
+                oldest = min(self._load_starts)
+                self._invalidated = {target: sequence for target, sequence in self._invalidated.items() if sequence > oldest}
+            else:
+                self._invalidated.clear()
+            doomed = [
+                cache_key for cache_key in self._entries
+                if (kind is None or cache_key[0] == kind) and cache_key[1][:len(path)] == path
+            ]
+            for cache_key in doomed:
+                self._bytes -= self._entries.pop(cache_key).size
+            return len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns entry count, size and hit/miss counters.
+        """
+        with self._lock:
+            lookups = self._hits + self._stale_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": (self._hits + self._stale_hits) / lookups if lookups else 0.0,
+            }
+
+    def _begin_load(self) -> int:
+        # Called with the lock held; returns the sequence the load started at
+        self._load_starts[self._sequence] = self._load_starts.get(self._sequence, 0) + 1
+        return self._sequence
+
+    def _end_load(self, started: int) -> None:
+        # Called with the lock held
+        self._load_starts[started] -= 1
+        if not self._load_starts[started]:
+            del self._load_starts[started]
+
+    def _invalidated_since(self, cache_key: Tuple[str, Tuple], started: int) -> bool:
+        # Called with the lock held; checks every path prefix of the key, for its kind and for all kinds
+        kind, key = cache_key
+        return any(
+            self._invalidated.get((target_kind, key[:length]), 0) > started
+            for length in range(len(key) + 1)
+            for target_kind in (None, kind)
+        )
+
+    def _refresh(self, cache_key: Tuple[str, Tuple], entry: _CacheEntry, loader: Callable[[], Any], started: int) -> None:
+        stored = False
+        try:
+            stored = self._store(cache_key, loader(), started)
+        except Exception as e:
+            print(f"Error refreshing metadata cache entry {cache_key}: {str(e)}")
+        finally:
+            with self._lock:
+                self._end_load(started)
+                # A refresh that stored nothing lets a later lookup of the stale entry try again
+                if not stored:
+                    entry.refreshing = False
+
+    def _store(self, cache_key: Tuple[str, Tuple], value: Any, started: int) -> bool:
+        """
+        Stores a loaded value, unless its entry was invalidated while it loaded. Returns whether it was stored.
+        """
+        size = estimate_size(value)
+        entry = _CacheEntry(value, size, self.ttls.get(cache_key[0], self.default_ttl))
+        with self._lock:
+            if self._invalidated_since(cache_key, started):
+                return False
+            old = self._entries.pop(cache_key, None)
+            if old is not None:
+                self._bytes -= old.size
+            if size > self.max_bytes:
+                return False
+            self._entries[cache_key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._evictions += 1
+            return True
@@ -0,0 +1,249 @@
+import atexit
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import diskcache
+import psutil
+from config import METRICS_DIR, METRICS_FLUSH_INTERVAL
+
+_PREFIX = "data_app_"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)  # seconds
+SIZE_BUCKETS = tuple(1024 * 4 ** power for power in range(13))  # 1 KiB to 16 GiB
+
+# name -> (type, help, buckets); observations of unknown names raise KeyError
+_DEFINITIONS: Dict[str, Tuple[str, str, Optional[Tuple[float, ...]]]] = {
+    "sql_statement_seconds": ("histogram", "Duration of SQL statements by statement kind, including the wait for a pooled connection.", DURATION_BUCKETS),
+    "sql_statement_errors_total": ("counter", "SQL statements that failed, by statement kind.", None),
+    "sql_statements_cancelled_total": ("counter", "Asynchronous SQL statements cancelled by a newer request, by statement kind.", None),
+    "callback_seconds": ("histogram", "Duration of Dash callback requests by callback id.", DURATION_BUCKETS),
+    "callback_errors_total": ("counter", "Dash callback requests that failed with a server error, by callback id.", None),
+    "upload_bytes_total": ("counter", "Bytes of uploaded files received, by upload path.", None),
+    "upload_size_bytes": ("histogram", "Size of uploaded files, by upload path.", SIZE_BUCKETS),
+    "upload_decode_seconds": ("histogram", "Duration of decoding base64 uploads into local files.", DURATION_BUCKETS),
+    "stage_seconds": ("histogram", "Duration of upload and append stages, by stage.", DURATION_BUCKETS),
+    "stage_failures_total": ("counter", "Upload and append stages that failed, by stage.", None),
+    "rows_appended_total": ("counter", "Rows appended to tables, by ingestion mode.", None),
+    "warehouse_probe_seconds": ("histogram", "Duration of the health endpoints' warehouse round trips.", DURATION_BUCKETS),
+    "warehouse_probe_failures_total": ("counter", "Warehouse round trips of the health endpoints that failed or timed out.", None),
+}
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[_Key, float] = {}
+_histograms: Dict[_Key, List[float]] = {}  # bucket counts, then +Inf count, sum and count
+_dirty = False
+_flusher_started = False
+_flush_eagerly = False
+_store: Optional[diskcache.Cache] = None
+
+
+def _get_store() -> diskcache.Cache:
+    # Every process publishes its own snapshot; the scraping process merges them
+    global _store
+    if _store is None:
+        _store = diskcache.Cache(METRICS_DIR)
+    return _store
+
+
+def _process_key() -> Tuple[str, int, float]:
+    # The start time tells a process apart from a later one that reuses its pid
+    return ("process", os.getpid(), psutil.Process().create_time())
+
+
+def _reset_after_fork() -> None:
+    # A forked child (e.g. a background callback) starts with no observations of its own. It
+    # ends with os._exit, which skips atexit handlers, so it publishes every observation
+    global _lock, _counters, _histograms, _dirty, _flusher_started, _flush_eagerly, _store
+    _lock = threading.Lock()
+    _counters = {}
+    _histograms = {}
+    _dirty = False
+    _flusher_started = False
+    _flush_eagerly = True
+    _store = None
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _Key:
+    if name not in _DEFINITIONS:
+        raise KeyError(f"Unknown metric: {name}")
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _schedule_flush() -> None:
+    global _flusher_started
+    if _flush_eagerly:
+        flush()
+        return
+    with _lock:
+        if _flusher_started:
+            return
+        _flusher_started = True
+
+    def run():
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            flush()
+
+    threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+
+
+def increment(name: str, amount: float = 1, **labels: Any) -> None:
+    """
+    Adds `amount` to a counter.
+    """
+    global _dirty
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+        _dirty = True
+    _schedule_flush()
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    """
+    Records one observation of a histogram.
+    """
+    global _dirty
+    key = _key(name, labels)
+    buckets = _DEFINITIONS[name][2]
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(buckets) + 3)
+        # Buckets are stored per interval and made cumulative when rendered
+        histogram[bisect.bisect_left(buckets, value)] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+        _dirty = True
+    _schedule_flush()
+
+
+@contextmanager
+def measure(name: str, **labels: Any) -> Iterator[None]:
+    """
+    Observes the duration of the block in seconds, whether or not it raises.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def flush() -> None:
+    """
+    Publishes this process's metrics so that the process serving /metrics includes them.
+
+    Called every METRICS_FLUSH_INTERVAL seconds by a background thread, at exit and
+    before every scrape. A snapshot replaces the previous one of the process, so
+    observations are never counted twice, and at most one interval of them is lost
+    if a process is killed.
+    """
+    global _dirty
+    with _lock:
+        if not _dirty:
+            return
+        snapshot = {"counters": dict(_counters), "histograms": {key: list(values) for key, values in _histograms.items()}}
+        _dirty = False
+    try:
+        _get_store().set(_process_key(), snapshot)
+    except Exception as e:
+        print(f"Error publishing metrics: {str(e)}")
+
+atexit.register(flush)
+
+
+def _merge(into: Dict[str, Dict[_Key, Any]], snapshot: Dict[str, Dict[_Key, Any]]) -> None:
+    for key, value in snapshot["counters"].items():
+        into["counters"][key] = into["counters"].get(key, 0) + value
+    for key, values in snapshot["histograms"].items():
+        merged = into["histograms"].get(key)
+        into["histograms"][key] = list(values) if merged is None else [a + b for a, b in zip(merged, values)]
+
+
+def _is_running(pid: int, create_time: float) -> bool:
+    try:
+        return psutil.Process(pid).create_time() == create_time
+    except psutil.Error:
+        return False
+
+
+def collect() -> Dict[str, Dict[_Key, Any]]:
+    """
+    Merges the metrics of all processes: running ones, and those that have exited.
+
+    Snapshots of exited processes are folded into one archived snapshot, so counters
+    never go down when a job worker or background callback process ends and the
+    number of stored snapshots stays bounded.
+    """
+    flush()
+    store = _get_store()
+    merged: Dict[str, Dict[_Key, Any]] = {"counters": {}, "histograms": {}}
+    with store.transact():
+        archive = store.get("archive") or {"counters": {}, "histograms": {}}
+        archived = False
+        for key in list(store.iterkeys()):
+            if not (isinstance(key, tuple) and key[0] == "process"):
+                continue
+            snapshot = store.get(key)
+            if snapshot is None:
+                continue
+            if _is_running(key[1], key[2]):
+                _merge(merged, snapshot)
+            else:
+                _merge(archive, snapshot)
+                store.delete(key)
+                archived = True
+        if archived:
+            store.set("archive", archive)
+    _merge(merged, archive)
+    return merged
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = []
+    for label, value in labels:
+        value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{label}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_metrics() -> str:
+    """
+    Returns the metrics of all processes in the Prometheus text exposition format.
+    """
+    merged = collect()
+    lines = []
+    for name, (kind, help_text, buckets) in _DEFINITIONS.items():
+        full_name = _PREFIX + name
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(merged["counters"].items()):
+                if metric == name:
+                    lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+
+        for (metric, labels), values in sorted(merged["histograms"].items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], values[:-2]):
+                cumulative += count
+                bucket_labels = labels + (("le", bound if bound == "+Inf" else repr(float(bound))),)
+                lines.append(f"{full_name}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}")
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {_format_value(values[-1])}")
+    return "\n".join(lines) + "\n"
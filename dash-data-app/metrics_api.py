@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, Optional
+from flask import Flask, Response, g, jsonify, request
+from dbutils import sqlQueryArrow
+from metrics import increment, measure, observe, render_metrics
+from config import HEALTH_PROBE_INTERVAL, HEALTH_PROBE_TIMEOUT
+
+_CALLBACK_PATH = "/_dash-update-component"
+
+_probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warehouse-probe")
+_probe_lock = threading.Lock()
+_probe_future: Optional[Future] = None
+_last_probe: Optional[Dict[str, Any]] = None
+
+
+def _round_trip() -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        with measure("warehouse_probe_seconds"):
+            sqlQueryArrow("SELECT 1")
+        return {"ok": True, "seconds": round(time.perf_counter() - started, 3), "error": None, "checked_at": time.time()}
+    except Exception as e:
+        print(f"Error probing the warehouse: {str(e)}")
+        increment("warehouse_probe_failures_total")
+        return {"ok": False, "seconds": round(time.perf_counter() - started, 3), "error": str(e), "checked_at": time.time()}
+
+
+def probe_warehouse() -> Dict[str, Any]:
+    """
+    Runs a SELECT 1 round trip on the warehouse, or returns the result of a recent one.
+
+    Results are reused for HEALTH_PROBE_INTERVAL seconds and only one round trip runs at
+    a time, so frequent probes from a load balancer neither queue up on the connection
+    pool nor keep an idle warehouse from stopping more than necessary. A round trip that
+    takes longer than HEALTH_PROBE_TIMEOUT seconds counts as failed; later probes wait
+    for it again instead of starting another one.
+
+    Returns:
+        Dict: {"ok", "seconds", "error", "checked_at"}
+    """
+    global _probe_future, _last_probe
+    with _probe_lock:
+        if _last_probe is not None and time.time() - _last_probe["checked_at"] < HEALTH_PROBE_INTERVAL:
+            return _last_probe
+        if _probe_future is None or _probe_future.done():
+            _probe_future = _probe_executor.submit(_round_trip)
+        future = _probe_future
+
+    try:
+        result = future.result(timeout=HEALTH_PROBE_TIMEOUT)
+    except FutureTimeout:
+        increment("warehouse_probe_failures_total")
+        result = {"ok": False, "seconds": HEALTH_PROBE_TIMEOUT, "error": f"No response within {HEALTH_PROBE_TIMEOUT}s", "checked_at": time.time()}
+    with _probe_lock:
+        _last_probe = result
+    return result
+
+
+def register_metrics_routes(server: Flask) -> None:
+    """
+    Registers the metrics and health endpoints, and times Dash callbacks, on the Flask server underlying the Dash app.
+
+    Protocol:
+        GET /metrics  -> metrics of the web process and the job workers in the Prometheus text format
+        GET /healthz  -> liveness: 200 while the process serves requests, with the warehouse probe result
+        GET /readyz   -> readiness: 200 if the warehouse answered a round trip, else 503
+
+    Callback durations are labelled with the callback id, the "output" of the Dash request.
+    """
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path.endswith(_CALLBACK_PATH):
+            g.callback_started = time.perf_counter()
+
+    @server.after_request
+    def record_callback(response):
+        started = g.pop("callback_started", None)
+        if started is not None:
+            callback = (request.get_json(silent=True) or {}).get("output", "unknown")
+            observe("callback_seconds", time.perf_counter() - started, callback=callback)
+            if response.status_code >= 500:
+                increment("callback_errors_total", callback=callback)
+        return response
+
+    @server.route("/metrics", methods=["GET"])
+    def get_metrics():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+    @server.route("/healthz", methods=["GET"])
+    def get_health():
+        # A warehouse outage is reported, but must not get the app restarted
+        return jsonify(status="ok", warehouse=probe_warehouse())
+
+    @server.route("/readyz", methods=["GET"])
+    def get_readiness():
+        probe = probe_warehouse()
+        return jsonify(status="ready" if probe["ok"] else "unavailable", warehouse=probe), 200 if probe["ok"] else 503
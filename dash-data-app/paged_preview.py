@@ -0,0 +1,387 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+from arrow_payload import columnar_payload
+from dbutils import count_source_rows, describe_table, query_page, read_files_source, source_columns
+from preview_engine import read_csv_preview_arrow, write_arrow_file
+from staging import staged_file_path, staged_file_stats
+from validation_engine import quote_identifier, table_columns
+from config import (
+    LOCAL_STAGING_DIR,
+    PAGED_PREVIEW_DIR,
+    PAGED_PREVIEW_MAX_MB,
+    PAGED_PREVIEW_BLOCK_ROWS
+)
+
+# Upper bound on rows per request, whatever block size the grid asks for
+_MAX_PAGE_ROWS = 10 * PAGED_PREVIEW_BLOCK_ROWS
+# Rows from the start of a file served by the CSV reader while its Arrow copy is built
+_MAX_STREAMED_ROWS = 10 * PAGED_PREVIEW_BLOCK_ROWS
+# Types the warehouse cannot sort by, also nested, left out of the default page order
+_UNORDERABLE_TYPES = ("MAP<", "VARIANT")
+
+_conversion_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="paged-preview")
+_conversions: Dict[str, Tuple[str, Future]] = {}  # Arrow file path -> (digest, conversion)
+_conversions_lock = threading.Lock()
+
+_NUMBER_COMPARISONS = {
+    "equals": ("=", pc.equal),
+    "notEqual": ("<>", pc.not_equal),
+    "lessThan": ("<", pc.less),
+    "lessThanOrEqual": ("<=", pc.less_equal),
+    "greaterThan": (">", pc.greater),
+    "greaterThanOrEqual": (">=", pc.greater_equal),
+}
+
+
+def _column_name(col_id: str, names: List[str]) -> str:
+    """
+    Maps a grid column id ("c0", "c1", ...) to the source column at that position.
+    """
+    try:
+        return names[int(str(col_id).lstrip("c"))]
+    except (ValueError, IndexError):
+        raise ValueError(f"Unknown column {col_id}")
+
+
+def _column_filters(filter_model: Optional[Dict[str, Any]], names: List[str]):
+    """
+    Yields (column name, "AND"/"OR", [conditions]) for every filtered column of an AG Grid filter model.
+    """
+    for col_id, model in (filter_model or {}).items():
+        conditions = model.get("conditions") or [model]
+        yield _column_name(col_id, names), model.get("operator", "AND"), conditions
+
+
+def _sql_string(value: Any) -> str:
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _like_pattern(value: Any, prefix: str = "%", suffix: str = "%") -> str:
+    escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return _sql_string(prefix + escaped + suffix)
+
+
+def _condition_sql(column: str, condition: Dict[str, Any]) -> str:
+    kind = condition.get("type")
+    value = condition.get("filter")
+    if kind == "blank":
+        return f"({column} IS NULL OR CAST({column} AS STRING) = '')"
+    if kind == "notBlank":
+        return f"({column} IS NOT NULL AND CAST({column} AS STRING) <> '')"
+
+    if condition.get("filterType") == "number":
+        number = float(value)
+        if kind == "inRange":
+            return f"(try_cast({column} AS DOUBLE) > {number} AND try_cast({column} AS DOUBLE) < {float(condition.get('filterTo'))})"
+        if kind in _NUMBER_COMPARISONS:
+            return f"try_cast({column} AS DOUBLE) {_NUMBER_COMPARISONS[kind][0]} {number}"
+        raise ValueError(f"Unsupported number filter {kind}")
+
+    text = f"CAST({column} AS STRING)"
+    if kind == "contains":
+        return f"{text} ILIKE {_like_pattern(value)}"
+    if kind == "notContains":
+        return f"NOT {text} ILIKE {_like_pattern(value)}"
+    if kind == "startsWith":
+        return f"{text} ILIKE {_like_pattern(value, prefix='')}"
+    if kind == "endsWith":
+        return f"{text} ILIKE {_like_pattern(value, suffix='')}"
+    if kind == "equals":
+        return f"lower({text}) = lower({_sql_string(value)})"
+    if kind == "notEqual":
+        return f"lower({text}) <> lower({_sql_string(value)})"
+    raise ValueError(f"Unsupported text filter {kind}")
+
+
+def filter_sql(filter_model: Optional[Dict[str, Any]], names: List[str]) -> Optional[str]:
+    """
+    Translates an AG Grid filter model into a SQL condition, or None if nothing is filtered.
+    """
+    clauses = []
+    for name, operator, conditions in _column_filters(filter_model, names):
+        column = quote_identifier(name)
+        joiner = " OR " if operator == "OR" else " AND "
+        clauses.append("(" + joiner.join(_condition_sql(column, condition) for condition in conditions) + ")")
+    return " AND ".join(clauses) or None
+
+
+def order_sql(sort_model: Optional[List[Dict[str, Any]]], names: List[str]) -> Optional[str]:
+    """
+    Translates an AG Grid sort model into a SQL ORDER BY list, or None if nothing is sorted.
+    """
+    keys = [
+        f"{quote_identifier(_column_name(sort['colId'], names))} {'DESC' if sort.get('sort') == 'desc' else 'ASC'} NULLS LAST"
+        for sort in sort_model or []
+    ]
+    return ", ".join(keys) or None
+
+
+def _page_order(sort_model: Optional[List[Dict[str, Any]]], names: List[str], orderable: List[str], row_key: bool = False) -> Optional[str]:
+    """
+    Returns the ORDER BY list of a warehouse page: the grid's sort, then every orderable column.
+
+    Without a total order, LIMIT/OFFSET pages of the same view may overlap or skip rows,
+    since the warehouse does not return rows in the same order for every statement.
+    With `row_key`, a single xxhash64 of the orderable columns replaces them, so that the
+    tiebreak compares one BIGINT instead of every column; only identical rows tie.
+    """
+    sorted_names = {_column_name(sort["colId"], names) for sort in sort_model or []}
+    if row_key and orderable:
+        tiebreak = [f"xxhash64({', '.join(quote_identifier(name) for name in orderable)}) ASC"]
+    else:
+        tiebreak = [f"{quote_identifier(name)} ASC NULLS LAST" for name in orderable if name not in sorted_names]
+    keys = [order_sql(sort_model, names)] + tiebreak
+    return ", ".join(key for key in keys if key) or None
+
+
+def _condition_mask(values: pa.ChunkedArray, condition: Dict[str, Any]) -> pa.ChunkedArray:
+    kind = condition.get("type")
+    value = condition.get("filter")
+
+    if condition.get("filterType") == "number":
+        numbers = pc.cast(values, pa.float64())
+        if kind == "blank":
+            return pc.is_null(numbers)
+        if kind == "notBlank":
+            return pc.is_valid(numbers)
+        if kind == "inRange":
+            return pc.and_(pc.greater(numbers, float(value)), pc.less(numbers, float(condition.get("filterTo"))))
+        if kind in _NUMBER_COMPARISONS:
+            return _NUMBER_COMPARISONS[kind][1](numbers, float(value))
+        raise ValueError(f"Unsupported number filter {kind}")
+
+    try:
+        text = pc.cast(values, pa.string())
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+        raise ValueError("Text filters are not supported on this column type")
+    if kind == "blank":
+        return pc.or_(pc.is_null(text), pc.equal(text, ""))
+    if kind == "notBlank":
+        return pc.and_(pc.is_valid(text), pc.not_equal(text, ""))
+    if kind == "contains":
+        return pc.match_substring(text, str(value), ignore_case=True)
+    if kind == "notContains":
+        return pc.invert(pc.match_substring(text, str(value), ignore_case=True))
+    if kind == "startsWith":
+        return pc.starts_with(text, str(value), ignore_case=True)
+    if kind == "endsWith":
+        return pc.ends_with(text, str(value), ignore_case=True)
+    if kind == "equals":
+        return pc.equal(pc.utf8_lower(text), str(value).lower())
+    if kind == "notEqual":
+        return pc.not_equal(pc.utf8_lower(text), str(value).lower())
+    raise ValueError(f"Unsupported text filter {kind}")
+
+
+@functools.lru_cache(maxsize=4)
+def _open_arrow_file(path: str) -> pa.Table:
+    # Memory-mapped and uncompressed, so columns are paged in by the OS on access
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+@functools.lru_cache(maxsize=8)
+def _view_indices(path: str, filter_json: str, sort_json: str) -> Optional[pa.Array]:
+    """
+    Returns the row indices of a filtered and sorted view of an Arrow file, or None if
+    the view is the whole file in file order.
+
+    Only the filtered and sorted columns are read; the indices are cached so that
+    scrolling through the same view only takes the rows of each page.
+    """
+    table = _open_arrow_file(path)
+    names = table.column_names
+
+    mask = None
+    for name, operator, conditions in _column_filters(json.loads(filter_json), names):
+        combine = pc.or_kleene if operator == "OR" else pc.and_kleene
+        column_mask = functools.reduce(combine, [_condition_mask(table[name], condition) for condition in conditions])
+        mask = column_mask if mask is None else pc.and_kleene(mask, column_mask)
+    indices = None
+    if mask is not None:
+        indices = pc.indices_nonzero(pc.fill_null(mask, False))
+
+    sort_model = json.loads(sort_json)
+    if sort_model:
+        sort_names = [_column_name(sort["colId"], names) for sort in sort_model]
+        keys = table.select(sort_names)
+        if indices is not None:
+            keys = keys.take(indices)
+        # Nulls sort last by default, as with NULLS LAST in order_sql
+        order = pc.sort_indices(
+            keys,
+            sort_keys=[
+                (name, "descending" if sort.get("sort") == "desc" else "ascending")
+                for name, sort in zip(sort_names, sort_model)
+            ]
+        )
+        indices = order if indices is None else indices.take(order)
+
+    return indices
+
+
+def _arrow_file_path(digest: str, delimiter: str, quote_char: str, header: bool, encoding: str) -> str:
+    settings = hashlib.sha256(json.dumps([delimiter, quote_char, bool(header), encoding]).encode()).hexdigest()[:16]
+    return os.path.join(PAGED_PREVIEW_DIR, f"{digest}-{settings}.arrow")
+
+
+def _convert(local_path: str, path: str, digest: str, delimiter: str, quote_char: str, header: bool, encoding: str) -> str:
+    """
+    Writes the Arrow copy of a staged file, replacing its copies for other CSV settings.
+    """
+    if os.path.isfile(path):
+        return path
+
+    os.makedirs(PAGED_PREVIEW_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PAGED_PREVIEW_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        write_arrow_file(local_path, tmp_path, delimiter, quote_char, header, encoding)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _enforce_budget(PAGED_PREVIEW_MAX_MB * 1024 * 1024, keep=path, digest=digest)
+    return path
+
+
+def _start_conversion(local_path: str, path: str, digest: str, delimiter: str, quote_char: str, header: bool, encoding: str) -> Future:
+    """
+    Returns the background conversion of a staged file into `path`, starting it if needed.
+
+    Conversions of the same file with other CSV settings that have not started yet are
+    cancelled, since the user has moved on to the new settings.
+    """
+    with _conversions_lock:
+        if path in _conversions:
+            return _conversions[path][1]
+        for other_digest, other in _conversions.values():
+            if other_digest == digest:
+                other.cancel()
+        future = _conversion_executor.submit(_convert, local_path, path, digest, delimiter, quote_char, header, encoding)
+        _conversions[path] = (digest, future)
+
+    def forget(_):
+        with _conversions_lock:
+            _conversions.pop(path, None)
+
+    future.add_done_callback(forget)
+    return future
+
+
+def _enforce_budget(max_bytes: int, keep: str, digest: str) -> None:
+    files = []
+    for name in os.listdir(PAGED_PREVIEW_DIR):
+        path = os.path.join(PAGED_PREVIEW_DIR, name)
+        if name.endswith(".arrow") and path != keep:
+            if name.startswith(f"{digest}-"):
+                # Only the copy for the latest CSV settings of a file is kept
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files) + os.path.getsize(keep)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def _page_bounds(request: Dict[str, Any]) -> Tuple[int, int]:
+    start = max(int(request.get("startRow") or 0), 0)
+    end = int(request.get("endRow") or start + PAGED_PREVIEW_BLOCK_ROWS)
+    return start, max(min(end - start, _MAX_PAGE_ROWS), 0)
+
+
+def _page_payload(page: pa.Table, row_count: int, exclude: Tuple[str, ...] = ("_rescued_data",)) -> Dict[str, Any]:
+    payload = columnar_payload(page, exclude=exclude)
+    payload["row_count"] = row_count
+    return payload
+
+
+def get_file_page(file_path: str, request: Dict[str, Any], delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8") -> Dict[str, Any]:
+    """
+    Returns one block of rows of an uploaded file for the grid's infinite row model.
+
+    Files still staged locally are converted once, in the background, into a memory-mapped
+    Arrow file and filtered, sorted and sliced in-process. Until the conversion is done,
+    unfiltered and unsorted blocks near the start of the file are read straight from the
+    CSV, with an unknown row count (-1); other requests wait for the conversion. Files no
+    longer staged are paged on the warehouse with a read_files(...) query of `file_path`
+    with WHERE, ORDER BY and LIMIT/OFFSET.
+
+    Args:
+        file_path (str): Volume path of the file.
+        request (Dict): The grid's getRowsRequest (startRow, endRow, sortModel, filterModel).
+
+    Returns:
+        Dict: A columnar payload of the rows plus "row_count", the size of the filtered view.
+    """
+    start, limit = _page_bounds(request)
+    filter_model = request.get("filterModel") or {}
+    sort_model = request.get("sortModel") or []
+    file_name = file_path.split("/")[-1]
+
+    local_path = staged_file_path(LOCAL_STAGING_DIR, file_name)
+    stats = staged_file_stats(LOCAL_STAGING_DIR, file_name)
+    if local_path and stats:
+        path = _arrow_file_path(stats.sha256, delimiter, quote_char, header, encoding)
+        if os.path.isfile(path):
+            os.utime(path)
+        else:
+            conversion = _start_conversion(local_path, path, stats.sha256, delimiter, quote_char, header, encoding)
+            if not filter_model and not sort_model and start + limit <= _MAX_STREAMED_ROWS:
+                # One row more than the block tells whether the file ends within it
+                head = read_csv_preview_arrow(local_path, delimiter, quote_char, header, encoding, limit=start + limit + 1)
+                row_count = head.num_rows if head.num_rows <= start + limit else -1
+                return _page_payload(head.slice(start, limit), row_count)
+            conversion.result()
+        table = _open_arrow_file(path)
+        indices = _view_indices(path, json.dumps(filter_model, sort_keys=True), json.dumps(sort_model))
+        if indices is None:
+            return _page_payload(table.slice(start, limit), table.num_rows)
+        return _page_payload(table.take(indices.slice(start, limit)), len(indices))
+
+    source = read_files_source(file_path, header, delimiter, quote_char, encoding)
+    cache_key = ("__files__", file_path, delimiter, quote_char, bool(header), encoding)
+    names = [name for name in source_columns(source, cache_key) if name != "_rescued_data"]
+    where = filter_sql(filter_model, names)
+    # Files have no key column, and sorting them on every column is expensive for each block
+    page = query_page(source, start, limit, where, _page_order(sort_model, names, names, row_key=True))
+    return _page_payload(page, count_source_rows(source, cache_key, where))
+
+
+def get_table_page(catalog: str, schema: str, table: str, request: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns one block of rows of a table for the grid's infinite row model.
+
+    Filtering, sorting and paging are pushed down to the warehouse; the filtered row
+    count is cached until the table is appended to. Rows are ordered by the grid's sort
+    and then by every orderable column, so that blocks neither overlap nor skip rows. A
+    newer request of the same browser session cancels the statement of this one.
+    """
+    start, limit = _page_bounds(request)
+    source = f"{catalog}.{schema}.{table}"
+    columns = table_columns(describe_table(catalog, schema, table))
+    names = list(columns)
+    orderable = [name for name, data_type in columns.items() if not any(t in data_type.upper() for t in _UNORDERABLE_TYPES)]
+    where = filter_sql(request.get("filterModel"), names)
+    page = query_page(source, start, limit, where, _page_order(request.get("sortModel"), names, orderable), session_id)
+    return _page_payload(page, count_source_rows(source, (catalog, schema, table), where), exclude=())
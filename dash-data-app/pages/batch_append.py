@@ -0,0 +1,283 @@
+import dash
+import dash_bootstrap_components as dbc
+import dash_ag_grid as dag
+from dash import html, dcc, callback, Input, Output, State
+from dash.exceptions import PreventUpdate
+from dbutils import list_catalogs, list_schemas, list_tables
+from batch_append import decode_batch_file, run_batch
+from compressed_files import UPLOAD_ACCEPT
+from dataclasses import asdict
+from config import BATCH_CONCURRENCY, BATCH_UPLOAD_DIR, SQL_POOL_MAX_SIZE
+from tracing import traced
+import os
+import uuid
+
+dash.register_page(__name__, path="/batch-append")
+
+STATUS_COLUMNS = [
+    {"field": "name", "headerName": "File", "flex": 2},
+    {"field": "size", "headerName": "Size (MB)", "type": "rightAligned",
+     "valueFormatter": {"function": "d3.format(',.2f')(params.value / 1048576)"}},
+    {"field": "status", "headerName": "Status"},
+    {"field": "rows", "headerName": "Rows", "type": "rightAligned",
+     "valueFormatter": {"function": "d3.format(',')(params.value)"}},
+    {"field": "seconds", "headerName": "Seconds", "type": "rightAligned"},
+    {"field": "message", "headerName": "Message", "flex": 3, "tooltipField": "message"},
+]
+
+layout = dbc.Container([
+    html.H4("Batch Append From Multiple Files", className="fw-bold mt-4"),
+
+    dbc.Button("← Back", href="/", color="secondary", outline=True, className="mb-3"),
+
+    dbc.Card([
+        dbc.CardHeader("Target Table"),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Catalog"),
+                    dcc.Dropdown(id="batch-catalog", placeholder="Select a catalog")
+                ], width=4),
+                dbc.Col([
+                    dbc.Label("Schema"),
+                    dcc.Dropdown(id="batch-schema", placeholder="Select a schema", disabled=True)
+                ], width=4),
+                dbc.Col([
+                    dbc.Label("Table"),
+                    dcc.Dropdown(id="batch-table", placeholder="Select a table", disabled=True)
+                ], width=4),
+            ]),
+        ])
+    ], className="mb-3"),
+
+    dbc.Card([
+        dbc.CardHeader("CSV Settings"),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    dbc.Label("Column Delimiter"),
+                    dcc.Dropdown(
+                        id="batch-delimiter",
+                        options=[
+                            {"label": "Comma (,)", "value": ","},
+                            {"label": "Semicolon (;)", "value": ";"},
+                            {"label": "Tab (\\t)", "value": "\t"},
+                            {"label": "Pipe (|)", "value": "|"}
+                        ],
+                        value=",",
+                        clearable=False
+                    )
+                ], width=3),
+                dbc.Col([
+                    dbc.Label("Quote Character"),
+                    dcc.Dropdown(
+                        id="batch-quote",
+                        options=[
+                            {"label": 'Double Quote (")', "value": '"'},
+                            {"label": "Single Quote (')", "value": "'"},
+                            {"label": "None", "value": ""}
+                        ],
+                        value='"',
+                        clearable=False
+                    )
+                ], width=3),
+                dbc.Col([
+                    dbc.Label("File Encoding"),
+                    dcc.Dropdown(
+                        id="batch-encoding",
+                        options=[
+                            {"label": "UTF-8", "value": "utf-8"},
+                            {"label": "ISO-8859-1", "value": "iso-8859-1"},
+                            {"label": "UTF-16", "value": "utf-16"}
+                        ],
+                        value="utf-8",
+                        clearable=False
+                    )
+                ], width=3),
+                dbc.Col([
+                    dbc.Label("Parallel Files"),
+                    dbc.Input(id="batch-concurrency", type="number", min=1, max=SQL_POOL_MAX_SIZE, step=1, value=min(BATCH_CONCURRENCY, SQL_POOL_MAX_SIZE))
+                ], width=3),
+            ]),
+            dbc.Checkbox(id="batch-header", label="First row as header", value=True, className="mt-3"),
+        ])
+    ], className="mb-3"),
+
+    dcc.Upload(
+        id="batch-upload",
+        children=html.Div([
+            "Drag and Drop or ",
+            html.A("Select CSV Files")
+        ]),
+        style={
+            "width": "100%",
+            "height": "60px",
+            "lineHeight": "60px",
+            "borderWidth": "1px",
+            "borderStyle": "dashed",
+            "borderRadius": "5px",
+            "textAlign": "center",
+            "margin": "10px 0"
+        },
+        accept=UPLOAD_ACCEPT,
+        multiple=True
+    ),
+
+    dbc.Button("Append All Files", id="batch-start", color="success", disabled=True, className="mb-3"),
+
+    html.Div(id="batch-summary", className="mb-3"),
+
+    dag.AgGrid(
+        id="batch-status",
+        rowData=[],
+        columnDefs=STATUS_COLUMNS,
+        defaultColDef={"resizable": True, "sortable": True, "filter": True},
+        dashGridOptions={"tooltipShowDelay": 300},
+        getRowId="params.data.name",
+        className="ag-theme-alpine",
+        style={"width": "100%", "height": "500px"}
+    ),
+
+    dcc.Store(id="batch-files"),
+], fluid=True)
+
+@callback(
+    Output("batch-catalog", "options"),
+    Input("batch-catalog", "id")
+)
+@traced(kind="server")
+def load_batch_catalogs(_):
+    df = list_catalogs()
+    return [{"label": catalog, "value": catalog} for catalog in df.iloc[:, 0].tolist()]
+
+@callback(
+    [Output("batch-schema", "options"),
+     Output("batch-schema", "disabled")],
+    Input("batch-catalog", "value")
+)
+@traced(kind="server")
+def load_batch_schemas(catalog):
+    if not catalog:
+        return [], True
+    df = list_schemas(catalog)
+    return [{"label": schema, "value": schema} for schema in df.iloc[:, 0].tolist()], False
+
+@callback(
+    [Output("batch-table", "options"),
+     Output("batch-table", "disabled")],
+    [Input("batch-catalog", "value"),
+     Input("batch-schema", "value")]
+)
+@traced(kind="server")
+def load_batch_tables(catalog, schema):
+    if not catalog or not schema:
+        return [], True
+    df = list_tables(catalog, schema)
+    return [{"label": table, "value": table} for table in df['tableName'].tolist()], False
+
+@callback(
+    [Output("batch-files", "data"),
+     Output("batch-status", "rowData"),
+     Output("batch-summary", "children")],
+    Input("batch-upload", "contents"),
+    State("batch-upload", "filename"),
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def handle_batch_upload(contents_list, filenames):
+    if not contents_list:
+        raise PreventUpdate
+
+    # Each batch gets its own directory; its name also prefixes the staged and volume file names
+    batch_dir = os.path.join(BATCH_UPLOAD_DIR, uuid.uuid4().hex)
+    files = []
+    rejected = []
+    for contents, filename in zip(contents_list, filenames):
+        try:
+            files.append(asdict(decode_batch_file(contents, filename, batch_dir)))
+        except Exception as e:
+            print(f"Error decoding batch file {filename}: {str(e)}")
+            rejected.append({"name": filename, "size": 0, "status": "rejected", "rows": 0, "seconds": 0, "message": str(e)})
+
+    summary = html.Div(
+        f"{len(files)} files ready" + (f", {len(rejected)} rejected" if rejected else ""),
+        className="text-muted"
+    )
+    return files, files + rejected, summary
+
+@callback(
+    Output("batch-start", "disabled"),
+    [Input("batch-files", "data"),
+     Input("batch-table", "value")]
+)
+@traced(kind="server")
+def toggle_batch_start(files, table):
+    return not (files and table)
+
+@callback(
+    [Output("batch-summary", "children", allow_duplicate=True),
+     Output("batch-files", "data", allow_duplicate=True)],
+    Input("batch-start", "n_clicks"),
+    [State("batch-files", "data"),
+     State("batch-catalog", "value"),
+     State("batch-schema", "value"),
+     State("batch-table", "value"),
+     State("batch-delimiter", "value"),
+     State("batch-quote", "value"),
+     State("batch-header", "value"),
+     State("batch-encoding", "value"),
+     State("batch-concurrency", "value")],
+    background=True,
+    progress=Output("batch-status", "rowData"),
+    running=[
+        (Output("batch-start", "disabled"), True, True),
+        (Output("batch-start", "children"), "Appending...", "Append All Files"),
+        (Output("batch-upload", "disabled"), True, False)
+    ],
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def run_batch_append(set_progress, n_clicks, files, catalog, schema, table, delimiter, quote_char, header, encoding, concurrency):
+    if not n_clicks or not files or not all([catalog, schema, table]):
+        raise PreventUpdate
+
+    csv_settings = {
+        "delimiter": delimiter or ",",
+        "quote_char": quote_char if quote_char is not None else '"',
+        "header": header if header is not None else True,
+        "encoding": encoding or "utf-8"
+    }
+    try:
+        summary = run_batch(
+            files,
+            catalog,
+            schema,
+            table,
+            csv_settings,
+            concurrency=int(concurrency or BATCH_CONCURRENCY),
+            on_progress=set_progress
+        )
+    except Exception as e:
+        print(f"Error in batch append: {str(e)}")
+        return html.Div([
+            html.I(className="fas fa-exclamation-circle me-2"),
+            f"Batch append failed: {str(e)}"
+        ], className="text-danger"), None
+
+    color = "success" if summary["succeeded"] == summary["files"] else "warning"
+    summary_card = dbc.Alert([
+        html.Div([
+            html.I(className="fas fa-check-circle me-2"),
+            f"{summary['succeeded']} of {summary['files']} files appended to {catalog}.{schema}.{table}",
+            f" ({summary['invalid']} invalid, {summary['failed']} failed)" if summary["succeeded"] != summary["files"] else ""
+        ], className="fw-bold"),
+        html.Div(
+            f"{summary['rows']:,} rows, {summary['bytes'] / 1024 / 1024:,.1f} MB in {summary['seconds']:,} s "
+            f"with {summary['concurrency']} parallel files: {summary['files_per_minute']:,} files/min, "
+            f"{summary['rows_per_second']:,} rows/s, {summary['mb_per_second']:,} MB/s",
+            className="small mt-1"
+        )
+    ], color=color)
+    # The grid already shows the final statuses from the last progress update.
+    # The batch files have been staged or removed; a new batch needs a new upload
+    return summary_card, None
@@ -0,0 +1,97 @@
+import dash
+import dash_bootstrap_components as dbc
+import dash_ag_grid as dag
+from dash import html, dcc, callback, Input, Output, State
+from dash.exceptions import PreventUpdate
+from job_queue import QUEUED
+from job_worker import get_job_queue
+from tracing import traced
+
+dash.register_page(__name__, path="/jobs")
+
+JOB_COLUMNS = [
+    {"field": "created_at", "headerName": "Submitted", "sort": "desc",
+     "valueFormatter": {"function": "params.value ? new Date(params.value * 1000).toLocaleString() : ''"}},
+    {"field": "target", "headerName": "Table", "flex": 2},
+    {"field": "file", "headerName": "File", "flex": 2, "tooltipField": "file"},
+    {"field": "state", "headerName": "State"},
+    {"field": "attempts", "headerName": "Attempts", "type": "rightAligned"},
+    {"field": "rows", "headerName": "Rows", "type": "rightAligned",
+     "valueFormatter": {"function": "params.value == null ? '' : d3.format(',')(params.value)"}},
+    {"field": "seconds", "headerName": "Seconds", "type": "rightAligned"},
+    {"field": "error", "headerName": "Last Error", "flex": 3, "tooltipField": "error"},
+]
+
+
+def _job_row(job):
+    params = job["params"]
+    finished = job["finished_at"]
+    return {
+        "id": job["id"],
+        "created_at": job["created_at"],
+        "target": f"{params.get('catalog')}.{params.get('schema')}.{params.get('table')}",
+        "file": params.get("file_path", "").split("/")[-1],
+        "state": job["state"],
+        "attempts": f"{job['attempts']} / {job['max_attempts']}",
+        "rows": (job["result"] or {}).get("rows"),
+        "seconds": round(finished - job["started_at"], 1) if finished and job["started_at"] else None,
+        "error": job["error"] or "",
+    }
+
+
+layout = dbc.Container([
+    html.H4("Append Jobs", className="fw-bold mt-4"),
+
+    dbc.Button("← Back", href="/", color="secondary", outline=True, className="mb-3"),
+
+    html.P(
+        "Appends run in worker processes and continue when this page is closed or the app restarts.",
+        className="text-muted"
+    ),
+
+    dbc.Button("Cancel Selected", id="jobs-cancel", color="danger", outline=True, size="sm", disabled=True, className="mb-2"),
+    html.Div(id="jobs-message", className="small mb-2"),
+
+    dag.AgGrid(
+        id="jobs-grid",
+        rowData=[],
+        columnDefs=JOB_COLUMNS,
+        defaultColDef={"resizable": True, "sortable": True, "filter": True},
+        dashGridOptions={"rowSelection": "single", "tooltipShowDelay": 300},
+        getRowId="params.data.id",
+        className="ag-theme-alpine",
+        style={"width": "100%", "height": "600px"}
+    ),
+
+    dcc.Interval(id="jobs-refresh", interval=2000),
+], fluid=True)
+
+@callback(
+    Output("jobs-grid", "rowData"),
+    Input("jobs-refresh", "n_intervals")
+)
+@traced(kind="server")
+def refresh_jobs(_):
+    return [_job_row(job) for job in get_job_queue().list(limit=500)]
+
+@callback(
+    Output("jobs-cancel", "disabled"),
+    Input("jobs-grid", "selectedRows")
+)
+@traced(kind="server")
+def toggle_cancel_button(selected_rows):
+    return not (selected_rows and selected_rows[0]["state"] == QUEUED)
+
+@callback(
+    Output("jobs-message", "children"),
+    Input("jobs-cancel", "n_clicks"),
+    State("jobs-grid", "selectedRows"),
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def cancel_selected_job(n_clicks, selected_rows):
+    if not n_clicks or not selected_rows:
+        raise PreventUpdate
+    if get_job_queue().cancel(selected_rows[0]["id"]):
+        return html.Span("Job cancelled.", className="text-success")
+    return html.Span("The job has already started and can no longer be cancelled.", className="text-danger")
@@ -0,0 +1,130 @@
+import time
+import dash
+import dash_bootstrap_components as dbc
+import dash_ag_grid as dag
+from dash import html, dcc, callback, Input, Output
+from dbutils import get_metadata_cache_stats
+from query_log import get_query_log
+from config import QUERY_LOG_ENABLED, QUERY_LOG_MAX_ROWS
+from tracing import traced
+
+dash.register_page(__name__, path="/query-log")
+
+WINDOW_OPTIONS = [
+    {"label": "Last hour", "value": 3600},
+    {"label": "Last 24 hours", "value": 86400},
+    {"label": "Last 7 days", "value": 604800},
+]
+ORDER_OPTIONS = [
+    {"label": "Total time", "value": "total_seconds"},
+    {"label": "Count", "value": "count"},
+    {"label": "p95", "value": "p95_seconds"},
+]
+
+_SECONDS = {"function": "params.value == null ? '' : d3.format('.3f')(params.value)"}
+_COUNT = {"function": "params.value == null ? '' : d3.format(',')(params.value)"}
+_BYTES = {"function": "params.value == null ? '' : d3.format('.3~s')(params.value) + 'B'"}
+_TIME = {"function": "params.value ? new Date(params.value * 1000).toLocaleString() : ''"}
+
+FINGERPRINT_COLUMNS = [
+    {"field": "kind", "headerName": "Kind", "width": 110},
+    {"field": "normalized", "headerName": "Statement", "flex": 4, "tooltipField": "normalized"},
+    {"field": "count", "headerName": "Count", "type": "rightAligned", "valueFormatter": _COUNT},
+    {"field": "errors", "headerName": "Errors", "type": "rightAligned", "valueFormatter": _COUNT},
+    {"field": "total_seconds", "headerName": "Total s", "type": "rightAligned", "valueFormatter": _SECONDS},
+    {"field": "mean_seconds", "headerName": "Mean s", "type": "rightAligned", "valueFormatter": _SECONDS},
+    {"field": "p95_seconds", "headerName": "p95 s", "type": "rightAligned", "valueFormatter": _SECONDS},
+    {"field": "p99_seconds", "headerName": "p99 s", "type": "rightAligned", "valueFormatter": _SECONDS},
+    {"field": "rows", "headerName": "Rows", "type": "rightAligned", "valueFormatter": _COUNT},
+    {"field": "bytes", "headerName": "Bytes", "type": "rightAligned", "valueFormatter": _BYTES},
+    {"field": "last_at", "headerName": "Last Run", "valueFormatter": _TIME},
+]
+
+EXECUTION_COLUMNS = [
+    {"field": "started_at", "headerName": "Started", "sort": "desc", "valueFormatter": _TIME},
+    {"field": "seconds", "headerName": "Seconds", "type": "rightAligned", "valueFormatter": _SECONDS},
+    {"field": "rows", "headerName": "Rows", "type": "rightAligned", "valueFormatter": _COUNT},
+    {"field": "bytes", "headerName": "Bytes", "type": "rightAligned", "valueFormatter": _BYTES},
+    {"field": "caller", "headerName": "Caller", "flex": 2, "tooltipField": "caller"},
+    {"field": "session_id", "headerName": "Session"},
+    {"field": "statement_id", "headerName": "Statement ID", "flex": 2},
+    {"field": "error", "headerName": "Error", "flex": 2, "tooltipField": "error"},
+    {"field": "query", "headerName": "Query", "flex": 3, "tooltipField": "query"},
+]
+
+
+def _cache_summary():
+    stats = get_metadata_cache_stats()
+    lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    return (
+        f"Metadata cache of this process: {stats['hit_rate']:.0%} hit rate over {lookups:,} lookups "
+        f"({stats['stale_hits']:,} stale), {stats['entries']:,} entries. "
+        "Cache hits never reach the warehouse, so they do not appear below."
+    )
+
+
+layout = dbc.Container([
+    html.H4("Query Analytics", className="fw-bold mt-4"),
+
+    dbc.Button("← Back", href="/", color="secondary", outline=True, className="mb-3"),
+
+    html.P(
+        f"Statements sent to the warehouse by the app and its workers, grouped by their shape with literals removed. "
+        f"The newest {QUERY_LOG_MAX_ROWS:,} statements are kept."
+        if QUERY_LOG_ENABLED else "The query log is disabled (QUERY_LOG_ENABLED=false).",
+        className="text-muted"
+    ),
+
+    dbc.Row([
+        dbc.Col(dcc.Dropdown(id="query-log-window", options=WINDOW_OPTIONS, value=86400, clearable=False), width=3),
+        dbc.Col(dbc.RadioItems(id="query-log-order", options=ORDER_OPTIONS, value="total_seconds", inline=True), className="pt-2"),
+    ], className="mb-2"),
+    html.Div(id="query-log-cache", className="text-muted small mb-2"),
+
+    dag.AgGrid(
+        id="query-log-fingerprints",
+        rowData=[],
+        columnDefs=FINGERPRINT_COLUMNS,
+        defaultColDef={"resizable": True, "sortable": True, "filter": True},
+        dashGridOptions={"rowSelection": "single", "tooltipShowDelay": 300},
+        getRowId="params.data.fingerprint",
+        className="ag-theme-alpine",
+        style={"width": "100%", "height": "400px"}
+    ),
+
+    html.H6("Recent executions of the selected statement", className="fw-bold mt-4"),
+    dag.AgGrid(
+        id="query-log-executions",
+        rowData=[],
+        columnDefs=EXECUTION_COLUMNS,
+        defaultColDef={"resizable": True, "sortable": True, "filter": True},
+        dashGridOptions={"tooltipShowDelay": 300},
+        getRowId="params.data.id",
+        className="ag-theme-alpine",
+        style={"width": "100%", "height": "400px"}
+    ),
+
+    dcc.Interval(id="query-log-refresh", interval=10000),
+], fluid=True)
+
+@callback(
+    Output("query-log-fingerprints", "rowData"),
+    Output("query-log-cache", "children"),
+    Input("query-log-refresh", "n_intervals"),
+    Input("query-log-window", "value"),
+    Input("query-log-order", "value")
+)
+@traced(kind="server")
+def refresh_fingerprints(_, window, order_by):
+    return get_query_log().top_fingerprints(time.time() - window, order_by=order_by), _cache_summary()
+
+@callback(
+    Output("query-log-executions", "rowData"),
+    Input("query-log-fingerprints", "selectedRows"),
+    Input("query-log-refresh", "n_intervals")
+)
+@traced(kind="server")
+def show_executions(selected_rows, _):
+    if not selected_rows:
+        return []
+    return get_query_log().recent(selected_rows[0]["fingerprint"])
@@ -1,20 +1,34 @@
 import dash
 import dash_bootstrap_components as dbc
-import dash.dash_table as dt
 from dash import html, dcc, callback, Input, Output, State
 from dbutils import (
-    read_file_from_volume, 
     list_catalogs, 
     list_schemas, 
     list_tables,
     describe_table,
-    get_sample_data,
-    insert_data_to_table
+    get_not_null_columns,
+    invalidate_metadata,
+    validate_file_in_warehouse,
+    StatementCancelled
 )
-from config import DATABRICKS_VOLUME_PATH
-from components.csv_settings import get_csv_settings_modal
+from config import LOCAL_STAGING_DIR, VALIDATION_BLOCK_SIZE, VALIDATION_MODE, CSV_DETECT_SAMPLE_KB
+from tracing import traced
+from job_queue import FINISHED_STATES, SUCCEEDED
+from job_worker import get_job_queue, submit_append_job
+from progress import read_progress
+from components.progress_report import get_progress_report
+from preview_cache import get_file_preview
+from staging import staged_file_path, staged_file_pinned
+from compressed_files import is_csv_file
+from validation_engine import table_columns, validate_csv_file
+from components.csv_settings import ENCODING_OPTIONS, get_csv_settings_modal
+from csv_dialect import staged_csv_settings
+from components.validation_report import get_validation_report
+from components.preview_grid import get_preview_grid, register_preview_grid_callbacks
+from arrow_payload import schema_payload
+from paged_preview import get_file_page, get_table_page
 import os
-import pandas as pd
+import uuid
 
 os.makedirs("./cache", exist_ok=True)
 
@@ -25,12 +39,8 @@ layout = dbc.Container([
 
     dbc.Button("← Back", id="back-button", href="/", color="secondary", outline=True, className="mb-3"),
 
-    # Add loading overlay for the entire process
-    dbc.Spinner(
-        html.Div(id="processing-status", className="mt-3"),
-        color="primary",
-        type="border",
-    ),
+    # Status and stages of the running append job (see poll_append_job)
+    html.Div(id="processing-status", className="mt-3"),
 
     # File processing info with spinner
     dcc.Loading(
@@ -48,33 +58,27 @@ layout = dbc.Container([
     dcc.Loading(
         id="loading-preview",
         type="circle",
-        children=dt.DataTable(
-            id="file-preview", 
-            style_table={"width": "100%"},
-            style_cell={
-                'textAlign': 'left',
-                'padding': '8px',
-                'whiteSpace': 'normal',
-                'height': 'auto',
-            },
-            style_header={
-                'backgroundColor': 'rgb(230, 230, 230)',
-                'fontWeight': 'bold'
-            },
-            style_data_conditional=[{
-                'if': {'row_index': 'odd'},
-                'backgroundColor': 'rgb(248, 248, 248)'
-            }]
-        )
+        children=get_preview_grid("file-preview")
     ),
 
     dbc.Button("Advanced Attributes", id="advanced-attributes-btn", color="primary", className="mt-3"),
+    html.Div(id="csv-detection", className="text-muted small mt-1"),
     get_csv_settings_modal(),
 
     # Table selection section
     dbc.Row([
         dbc.Col([
-            html.H5("Select Target Table", className="fw-bold mt-4"),
+            html.Div([
+                html.H5("Select Target Table", className="fw-bold mb-0"),
+                dbc.Button(
+                    html.I(className="bi bi-arrow-clockwise"),
+                    id="refresh-metadata",
+                    color="link",
+                    size="sm",
+                    title="Refresh catalogs, schemas and tables",
+                    className="ms-2"
+                ),
+            ], className="d-flex align-items-center mt-4"),
             dbc.Row([
                 dbc.Col([
                     dbc.Label("Catalog"),
@@ -96,24 +100,7 @@ layout = dbc.Container([
                 dcc.Loading(
                     id="loading-table-preview",
                     type="circle",
-                    children=dt.DataTable(
-                        id="table-preview",
-                        style_table={"width": "100%"},
-                        style_cell={
-                            'textAlign': 'left',
-                            'padding': '8px',
-                            'whiteSpace': 'normal',
-                            'height': 'auto',
-                        },
-                        style_header={
-                            'backgroundColor': 'rgb(230, 230, 230)',
-                            'fontWeight': 'bold'
-                        },
-                        style_data_conditional=[{
-                            'if': {'row_index': 'odd'},
-                            'backgroundColor': 'rgb(248, 248, 248)'
-                        }]
-                    )
+                    children=get_preview_grid("table-preview")
                 )
             ], id="table-preview-section", style={"display": "none"}),
         ])
@@ -143,6 +130,11 @@ layout = dbc.Container([
     dcc.Store(id="file-path", storage_type="session"),
     dcc.Store(id="csv-settings", storage_type="session"),
     dcc.Store(id="validation-state", data=False),
+    dcc.Store(id="metadata-version", data=0),
+    dcc.Store(id="session-id", storage_type="session"),
+    # The running append job is kept per tab, so a reload resumes following it
+    dcc.Store(id="append-job", storage_type="session"),
+    dcc.Interval(id="append-job-poll", interval=1000, disabled=True),
 
     # Update the layout to include a modal for success message
     dbc.Modal([
@@ -157,26 +149,7 @@ layout = dbc.Container([
             dbc.Button("Upload Another", href="/", color="primary"),
             dbc.Button("Close", id="close-success-modal", className="ms-2")
         ])
-    ], id="success-modal", is_open=False),
-
-    # Add loading overlay for append operation
-    dbc.Spinner(
-        html.Div(
-            id="append-overlay",
-            style={
-                "position": "fixed",
-                "top": 0,
-                "left": 0,
-                "right": 0,
-                "bottom": 0,
-                "backgroundColor": "rgba(0, 0, 0, 0.5)",
-                "zIndex": 1000,
-                "display": "none"
-            }
-        ),
-        color="primary",
-        fullscreen=True,
-    )
+    ], id="success-modal", is_open=False)
 ], fluid=True)
 
 @callback(
@@ -186,16 +159,31 @@ layout = dbc.Container([
     [State("advanced-attributes-modal", "is_open")],
     prevent_initial_call=True
 )
+@traced(kind="server")
 def toggle_advanced_attributes(open_clicks, close_clicks, is_open):
     if open_clicks or close_clicks:
         return not is_open
     return is_open
 
+@callback(
+    Output("metadata-version", "data"),
+    Input("refresh-metadata", "n_clicks"),
+    State("metadata-version", "data"),
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def refresh_metadata(n_clicks, version):
+    # Drop cached catalog metadata; the dropdowns reload when the version changes
+    invalidate_metadata()
+    return (version or 0) + 1
+
 @callback(
     Output("catalog-select", "options"),
-    Input("file-path", "data")
+    [Input("file-path", "data"),
+     Input("metadata-version", "data")]
 )
-def load_catalogs(file_path):
+@traced(kind="server")
+def load_catalogs(file_path, metadata_version):
     if not file_path:
         return []
     df = list_catalogs()
@@ -204,9 +192,11 @@ def load_catalogs(file_path):
 @callback(
     [Output("schema-select", "options"),
      Output("schema-select", "disabled")],
-    Input("catalog-select", "value")
+    [Input("catalog-select", "value"),
+     Input("metadata-version", "data")]
 )
-def load_schemas(catalog):
+@traced(kind="server")
+def load_schemas(catalog, metadata_version):
     if not catalog:
         return [], True
     df = list_schemas(catalog)
@@ -216,17 +206,33 @@ def load_schemas(catalog):
     [Output("table-select", "options"),
      Output("table-select", "disabled")],
     [Input("catalog-select", "value"),
-     Input("schema-select", "value")]
+     Input("schema-select", "value"),
+     Input("metadata-version", "data")]
 )
-def load_tables(catalog, schema):
+@traced(kind="server")
+def load_tables(catalog, schema, metadata_version):
     if not catalog or not schema:
         return [], True
     df = list_tables(catalog, schema)
     return [{"label": table, "value": table} for table in df['tableName'].tolist()], False
 
+register_preview_grid_callbacks("table-preview")
+register_preview_grid_callbacks("file-preview")
+
 @callback(
-    [Output("table-preview", "data"),
-     Output("table-preview", "columns"),
+    Output("session-id", "data"),
+    Input("session-id", "modified_timestamp"),
+    State("session-id", "data")
+)
+@traced(kind="server")
+def ensure_session_id(_, session_id):
+    # Identifies this browser tab so superseded statements can be cancelled
+    if session_id:
+        return dash.no_update
+    return uuid.uuid4().hex
+
+@callback(
+    [Output("table-preview-payload", "data"),
      Output("table-preview-metadata", "children"),
      Output("table-preview-section", "style"),
      Output("confirm-append", "disabled")],
@@ -236,35 +242,80 @@ def load_tables(catalog, schema):
      Input("validation-state", "data")],
     background=True,
     running=[
-        (Output("table-preview", "style"), {"opacity": "0.5"}, {"opacity": "1"}),
+        (Output("table-preview", "style"), {"width": "100%", "height": "400px", "opacity": "0.5"}, {"width": "100%", "height": "400px", "opacity": "1"}),
     ]
 )
+@traced(kind="server")
 def update_table_preview(catalog, schema, table, is_validated):
     if not all([catalog, schema, table]):
-        return [], [], "", {"display": "none"}, True
+        return None, "", {"display": "none"}, True
     
     try:
-        # Get sample data
-        sample_df = get_sample_data(catalog, schema, table, limit=10)
-        
-        # Create simple columns
-        columns = [{"name": col, "id": col} for col in sample_df.columns]
+        # Only the columns are set here; the grid's first block request reads the rows
+        columns = table_columns(describe_table(catalog, schema, table))
         
         return (
-            sample_df.to_dict('records'),
-            columns,
-            f"Showing {len(sample_df)} sample rows, {len(sample_df.columns)} columns",
+            schema_payload(columns),
+            f"{len(columns)} columns; scroll to page through all rows",
             {"display": "block"},
             not is_validated  # Disable append button unless validation passed
         )
-        
+
     except Exception as e:
         print(f"Error updating table preview: {str(e)}")
-        return [], [], f"Error: {str(e)}", {"display": "none"}, True
+        return None, f"Error: {str(e)}", {"display": "none"}, True
+
+DELIMITER_NAMES = {",": "comma", ";": "semicolon", "\t": "tab", "|": "pipe", " ": "space"}
 
 @callback(
-    [Output("file-preview", "data"),
-     Output("file-preview", "columns"),
+    [Output("column-delimiter", "value"),
+     Output("quote-character", "value"),
+     Output("header-settings", "value"),
+     Output("file-encoding", "value"),
+     Output("file-encoding", "options"),
+     Output("csv-settings", "data", allow_duplicate=True),
+     Output("csv-detection", "children")],
+    Input("file-path", "data"),
+    State("csv-settings", "data"),
+    prevent_initial_call="initial_duplicate"
+)
+@traced(kind="server")
+def apply_csv_settings(file_path, settings):
+    """
+    Pre-populates the CSV settings with those detected from the uploaded file.
+
+    The upload page detects them from the staged copy; files staged earlier are detected
+    here. Either way no warehouse call is needed, and setting the values triggers the preview.
+    """
+    if not file_path:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, ""
+    if not settings or settings.get("file_path") != file_path:
+        settings = staged_csv_settings(LOCAL_STAGING_DIR, file_path, CSV_DETECT_SAMPLE_KB * 1024)
+    if not settings:
+        # Not staged locally: keep the defaults
+        return ",", '"', True, "utf-8", ENCODING_OPTIONS, dash.no_update, ""
+
+    options = ENCODING_OPTIONS
+    if settings["encoding"] not in {option["value"] for option in options}:
+        options = options + [{"label": settings["encoding"].upper(), "value": settings["encoding"]}]
+
+    note = (
+        f"Detected {DELIMITER_NAMES.get(settings['delimiter'], repr(settings['delimiter']))}-delimited, "
+        f"{'with' if settings['header'] else 'without'} header, {settings['encoding'].upper()} "
+        f"({settings['confidence']:.0%} confidence)"
+    )
+    return (
+        settings["delimiter"],
+        settings["quote_char"],
+        settings["header"],
+        settings["encoding"],
+        options,
+        settings,
+        note
+    )
+
+@callback(
+    [Output("file-preview-payload", "data"),
      Output("file-info", "children"),
      Output("file-preview-metadata", "children")],
     [Input("file-path", "data"),
@@ -274,22 +325,22 @@ def update_table_preview(catalog, schema, table, is_validated):
      Input("file-encoding", "value")],
     prevent_initial_call=True
 )
+@traced(kind="server")
 def show_file_preview(file_path, delimiter, quote_char, header, encoding):
     if not file_path:
-        return [], [], "No file available for preview.", ""
+        return None, "No file available for preview.", ""
 
     csv_settings = {
         "delimiter": delimiter or ",",
-        "quote_char": quote_char or '"',
+        "quote_char": quote_char if quote_char is not None else '"',
         "header": header if header is not None else True,
         "encoding": encoding or "utf-8"
     }
 
     filename = file_path.split("/")[-1]
     try:
-        df = read_file_from_volume(
-            DATABRICKS_VOLUME_PATH, 
-            filename, 
+        preview = get_file_preview(
+            file_path,
             delimiter=csv_settings["delimiter"],
             quote_char=csv_settings["quote_char"],
             header=csv_settings["header"],
@@ -297,25 +348,74 @@ def show_file_preview(file_path, delimiter, quote_char, header, encoding):
             limit=10
         )
 
-        if not df.empty:
-            if '_rescued_data' in df.columns:
-                df = df.drop('_rescued_data', axis=1)
-            
-            # Create simple columns
-            columns = [{"name": col, "id": col} for col in df.columns]
-            
-            preview_metadata = f"Showing {len(df)} rows, {len(df.columns)} columns"
+        if preview:
+            preview_metadata = f"{len(preview['fields'])} columns; scroll to page through all rows"
             return (
-                df.to_dict("records"),
-                columns,
+                preview,
                 f"File retrieved: {filename}",
                 preview_metadata
             )
         else:
-            return [], [], "File not found or error processing file.", ""
+            return None, "File not found or error processing file.", ""
     except Exception as e:
         print(f"Error processing file: {str(e)}")
-        return [], [], f"Error processing file: {str(e)}", ""
+        return None, f"Error processing file: {str(e)}", ""
+
+@callback(
+    Output("file-preview-page", "data"),
+    Input("file-preview", "getRowsRequest"),
+    [State("file-path", "data"),
+     State("column-delimiter", "value"),
+     State("quote-character", "value"),
+     State("header-settings", "value"),
+     State("file-encoding", "value")],
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def load_file_page(request, file_path, delimiter, quote_char, header, encoding):
+    if not request:
+        return dash.no_update
+    if not file_path:
+        return {"fields": [], "columns": [], "num_rows": 0, "row_count": 0}
+
+    try:
+        return get_file_page(
+            file_path,
+            request,
+            delimiter=delimiter or ",",
+            quote_char=quote_char if quote_char is not None else '"',
+            header=header if header is not None else True,
+            encoding=encoding or "utf-8"
+        )
+    except Exception as e:
+        print(f"Error loading file page: {str(e)}")
+        return {"fields": [], "columns": [], "num_rows": 0, "row_count": 0}
+
+@callback(
+    Output("table-preview-page", "data"),
+    Input("table-preview", "getRowsRequest"),
+    [State("catalog-select", "value"),
+     State("schema-select", "value"),
+     State("table-select", "value"),
+     State("session-id", "data")],
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def load_table_page(request, catalog, schema, table, session_id):
+    if not request:
+        return dash.no_update
+    if not all([catalog, schema, table]):
+        return {"fields": [], "columns": [], "num_rows": 0, "row_count": 0}
+
+    try:
+        # A newer request in this session, e.g. for another table, cancels the running statement
+        return get_table_page(catalog, schema, table, request, session_id)
+    except StatementCancelled:
+        # Superseded by a newer request, which answers the grid instead
+        return dash.no_update
+    except Exception as e:
+        print(f"Error loading table page: {str(e)}")
+        return {"fields": [], "columns": [], "num_rows": 0, "row_count": 0}
 
 @callback(
     [Output("validation-results", "children"),
@@ -336,6 +436,7 @@ def show_file_preview(file_path, delimiter, quote_char, header, encoding):
         (Output("validate-data", "children"), "Validating...", "Validate Data")
     ]
 )
+@traced(kind="server")
 def validate_data(n_clicks, file_path, catalog, schema, table, delimiter, quote_char, header, encoding):
     if not n_clicks or not all([file_path, catalog, schema, table]):
         return "", True, False
@@ -345,7 +446,7 @@ def validate_data(n_clicks, file_path, catalog, schema, table, delimiter, quote_
         
         # Get table schema
         schema_df = describe_table(catalog, schema, table)
-        table_dtypes = dict(zip(schema_df['col_name'], schema_df['data_type']))
+        table_dtypes = table_columns(schema_df)
 
         # Add validation header
         validation_results.append(
@@ -353,7 +454,7 @@ def validate_data(n_clicks, file_path, catalog, schema, table, delimiter, quote_
         )
 
         # File check
-        if not file_path.lower().endswith('.csv'):
+        if not is_csv_file(file_path):
             validation_results.append(
                 html.Div("❌ Invalid file type. Only CSV files are supported.", 
                         className="text-danger mb-2")
@@ -363,84 +464,34 @@ def validate_data(n_clicks, file_path, catalog, schema, table, delimiter, quote_
         # Read the file
         csv_settings = {
             "delimiter": delimiter or ",",
-            "quote_char": quote_char or '"',
+            "quote_char": quote_char if quote_char is not None else '"',
             "header": header if header is not None else True,
             "encoding": encoding or "utf-8"
         }
 
-        df = read_file_from_volume(
-            DATABRICKS_VOLUME_PATH,
-            file_path.split("/")[-1],
-            **csv_settings
-        )
-
-        if '_rescued_data' in df.columns:
-            df = df.drop('_rescued_data', axis=1)
-
-        # Validate columns
-        missing_cols = set(table_dtypes.keys()) - set(df.columns)
-        extra_cols = set(df.columns) - set(table_dtypes.keys())
-        validation_errors = []
-
-        if missing_cols:
-            validation_errors.append(
-                html.Div(f"Missing columns in file: {', '.join(missing_cols)}", 
-                        className="text-danger")
-            )
-        
-        if extra_cols:
-            validation_errors.append(
-                html.Div(f"Extra columns in file: {', '.join(extra_cols)}", 
-                        className="text-danger")
+        not_null_columns = get_not_null_columns(catalog, schema, table)
+
+        # Validate every row locally when the file is still staged from its upload,
+        # otherwise push the whole check down to the warehouse as one aggregate query.
+        # Pinned files have not been put to the volume yet and are always validated locally.
+        file_name = file_path.split("/")[-1]
+        local_path = staged_file_path(LOCAL_STAGING_DIR, file_name)
+        if local_path and (VALIDATION_MODE != "warehouse" or staged_file_pinned(LOCAL_STAGING_DIR, file_name)):
+            report = validate_csv_file(
+                local_path,
+                table_dtypes,
+                not_null_columns,
+                block_size=VALIDATION_BLOCK_SIZE,
+                **csv_settings
             )
-
-        # Validate data types
-        type_errors = []
-        for col in df.columns:
-            if col in table_dtypes:
-                expected_type = table_dtypes[col].upper()
-                # Add data type validation logic here
-                sample_values = df[col].dropna()
-                
-                if expected_type in ['TINYINT', 'SMALLINT', 'INT', 'BIGINT']:
-                    if not pd.to_numeric(sample_values, errors='coerce').notna().all():
-                        type_errors.append(f"Column '{col}' should be INTEGER type")
-                
-                elif expected_type in ['FLOAT', 'DOUBLE', 'DECIMAL']:
-                    if not pd.to_numeric(sample_values, errors='coerce').notna().all():
-                        type_errors.append(f"Column '{col}' should be NUMERIC type")
-                
-                elif expected_type == 'TIMESTAMP':
-                    if not pd.to_datetime(sample_values, errors='coerce').notna().all():
-                        type_errors.append(f"Column '{col}' should be TIMESTAMP type")
-                
-                elif expected_type == 'BOOLEAN':
-                    valid_values = {'true', 'false', '1', '0', 'yes', 'no'}
-                    if not sample_values.astype(str).str.lower().isin(valid_values).all():
-                        type_errors.append(f"Column '{col}' should be BOOLEAN type")
-
-        if type_errors:
-            validation_errors.extend([
-                html.Div(error, className="text-danger")
-                for error in type_errors
-            ])
-
-        if validation_errors:
-            validation_results.extend([
-                html.Div([
-                    html.I(className="fas fa-times-circle me-2"),
-                    error
-                ], className="text-danger mb-2")
-                for error in validation_errors
-            ])
-            return html.Div(validation_results), True, False
         else:
-            return html.Div([
-                html.Div([
-                    html.I(className="fas fa-check-circle me-2"),
-                    "Validation successful!"
-                ], className="text-success")
-            ]), False, True
+            report = validate_file_in_warehouse(
+                file_path,
+                table_dtypes,
+                not_null_columns,
+                **csv_settings
+            )
+        return get_validation_report(report), not report.ok, report.ok
 
     except Exception as e:
         return html.Div([
@@ -452,9 +503,7 @@ def validate_data(n_clicks, file_path, catalog, schema, table, delimiter, quote_
 
 @callback(
     [Output("processing-status", "children"),
-     Output("append-overlay", "style"),
-     Output("success-modal", "is_open"),
-     Output("success-message", "children")],
+     Output("append-job", "data")],
     Input("confirm-append", "n_clicks"),
     [State("file-path", "data"),
      State("catalog-select", "value"),
@@ -465,91 +514,104 @@ def validate_data(n_clicks, file_path, catalog, schema, table, delimiter, quote_
      State("header-settings", "value"),
      State("file-encoding", "value"),
      State("validation-state", "data")],
-    prevent_initial_call=True,
-    running=[
-        (Output("confirm-append", "disabled", allow_duplicate=True), True, False),
-        (Output("confirm-append", "children"),
-         html.Div([
-             dbc.Spinner(size="sm", color="light"),
-             html.Span("Inserting data...", className="ms-2")
-         ]),
-         "Confirm and Append Data")
-    ]
+    prevent_initial_call=True
 )
+@traced(kind="server")
 def append_data(n_clicks, file_path, catalog, schema, table, delimiter, quote_char, header, encoding, is_validated):
     if not n_clicks or not is_validated:
-        return "", {"display": "none"}, False, ""
-    
-    overlay_style = {
-        "position": "fixed",
-        "top": 0,
-        "left": 0,
-        "right": 0,
-        "bottom": 0,
-        "backgroundColor": "rgba(0, 0, 0, 0.5)",
-        "zIndex": 1000,
-        "display": "block"
+        return "", None
+
+    csv_settings = {
+        "delimiter": delimiter or ",",
+        "quote_char": quote_char if quote_char is not None else '"',
+        "header": header if header is not None else True,
+        "encoding": encoding or "utf-8"
     }
-    
+
     try:
-        # Read the file with settings
-        csv_settings = {
-            "delimiter": delimiter or ",",
-            "quote_char": quote_char or '"',
-            "header": header if header is not None else True,
-            "encoding": encoding or "utf-8"
-        }
-        
-        # Read the file to get total rows
-        df = read_file_from_volume(
-            DATABRICKS_VOLUME_PATH,
-            file_path.split("/")[-1],
-            **csv_settings,
-            limit=None  # Read all rows
-        )
-        
-        if '_rescued_data' in df.columns:
-            df = df.drop('_rescued_data', axis=1)
-        
-        # Get the total number of rows
-        total_rows = len(df)
-        
-        # Insert the data and get rows inserted
-        rows_inserted = insert_data_to_table(
-            catalog=catalog,
-            schema=schema,
-            table=table,
-            data=df,
-            file_path=file_path,
-            header=csv_settings["header"],
-            delimiter=csv_settings["delimiter"],
-            quote_char=csv_settings["quote_char"],
-            encoding=csv_settings["encoding"]
-        )
-        
+        # The INSERT runs in a job worker process, so it survives page reloads and app restarts
+        job_id = submit_append_job(catalog, schema, table, file_path, csv_settings)
+    except Exception as e:
+        print(f"Error queueing append: {str(e)}")
+        return html.Div([
+            html.Div([
+                html.I(className="fas fa-exclamation-circle me-2"),
+                "Error appending data:"
+            ], className="text-danger fw-bold"),
+            html.Div(str(e), className="text-danger ms-4 mt-2")
+        ]), None
+
+    return _job_status(get_job_queue().get(job_id)), job_id
+
+def _job_status(job):
+    # The worker publishes the job's stages under the job id
+    progress = read_progress(job["id"]) if job["state"] != "queued" else None
+    return html.Div([
+        html.Div([
+            dbc.Spinner(size="sm", color="primary"),
+            html.Span(
+                f"Append {job['state']}" + (f" (attempt {job['attempts']} of {job['max_attempts']})" if job["attempts"] > 1 else ""),
+                className="ms-2"
+            ),
+            dcc.Link("View all jobs", href="/jobs", className="ms-3 small")
+        ], className="d-flex align-items-center justify-content-center mb-2"),
+        get_progress_report(progress) if progress else None
+    ])
+
+@callback(
+    [Output("append-job-poll", "disabled"),
+     Output("confirm-append", "disabled", allow_duplicate=True)],
+    Input("append-job", "data"),
+    prevent_initial_call="initial_duplicate"
+)
+@traced(kind="server")
+def toggle_append_job_poll(job_id):
+    return not job_id, bool(job_id)
+
+@callback(
+    [Output("processing-status", "children", allow_duplicate=True),
+     Output("success-modal", "is_open"),
+     Output("success-message", "children"),
+     Output("append-job", "data", allow_duplicate=True)],
+    Input("append-job-poll", "n_intervals"),
+    [State("append-job", "data")],
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def poll_append_job(_, job_id):
+    if not job_id:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return "", False, "", None
+    if job["state"] == SUCCEEDED:
+        params = job["params"]
+        # The worker's invalidation is published too; this covers a log that was unavailable
+        invalidate_metadata(params["catalog"], params["schema"], params["table"])
         success_message = (
-            f"Successfully inserted {rows_inserted:,} rows into {catalog}.{schema}.{table}. "
+            f"Successfully inserted {job['result']['rows']:,} rows into {params['catalog']}.{params['schema']}.{params['table']}. "
             f"Click 'Upload Another' to process another file or 'Close' to stay on this page."
         )
-        return "", {"display": "none"}, True, success_message
-        
-    except Exception as e:
-        print(f"Error appending data: {str(e)}")
+        return "", True, success_message, None
+    if job["state"] in FINISHED_STATES:
         return html.Div([
             html.Div([
                 html.I(className="fas fa-exclamation-circle me-2"),
                 "Error appending data:"
             ], className="text-danger fw-bold"),
-            html.Div(str(e), className="text-danger ms-4 mt-2")
-        ]), {"display": "none"}, False, ""
+            html.Div(job["error"] or f"The append job was {job['state']}.", className="text-danger ms-4 mt-2")
+        ]), False, "", None
+    return _job_status(job), dash.no_update, dash.no_update, dash.no_update
 
 @callback(
     Output("validate-data", "disabled"),
     [Input("catalog-select", "value"),
      Input("schema-select", "value"),
      Input("table-select", "value"),
-     Input("table-preview", "data")]
+     Input("table-preview-payload", "data")]
 )
+@traced(kind="server")
 def toggle_validate_button(catalog, schema, table, preview_data):
     return not (all([catalog, schema, table]) and preview_data)
 
@@ -558,5 +620,6 @@ def toggle_validate_button(catalog, schema, table, preview_data):
     Input("close-success-modal", "n_clicks"),
     prevent_initial_call=True
 )
+@traced(kind="server")
 def close_success_modal(n_clicks):
     return False
\ No newline at end of file
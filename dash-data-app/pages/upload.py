@@ -1,8 +1,14 @@
 import dash
 import dash_bootstrap_components as dbc
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State
 from dbutils import save_file_to_volume
-from config import DATABRICKS_VOLUME_PATH
+from progress import ProgressReporter, read_progress
+from components.progress_report import get_progress_report
+from compressed_files import INVALID_FILE_MESSAGE, UPLOAD_ACCEPT, is_csv_file
+from config import DATABRICKS_VOLUME_PATH, MAX_UPLOAD_SIZE_MB, CHUNKED_UPLOAD_PARALLELISM, LOCAL_STAGING_DIR, CSV_DETECT_SAMPLE_KB
+from tracing import traced
+from csv_dialect import staged_csv_settings
+from staging import decoded_size
 from typing import Tuple, Optional
 from dash.exceptions import PreventUpdate
 
@@ -11,18 +17,15 @@ dash.register_page(__name__, path="/")
 layout = dbc.Container([
     html.H4("Append Table From File Upload", className="fw-bold mt-4 text-center"),
 
-    # Add loading overlay for the entire upload process
-    dbc.Spinner(
-        html.Div(id="upload-progress", className="text-center mb-3"),
-        color="primary",
-        type="border",
-    ),
+    # Stages of the running upload (see show_upload_progress)
+    html.Div(id="upload-progress", className="text-center mb-3"),
 
     dcc.Upload(
         id="upload-data",
         children=html.Div([
             "Drag and Drop or ",
-            html.A("Select a CSV File")
+            html.A("Select a CSV File"),
+            " (.csv, .csv.gz, .csv.zst or .zip)"
         ]),
         style={
             "width": "100%",
@@ -34,30 +37,91 @@ layout = dbc.Container([
             "textAlign": "center",
             "margin": "10px"
         },
-        accept=".csv"
+        accept=UPLOAD_ACCEPT
+    ),
+
+    # Large files are sent in resumable binary chunks (see assets/chunked_upload.js)
+    html.Div([
+        dbc.Label("Large file (resumable upload)", className="text-muted small"),
+        # The file input is created by the client script inside this container
+        html.Div(
+            id="chunked-upload",
+            **{"data-parallelism": str(CHUNKED_UPLOAD_PARALLELISM), "data-accept": UPLOAD_ACCEPT}
+        ),
+        html.Div(
+            html.Div(id="chunked-upload-bar", className="progress-bar", style={"width": "0%"}),
+            className="progress mt-2"
+        ),
+        html.Div(id="chunked-upload-status", className="text-muted small mt-1"),
+    ], className="m-2"),
+
+    html.Div(
+        [
+            dcc.Link("Append many files to one table →", href="/batch-append"),
+            dcc.Link("Append jobs →", href="/jobs", className="ms-3"),
+            dcc.Link("Query analytics →", href="/query-log", className="ms-3"),
+        ],
+        className="m-2 small"
     ),
 
     html.Div(id="upload-status", className="mt-4 text-center"),
     dcc.Location(id="redirect", refresh=True),
-    dcc.Store(id="file-path", storage_type="session")
+    dcc.Store(id="file-path", storage_type="session"),
+    # Settings detected from the staged file, applied by the append page
+    dcc.Store(id="csv-settings", storage_type="session"),
+    dcc.Store(id="chunked-upload-result"),
+    # Each upload is processed under a new operation id whose stages are polled while it runs
+    dcc.Store(id="upload-operation"),
+    dcc.Interval(id="upload-progress-poll", interval=500, disabled=True)
 ], fluid=True)
 
+# Upload stages reported by save_file_to_volume
+UPLOAD_STAGES = [("decode", "Decoding upload"), ("put", "Uploading to the volume")]
+
+clientside_callback(
+    ClientsideFunction(namespace="progress", function_name="begin"),
+    [Output("upload-operation", "data"),
+     Output("upload-progress-poll", "disabled")],
+    Input("upload-data", "contents"),
+    prevent_initial_call=True
+)
+
+@callback(
+    Output("upload-progress", "children", allow_duplicate=True),
+    Input("upload-progress-poll", "n_intervals"),
+    State("upload-operation", "data"),
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def show_upload_progress(_, operation_id: Optional[str]):
+    """Render the stages of the running upload."""
+    progress = read_progress(operation_id) if operation_id else None
+    if progress is None:
+        raise PreventUpdate
+    return get_progress_report(progress)
+
 @callback(
     [Output("redirect", "pathname"),
      Output("upload-status", "children"),
      Output("file-path", "data"),
-     Output("upload-progress", "children")],
-    Input("upload-data", "contents"),
-    State("upload-data", "filename"),
+     Output("upload-progress", "children"),
+     Output("upload-progress-poll", "disabled", allow_duplicate=True),
+     Output("csv-settings", "data")],
+    Input("upload-operation", "data"),
+    [State("upload-data", "contents"),
+     State("upload-data", "filename")],
     prevent_initial_call=True
 )
+@traced(kind="server")
 def handle_file_upload(
+    operation_id: Optional[str],
     contents: Optional[str], 
     filename: Optional[str]
-) -> Tuple[str, html.P, Optional[str], str]:
+) -> Tuple[str, html.P, Optional[str], str, bool, Optional[dict]]:
     """Handle file upload and validation.
     
     Args:
+        operation_id: Id under which the upload's progress is published
         contents: Base64 encoded file contents
         filename: Original filename
         
@@ -67,51 +131,56 @@ def handle_file_upload(
         - Status message component
         - File path for storage
         - Progress message
+        - Whether progress polling stops
+        - CSV settings detected from the uploaded file
     """
     if contents is None or filename is None:
         raise PreventUpdate
 
-    # Validate file size (100MB limit)
-    file_size = len(contents) * 3/4  # Approximate size from base64
-    if file_size > 100 * 1024 * 1024:
+    # Validate file size
+    file_size = decoded_size(contents)
+    if file_size > MAX_UPLOAD_SIZE_MB * 1024 * 1024:
         return (
             "/",
-            html.P("File too large. Maximum size is 100MB.", className="text-danger"),
+            html.P(f"File too large. Maximum size is {MAX_UPLOAD_SIZE_MB}MB.", className="text-danger"),
             None,
-            ""
+            "",
+            True,
+            None
         )
 
     # Validate file extension
-    if not filename.lower().endswith('.csv'):
+    if not is_csv_file(filename):
         return (
             "/",
-            html.P("Invalid file format. Please upload a CSV file.", className="text-danger"),
+            html.P(INVALID_FILE_MESSAGE, className="text-danger"),
             None,
-            ""
+            "",
+            True,
+            None
         )
 
     try:
-        # Show upload in progress message
-        progress_message = html.Div([
-            "Uploading and processing file...",
-            html.Div(className="mt-2"),
-            dbc.Progress(value=100, striped=True, animated=True)
-        ])
-
-        file_path = save_file_to_volume(contents, DATABRICKS_VOLUME_PATH, filename)
+        # Stages are shown by show_upload_progress while this callback runs
+        progress = ProgressReporter(operation_id, UPLOAD_STAGES, totals={"decode": file_size, "put": file_size})
+        file_path = save_file_to_volume(contents, DATABRICKS_VOLUME_PATH, filename, progress=progress)
         if file_path:
             return (
                 "/append-table",
                 html.P(f"File uploaded successfully: {filename}", className="text-success"),
                 file_path,
-                ""
+                "",
+                True,
+                staged_csv_settings(LOCAL_STAGING_DIR, file_path, CSV_DETECT_SAMPLE_KB * 1024)
             )
         
         return (
             "/",
             html.P("Failed to upload file. Please try again.", className="text-danger"),
             None,
-            ""
+            "",
+            True,
+            None
         )
 
     except Exception as e:
@@ -120,5 +189,39 @@ def handle_file_upload(
             "/",
             html.P(f"Error: {str(e)}", className="text-danger"),
             None,
-            ""
-        )
\ No newline at end of file
+            "",
+            True,
+            None
+        )
+
+@callback(
+    [Output("redirect", "pathname", allow_duplicate=True),
+     Output("upload-status", "children", allow_duplicate=True),
+     Output("file-path", "data", allow_duplicate=True),
+     Output("csv-settings", "data", allow_duplicate=True)],
+    Input("chunked-upload-result", "data"),
+    prevent_initial_call=True
+)
+@traced(kind="server")
+def handle_chunked_upload(result: Optional[dict]) -> Tuple[str, html.P, str, Optional[dict]]:
+    """Hand a completed chunked upload over to the append page.
+
+    Args:
+        result: Response of the upload completion endpoint
+
+    Returns:
+        Tuple containing:
+        - Redirect path
+        - Status message component
+        - File path for storage
+        - CSV settings detected from the uploaded file
+    """
+    if not result or not result.get("file_path"):
+        raise PreventUpdate
+
+    return (
+        "/append-table",
+        html.P(f"File uploaded successfully: {result['filename']}", className="text-success"),
+        result["file_path"],
+        staged_csv_settings(LOCAL_STAGING_DIR, result["file_path"], CSV_DETECT_SAMPLE_KB * 1024)
+    )
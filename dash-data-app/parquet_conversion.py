@@ -0,0 +1,181 @@
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from validation_engine import OFFSET_PATTERN, base_type, normalize_datetime
+from compressed_files import compression_of
+
+_INTEGER_TYPES = {
+    "TINYINT": pa.int8(),
+    "SMALLINT": pa.int16(),
+    "INT": pa.int32(),
+    "INTEGER": pa.int32(),
+    "BIGINT": pa.int64(),
+}
+_TRUE_VALUES = ["true", "1", "yes", "t", "y"]
+
+
+class UnsupportedConversion(Exception):
+    """Raised when a file cannot be converted to the table's types; the CSV is ingested instead."""
+
+
+@dataclass
+class ConversionStats:
+    """Size and duration of a CSV to Parquet conversion."""
+    rows: int
+    columns: List[str]
+    input_bytes: int
+    output_bytes: int
+    seconds: float
+
+
+def arrow_type(data_type: str) -> pa.DataType:
+    """
+    Returns the Arrow type that a table column of `data_type` (as in DESCRIBE TABLE) is written as.
+
+    Raises:
+        UnsupportedConversion: For complex and other types without a lossless Parquet mapping.
+    """
+    kind = base_type(data_type)
+    if kind in _INTEGER_TYPES:
+        return _INTEGER_TYPES[kind]
+    if kind == "DOUBLE":
+        return pa.float64()
+    if kind in ("FLOAT", "REAL"):
+        return pa.float32()
+    if kind in ("DECIMAL", "DEC", "NUMERIC"):
+        match = re.search(r"\((\d+)\s*,\s*(\d+)\)", data_type)
+        precision, scale = (int(match.group(1)), int(match.group(2))) if match else (10, 0)
+        return pa.decimal128(precision, scale)
+    if kind == "BOOLEAN":
+        return pa.bool_()
+    if kind == "DATE":
+        return pa.date32()
+    if kind in ("TIMESTAMP", "TIMESTAMP_LTZ"):
+        return pa.timestamp("us", tz="UTC")
+    if kind == "TIMESTAMP_NTZ":
+        return pa.timestamp("us")
+    if kind in ("STRING", "VARCHAR", "CHAR"):
+        return pa.string()
+    raise UnsupportedConversion(f"Columns of type {data_type} are not converted to Parquet")
+
+
+def _convert_column(values: pa.ChunkedArray, target: pa.DataType) -> pa.ChunkedArray:
+    """
+    Casts a column read as strings to its table type, with the warehouse's parsing rules.
+    """
+    if pa.types.is_string(target):
+        return values
+    trimmed = pc.utf8_trim_whitespace(values)
+    if pa.types.is_boolean(target):
+        lowered = pc.utf8_lower(trimmed)
+        # Anything but the accepted literals was rejected by validation before the append
+        return pc.if_else(pc.is_null(lowered), pa.scalar(None, pa.bool_()), pc.is_in(lowered, value_set=pa.array(_TRUE_VALUES)))
+    if pa.types.is_date(target) or pa.types.is_timestamp(target):
+        # Same forms as validation accepted: one-digit fields, nanosecond fractions
+        trimmed = normalize_datetime(trimmed)
+    if pa.types.is_timestamp(target) and target.tz is None:
+        # Like the warehouse, TIMESTAMP_NTZ ignores a zone offset
+        return pc.cast(pc.replace_substring_regex(trimmed, OFFSET_PATTERN, ""), target)
+    if pa.types.is_timestamp(target):
+        # Values without an offset are in the warehouse's default session time zone, UTC
+        has_offset = pc.match_substring_regex(trimmed, OFFSET_PATTERN)
+        local = pc.cast(pc.if_else(has_offset, pa.scalar(None, pa.string()), trimmed), pa.timestamp("us"))
+        offset = pc.cast(pc.if_else(has_offset, trimmed, pa.scalar(None, pa.string())), target)
+        return pc.if_else(has_offset, offset, pc.assume_timezone(local, target.tz))
+    return pc.cast(trimmed, target)
+
+
+def convert_csv_to_parquet(
+    local_path: str,
+    target_path: str,
+    table_columns: Dict[str, str],
+    delimiter: str = ",",
+    quote_char: str = '"',
+    header: bool = True,
+    encoding: str = "utf-8",
+    compression: str = "zstd",
+    row_group_rows: int = 1_000_000,
+    block_size: int = 8 * 1024 * 1024,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> ConversionStats:
+    """
+    Streams a local CSV file into a compressed Parquet file typed to the target table.
+
+    File columns are typed by position from `table_columns` (DESCRIBE TABLE order),
+    matching the positional INSERT ... SELECT used for CSV files. Without a header the
+    table's column names are used. The file is read in blocks of `block_size` bytes
+    with every column as a string and cast per column with Arrow kernels, so memory is
+    bounded by one row group.
+
+    Args:
+        on_progress (Optional[Callable]): Called with the number of file bytes read so far;
+            for gzip and zstd files these are compressed bytes.
+
+    Returns:
+        ConversionStats: Rows, column names, input and output bytes and duration.
+
+    Raises:
+        UnsupportedConversion: If a column type has no Parquet mapping, the column counts
+            differ, or a value cannot be cast.
+    """
+    started = time.monotonic()
+    types = [arrow_type(data_type) for data_type in table_columns.values()]
+
+    read_options = pa_csv.ReadOptions(encoding=encoding, autogenerate_column_names=not header, block_size=block_size)
+    parse_options = pa_csv.ParseOptions(delimiter=delimiter, quote_char=quote_char or False)
+    with pa_csv.open_csv(local_path, read_options=read_options, parse_options=parse_options) as reader:
+        raw_names = reader.schema.names
+    if len(raw_names) != len(types):
+        raise UnsupportedConversion(f"The file has {len(raw_names)} columns, the table {len(types)}")
+
+    names = [str(name).strip() for name in raw_names] if header else list(table_columns)
+    schema = pa.schema([pa.field(name, data_type) for name, data_type in zip(names, types)])
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in raw_names},
+        # read_files treats empty fields as NULL for every column type
+        null_values=[""],
+        strings_can_be_null=True,
+    )
+
+    rows = 0
+    pending: List[pa.RecordBatch] = []
+    pending_rows = 0
+    codec = compression_of(local_path)
+    with open(local_path, "rb") as source, \
+            pa_csv.open_csv(pa.CompressedInputStream(source, codec) if codec else source, read_options, parse_options, convert_options) as reader, \
+            pq.ParquetWriter(target_path, schema, compression=compression) as writer:
+
+        def flush():
+            # Row groups of `row_group_rows` keep the file efficient to scan on the warehouse
+            table = pa.Table.from_batches(pending)
+            try:
+                columns = [_convert_column(table.column(i), field.type) for i, field in enumerate(schema)]
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise UnsupportedConversion(f"Values cannot be converted to the table's types: {str(e)}")
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+        for batch in reader:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            rows += batch.num_rows
+            if pending_rows >= row_group_rows:
+                flush()
+                pending, pending_rows = [], 0
+            if on_progress is not None:
+                on_progress(source.tell())
+        if pending:
+            flush()
+
+    return ConversionStats(
+        rows=rows,
+        columns=names,
+        input_bytes=os.path.getsize(local_path),
+        output_bytes=os.path.getsize(target_path),
+        seconds=round(time.monotonic() - started, 2)
+    )
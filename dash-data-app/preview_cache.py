@@ -0,0 +1,81 @@
+from typing import Any, Dict, Optional
+import diskcache
+from arrow_payload import columnar_payload
+from dbutils import read_file_arrow
+from staging import staged_file_stats
+from config import (
+    DATABRICKS_VOLUME_PATH,
+    LOCAL_STAGING_DIR,
+    PREVIEW_CACHE_DIR,
+    PREVIEW_CACHE_MAX_MB
+)
+
+_cache: Optional[diskcache.Cache] = None
+
+
+def _get_cache() -> diskcache.Cache:
+    """
+    Returns the on-disk preview cache, which is shared by all worker processes on the host.
+    """
+    global _cache
+    if _cache is None:
+        _cache = diskcache.Cache(
+            PREVIEW_CACHE_DIR,
+            size_limit=PREVIEW_CACHE_MAX_MB * 1024 * 1024,
+            eviction_policy="least-recently-used"
+        )
+    return _cache
+
+
+def _file_digest(file_name: str) -> Optional[str]:
+    """
+    Returns the SHA-256 of an uploaded file's content, or None if it is unknown.
+
+    The digest comes from the local staging sidecar and is remembered in the shared
+    cache so that it stays available after the local copy has been evicted.
+    """
+    cache = _get_cache()
+    stats = staged_file_stats(LOCAL_STAGING_DIR, file_name)
+    if stats is not None:
+        cache.set(("digest", file_name), stats.sha256)
+        return stats.sha256
+    return cache.get(("digest", file_name))
+
+
+def get_file_preview(file_path: str, delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8", limit: int = 10) -> Optional[Dict[str, Any]]:
+    """
+    Returns the ready-to-send preview of an uploaded file for the given CSV settings.
+
+    Previews are cached by (content digest, delimiter, quote, header, encoding, limit),
+    so switching back to earlier settings or reloading the page does not re-read the file.
+
+    Returns:
+        Optional[Dict]: The columnar payload (see arrow_payload.columnar_payload) or None if
+            the file could not be read.
+    """
+    file_name = file_path.split("/")[-1]
+    digest = _file_digest(file_name)
+    # The payload format is part of the key so entries cached by older releases are never served
+    key = ("preview", "columnar", digest, delimiter, quote_char, bool(header), encoding, limit)
+
+    if digest is not None:
+        preview = _get_cache().get(key)
+        if preview is not None:
+            return preview
+
+    table = read_file_arrow(
+        DATABRICKS_VOLUME_PATH,
+        file_name,
+        delimiter=delimiter,
+        quote_char=quote_char,
+        header=header,
+        encoding=encoding,
+        limit=limit
+    )
+    if table.num_rows == 0:
+        return None
+
+    preview = columnar_payload(table)
+    if digest is not None:
+        _get_cache().set(key, preview)
+    return preview
@@ -0,0 +1,111 @@
+from typing import TYPE_CHECKING, Optional
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Large enough for a preview in one block, small enough to bound memory per request
+_BLOCK_SIZE = 1024 * 1024
+
+
+def _csv_options(delimiter: str, quote_char: str, header: bool, encoding: str, column_types: Optional[dict] = None):
+    """
+    Builds pyarrow CSV options matching the read_files(format => 'csv') settings used by the app.
+    """
+    read_options = pa_csv.ReadOptions(
+        encoding=encoding,
+        autogenerate_column_names=not header,
+        block_size=_BLOCK_SIZE
+    )
+    parse_options = pa_csv.ParseOptions(
+        delimiter=delimiter,
+        quote_char=quote_char or False
+    )
+    # read_files treats empty fields as NULL for every column type
+    convert_options = pa_csv.ConvertOptions(
+        null_values=[""],
+        strings_can_be_null=True,
+        column_types=column_types
+    )
+    return read_options, parse_options, convert_options
+
+
+def read_csv_preview_arrow(local_path: str, delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8", limit: Optional[int] = 10) -> pa.Table:
+    """
+    Parses the first `limit` rows of a local CSV file into an Arrow table.
+
+    Only as many blocks as needed are read. If a later block does not match the
+    types inferred from the first one, the rows are re-read as strings.
+
+    Args:
+        local_path (str): Path of the CSV file.
+        delimiter (str): Column delimiter.
+        quote_char (str): Quote character; empty to disable quoting.
+        header (bool): Whether the first row contains column names.
+        encoding (str): File encoding.
+        limit (Optional[int]): Maximum number of rows; None reads the whole file.
+
+    Returns:
+        pa.Table: The parsed rows.
+    """
+    try:
+        return _read_batches(local_path, delimiter, quote_char, header, encoding, limit)
+    except pa.ArrowInvalid:
+        with pa_csv.open_csv(local_path, *_csv_options(delimiter, quote_char, header, encoding)) as reader:
+            names = reader.schema.names
+        string_types = {name: pa.string() for name in names}
+        return _read_batches(local_path, delimiter, quote_char, header, encoding, limit, string_types)
+
+
+def _read_batches(local_path, delimiter, quote_char, header, encoding, limit, column_types=None) -> pa.Table:
+    batches = []
+    rows = 0
+    with pa_csv.open_csv(local_path, *_csv_options(delimiter, quote_char, header, encoding, column_types)) as reader:
+        schema = reader.schema
+        for batch in reader:
+            if limit is not None and rows + batch.num_rows >= limit:
+                batches.append(batch.slice(0, limit - rows))
+                break
+            batches.append(batch)
+            rows += batch.num_rows
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def read_csv_preview(local_path: str, delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8", limit: Optional[int] = 10) -> "pd.DataFrame":
+    """
+    Parses the first `limit` rows of a local CSV file into a Pandas DataFrame.
+
+    See read_csv_preview_arrow for the parsing semantics.
+    """
+    return read_csv_preview_arrow(local_path, delimiter, quote_char, header, encoding, limit).to_pandas()
+
+
+def write_arrow_file(local_path: str, target_path: str, delimiter: str = ",", quote_char: str = '"', header: bool = True, encoding: str = "utf-8") -> int:
+    """
+    Converts a whole local CSV file into an uncompressed Arrow IPC file, block by block.
+
+    The result can be memory-mapped, so pages of it are read without loading the file.
+    Types are inferred as for previews; if a later block does not match them, the
+    file is converted again with every column as a string.
+
+    Returns:
+        int: Number of rows written.
+    """
+    try:
+        return _write_batches(local_path, target_path, delimiter, quote_char, header, encoding)
+    except pa.ArrowInvalid:
+        with pa_csv.open_csv(local_path, *_csv_options(delimiter, quote_char, header, encoding)) as reader:
+            names = reader.schema.names
+        string_types = {name: pa.string() for name in names}
+        return _write_batches(local_path, target_path, delimiter, quote_char, header, encoding, string_types)
+
+
+def _write_batches(local_path, target_path, delimiter, quote_char, header, encoding, column_types=None) -> int:
+    rows = 0
+    with pa_csv.open_csv(local_path, *_csv_options(delimiter, quote_char, header, encoding, column_types)) as reader:
+        with pa.ipc.new_file(target_path, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    return rows
@@ -0,0 +1,215 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import diskcache
+from metrics import increment, observe
+from config import PROGRESS_DIR, PROGRESS_EXPIRY, PROGRESS_UPDATE_INTERVAL
+
+# Weight of the newest measurement in the moving average of a stage's throughput
+_THROUGHPUT_WEIGHT = 0.3
+
+_store: Optional[diskcache.Cache] = None
+
+
+def _get_store() -> diskcache.Cache:
+    # Shared by the web process, background callbacks and job workers
+    global _store
+    if _store is None:
+        _store = diskcache.Cache(PROGRESS_DIR)
+    return _store
+
+
+def _record_measurement(kind: str, stage: str, value: float) -> None:
+    """
+    Folds a finished stage's measured rate or duration into the moving average used for estimates.
+    """
+    if value <= 0:
+        return
+    store = _get_store()
+    with store.transact():
+        previous = store.get((kind, stage))
+        store.set((kind, stage), value if previous is None else previous + _THROUGHPUT_WEIGHT * (value - previous))
+
+
+def expected_throughput(stage: str) -> Optional[float]:
+    """
+    Returns the average measured rate of a stage in units per second, if it has run before.
+    """
+    return _get_store().get(("throughput", stage))
+
+
+def expected_duration(stage: str) -> Optional[float]:
+    """
+    Returns the average duration in seconds of a stage without a known size, if it has run before.
+    """
+    return _get_store().get(("duration", stage))
+
+
+def _expected_seconds(stage: Dict[str, Any]) -> Optional[float]:
+    if stage["total"]:
+        rate = expected_throughput(stage["name"])
+        return stage["total"] / rate if rate else None
+    return expected_duration(stage["name"])
+
+
+class ProgressReporter:
+    """
+    Publishes the progress of a multi-stage operation (upload, append) under an operation id.
+
+    Events are written to a diskcache directory so that any process can read them with
+    read_progress: the page that started the operation, a polling endpoint or a job
+    status page. Stages that cannot report partial progress (e.g. a PUT or an INSERT
+    running on the warehouse) are given a total so that their remaining time can be
+    estimated from the throughput measured on earlier runs.
+
+    Args:
+        operation_id (str): Id under which the progress is published.
+        stages (Sequence[Tuple[str, str]]): (name, label) of every stage, in order.
+        totals (Optional[Dict[str, int]]): Sizes of stages known up front, so that the
+            remaining time of pending stages can be estimated as well.
+    """
+
+    def __init__(self, operation_id: str, stages: Sequence[Tuple[str, str]], totals: Optional[Dict[str, int]] = None):
+        self.operation_id = operation_id
+        self._state = {
+            "operation_id": operation_id,
+            "stages": [
+                {"name": name, "label": label, "state": "pending", "done": None, "total": (totals or {}).get(name),
+                 "unit": "bytes", "detail": "", "started_at": None, "finished_at": None}
+                for name, label in stages
+            ],
+            "updated_at": time.time(),
+        }
+        self._last_write = 0.0
+        self._write(force=True)
+
+    def _stage(self, name: str) -> Dict[str, Any]:
+        for stage in self._state["stages"]:
+            if stage["name"] == name:
+                return stage
+        raise KeyError(f"Unknown stage: {name}")
+
+    def _write(self, force: bool = False) -> None:
+        # Chunk loops may report thousands of times per second; only every
+        # PROGRESS_UPDATE_INTERVAL seconds is written, plus every state change
+        now = time.time()
+        if not force and now - self._last_write < PROGRESS_UPDATE_INTERVAL:
+            return
+        self._last_write = now
+        self._state["updated_at"] = now
+        try:
+            _get_store().set(("operation", self.operation_id), self._state, expire=PROGRESS_EXPIRY)
+        except Exception as e:
+            print(f"Error publishing progress of {self.operation_id}: {str(e)}")
+
+    def start(self, name: str, total: Optional[int] = None, unit: str = "bytes", detail: str = "") -> None:
+        stage = self._stage(name)
+        stage.update(state="running", unit=unit, detail=detail, started_at=time.time())
+        if total is not None:
+            stage["total"] = total
+        self._write(force=True)
+
+    def update(self, name: str, done: Optional[int] = None, detail: Optional[str] = None) -> None:
+        stage = self._stage(name)
+        changed = detail is not None and detail != stage["detail"]
+        if done is not None:
+            stage["done"] = done
+        if detail is not None:
+            stage["detail"] = detail
+        self._write(force=changed)
+
+    def finish(self, name: str, done: Optional[int] = None, detail: Optional[str] = None) -> None:
+        stage = self._stage(name)
+        stage["state"] = "done"
+        stage["finished_at"] = time.time()
+        if done is not None:
+            stage["done"] = done
+        if detail is not None:
+            stage["detail"] = detail
+        if stage["started_at"]:
+            seconds = stage["finished_at"] - stage["started_at"]
+            observe("stage_seconds", seconds, stage=name)
+            if stage["total"] and seconds > 0:
+                _record_measurement("throughput", name, stage["total"] / seconds)
+            elif not stage["total"]:
+                _record_measurement("duration", name, seconds)
+        self._write(force=True)
+
+    def skip(self, name: str, detail: str = "") -> None:
+        stage = self._stage(name)
+        stage.update(state="skipped", detail=detail, finished_at=time.time())
+        self._write(force=True)
+
+    def fail(self, name: str, message: str) -> None:
+        stage = self._stage(name)
+        stage.update(state="failed", detail=message, finished_at=time.time())
+        increment("stage_failures_total", stage=name)
+        self._write(force=True)
+
+
+def _stage_estimate(stage: Dict[str, Any], now: float) -> Dict[str, Any]:
+    """
+    Adds elapsed seconds, rate, percent and remaining seconds to a stage snapshot.
+    """
+    stage = dict(stage, elapsed=None, rate=None, percent=None, eta=None, estimated=False)
+    total = stage["total"]
+    if stage["state"] == "skipped":
+        return stage
+    if stage["state"] == "pending":
+        expected = _expected_seconds(stage)
+        if expected is not None:
+            stage.update(eta=expected, estimated=True)
+        return stage
+
+    end = stage["finished_at"] or now
+    elapsed = max(end - (stage["started_at"] or end), 0.0)
+    stage["elapsed"] = elapsed
+    if stage["state"] == "done":
+        stage.update(percent=100.0, eta=0.0)
+        if stage["done"] and elapsed:
+            stage["rate"] = stage["done"] / elapsed
+        return stage
+    if stage["state"] != "running":
+        return stage
+
+    if total and stage["done"] is not None and elapsed:
+        # Measured while running
+        rate = stage["done"] / elapsed
+        stage.update(rate=rate, percent=min(stage["done"] / total * 100, 100.0))
+        if rate:
+            stage["eta"] = (total - stage["done"]) / rate
+    else:
+        # No partial progress: estimate from earlier runs of the same stage
+        expected = _expected_seconds(stage)
+        if expected:
+            stage.update(
+                rate=total / expected if total else None,
+                percent=min(elapsed / expected * 100, 99.0),
+                eta=max(expected - elapsed, 0.0),
+                estimated=True
+            )
+    return stage
+
+
+def read_progress(operation_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the latest progress of an operation with rates and remaining time per stage.
+
+    Returns:
+        Optional[Dict]: {"operation_id", "stages": [...], "current", "eta", "updated_at"}, where
+            "eta" is the estimated seconds until the last stage ends (None if unknown), or None
+            if the operation is unknown or expired.
+    """
+    state = _get_store().get(("operation", operation_id))
+    if state is None:
+        return None
+
+    now = time.time()
+    stages: List[Dict[str, Any]] = [_stage_estimate(stage, now) for stage in state["stages"]]
+    remaining = [stage for stage in stages if stage["state"] in ("pending", "running")]
+    current = next((stage["name"] for stage in stages if stage["state"] in ("running", "failed")), None)
+    eta = None
+    if remaining and all(stage["eta"] is not None for stage in remaining):
+        eta = sum(stage["eta"] for stage in remaining)
+    elif not remaining:
+        eta = 0.0
+    return {"operation_id": operation_id, "stages": stages, "current": current, "eta": eta, "updated_at": state["updated_at"]}
@@ -0,0 +1,25 @@
+import re
+from flask import Flask, jsonify
+from progress import read_progress
+
+_OPERATION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def register_progress_routes(server: Flask) -> None:
+    """
+    Registers the progress polling endpoint on the Flask server underlying the Dash app.
+
+    Protocol:
+        GET /api/progress/<id>  -> stages with done/total, rate, percent and ETA, plus the overall ETA
+
+    Operation ids are upload ids for chunked uploads and job ids for append jobs.
+    """
+
+    @server.route("/api/progress/<operation_id>", methods=["GET"])
+    def get_progress(operation_id):
+        if not _OPERATION_ID.match(operation_id):
+            return jsonify(error="Invalid operation id."), 400
+        progress = read_progress(operation_id)
+        if progress is None:
+            return jsonify(error="No progress for this operation."), 404
+        return jsonify(progress)
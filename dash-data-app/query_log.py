@@ -0,0 +1,289 @@
+import atexit
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from config import QUERY_LOG_ENABLED, QUERY_LOG_PATH, QUERY_LOG_MAX_ROWS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    normalized TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    seconds REAL NOT NULL,
+    rows INTEGER,
+    bytes INTEGER,
+    caller TEXT,
+    session_id TEXT,
+    statement_id TEXT,
+    error TEXT,
+    query TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS statements_started_at ON statements (started_at);
+CREATE INDEX IF NOT EXISTS statements_fingerprint ON statements (fingerprint, started_at);
+"""
+
+# Query text kept per execution; the fingerprint keeps the shape of longer statements
+_MAX_QUERY_CHARS = 2000
+_FLUSH_INTERVAL = 1.0  # seconds between writes of buffered statements
+_PRUNE_INTERVAL = 3600.0  # seconds between removals of fingerprints without statements
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r"(?<![\w`])-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROW_LISTS = re.compile(r"\(\?, \.\.\.\)(?:\s*,\s*\(\?, \.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Frames skipped when looking for the function that issued a statement
+_WRAPPER_FUNCTIONS = {"_executing", "sqlQueryArrow", "sqlQuery", "sqlQueryAsync", "sqlQueryLatest", "_cached_metadata", "wrapper", "<lambda>"}
+_WRAPPER_MODULES = {"query_log", "tracing", "metadata_cache", "catalog_tree", "contextlib", "threading"}
+
+
+def fingerprint(query: str) -> Tuple[str, str]:
+    """
+    Returns the id and normalized text of a statement's shape.
+
+    Comments are removed, string and numeric literals become "?", lists of values
+    collapse to "(?, ...)" and whitespace and case are normalized, so that e.g. every
+    preview of a file with the same settings shares one fingerprint, whatever the file.
+    """
+    text = _COMMENTS.sub(" ", query)
+    text = _STRINGS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _VALUE_LISTS.sub("(?, ...)", text)
+    text = _WHITESPACE.sub(" ", text).strip().lower()
+    text = _ROW_LISTS.sub("(?, ...), ...", text)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16], text
+
+
+def _caller() -> Optional[str]:
+    # The innermost function outside the query helpers, e.g. "dbutils.describe_table"
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        name = frame.f_code.co_name
+        if name not in _WRAPPER_FUNCTIONS and module not in _WRAPPER_MODULES:
+            return f"{module}.{name}"
+        frame = frame.f_back
+    return None
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank percentile of an ascending list
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+class QueryLog:
+    """
+    Bounded log of SQL statements in a local SQLite database shared by the web and worker processes.
+
+    Statements are grouped by fingerprint, the normalized shape of the SQL text, so
+    that the analytics page can rank statement patterns by total warehouse time. Only
+    the newest `max_rows` executions are kept. Each call opens its own connection, so
+    the log can be used from any thread or process.
+
+    Args:
+        path (str): Path of the SQLite database file.
+        max_rows (int): Number of executions kept.
+    """
+
+    def __init__(self, path: str, max_rows: int = 100_000):
+        self.path = path
+        self.max_rows = max_rows
+        self._pruned_at = time.time()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            # WAL lets the analytics page read while statements are written
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Writes executions, as built by log_statement, and removes the oldest beyond `max_rows`.
+        """
+        if not entries:
+            return
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO fingerprints (fingerprint, kind, normalized) VALUES (?, ?, ?)",
+                    {(e["fingerprint"], e["kind"], e["normalized"]) for e in entries}
+                )
+                conn.executemany(
+                    "INSERT INTO statements (fingerprint, started_at, seconds, rows, bytes, caller, session_id, statement_id, error, query) "
+                    "VALUES (:fingerprint, :started_at, :seconds, :rows, :bytes, :caller, :session_id, :statement_id, :error, :query)",
+                    entries
+                )
+                conn.execute("DELETE FROM statements WHERE id <= (SELECT MAX(id) FROM statements) - ?", (self.max_rows,))
+                if time.time() - self._pruned_at > _PRUNE_INTERVAL:
+                    self._pruned_at = time.time()
+                    conn.execute("DELETE FROM fingerprints WHERE fingerprint NOT IN (SELECT fingerprint FROM statements)")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def top_fingerprints(self, since: float, order_by: str = "total_seconds", limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Returns statement patterns that ran since `since`, ranked by `order_by`.
+
+        Args:
+            order_by (str): "total_seconds", "count" or "p95_seconds".
+
+        Returns:
+            List[Dict]: fingerprint, kind, normalized, count, errors, total/mean/p50/p95/p99
+                seconds, rows, bytes and last_at per fingerprint.
+        """
+        with self._connect() as conn:
+            groups = {
+                row["fingerprint"]: dict(row)
+                for row in conn.execute(
+                    "SELECT s.fingerprint, f.kind, f.normalized, COUNT(*) AS count, COUNT(s.error) AS errors, "
+                    "SUM(s.seconds) AS total_seconds, SUM(s.rows) AS rows, SUM(s.bytes) AS bytes, MAX(s.started_at) AS last_at "
+                    "FROM statements s JOIN fingerprints f ON f.fingerprint = s.fingerprint "
+                    "WHERE s.started_at >= ? GROUP BY s.fingerprint",
+                    (since,)
+                )
+            }
+            durations: Dict[str, List[float]] = {}
+            for row in conn.execute(
+                "SELECT fingerprint, seconds FROM statements WHERE started_at >= ? ORDER BY fingerprint, seconds",
+                (since,)
+            ):
+                durations.setdefault(row["fingerprint"], []).append(row["seconds"])
+
+        for key, group in groups.items():
+            values = durations.get(key) or [0.0]
+            group.update(
+                mean_seconds=group["total_seconds"] / group["count"],
+                p50_seconds=_percentile(values, 0.5),
+                p95_seconds=_percentile(values, 0.95),
+                p99_seconds=_percentile(values, 0.99),
+            )
+        return sorted(groups.values(), key=lambda group: group[order_by], reverse=True)[:limit]
+
+    def recent(self, fingerprint_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Returns the newest executions of a statement pattern, newest first.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM statements WHERE fingerprint = ? ORDER BY started_at DESC LIMIT ?",
+                (fingerprint_id, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_query_log() -> QueryLog:
+    """
+    Returns the query log of this process.
+    """
+    return QueryLog(QUERY_LOG_PATH, max_rows=QUERY_LOG_MAX_ROWS)
+
+
+_pending: List[Dict[str, Any]] = []
+_pending_lock = threading.Lock()
+_writer_started = False
+_write_eagerly = False
+
+
+def _reset_after_fork() -> None:
+    # A forked child ends with os._exit, which skips atexit handlers, so it writes every statement
+    global _pending, _pending_lock, _writer_started, _write_eagerly
+    _pending = []
+    _pending_lock = threading.Lock()
+    _writer_started = False
+    _write_eagerly = True
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def flush_statements() -> None:
+    """
+    Writes the statements buffered by log_statement.
+    """
+    global _pending
+    with _pending_lock:
+        entries, _pending = _pending, []
+    try:
+        get_query_log().record(entries)
+    except Exception as e:
+        print(f"Error writing the query log: {str(e)}")
+
+atexit.register(flush_statements)
+
+
+def log_statement(
+    query: str,
+    kind: str,
+    started_at: float,
+    seconds: float,
+    rows: Optional[int] = None,
+    nbytes: Optional[int] = None,
+    statement_id: Optional[str] = None,
+    error: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> None:
+    """
+    Buffers one execution of a statement for the query log, with the function that issued it.
+
+    Executions are written by a background thread about once a second, so logging adds
+    no SQLite write to the statement's own latency.
+    """
+    global _writer_started
+    if not QUERY_LOG_ENABLED:
+        return
+    fingerprint_id, normalized = fingerprint(query)
+    entry = {
+        "fingerprint": fingerprint_id,
+        "kind": kind,
+        "normalized": normalized,
+        "started_at": started_at,
+        "seconds": seconds,
+        "rows": rows,
+        "bytes": nbytes,
+        "caller": _caller(),
+        "session_id": session_id,
+        "statement_id": str(statement_id) if statement_id is not None else None,
+        "error": error[:1000] if error else None,
+        "query": query.strip()[:_MAX_QUERY_CHARS],
+    }
+    with _pending_lock:
+        _pending.append(entry)
+        start_writer = not _writer_started and not _write_eagerly
+        _writer_started = _writer_started or start_writer
+    if _write_eagerly:
+        flush_statements()
+    elif start_writer:
+        def run():
+            while True:
+                time.sleep(_FLUSH_INTERVAL)
+                flush_statements()
+
+        threading.Thread(target=run, name="query-log-writer", daemon=True).start()
@@ -0,0 +1,212 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+from compressed_files import compression_of, count_lines
+from metrics import increment, observe
+from tracing import current_span, traced
+
+
+@dataclass
+class UploadStats:
+    """Size, digest and line count of a decoded upload."""
+    size: int
+    sha256: str
+    line_count: int
+
+
+def decoded_size(encoded_content: str) -> int:
+    """
+    Returns the exact number of bytes a base64 data URL decodes to, without decoding it.
+    """
+    start = encoded_content.find(",") + 1
+    length = len(encoded_content) - start
+    padding = 0
+    if length and encoded_content.endswith("=="):
+        padding = 2
+    elif length and encoded_content.endswith("="):
+        padding = 1
+    return (length // 4) * 3 - padding
+
+
+@traced()
+def decode_to_file(encoded_content: str, local_path: str, max_size: int, chunk_size: int = 1024 * 1024, on_progress: Optional[Callable[[int], None]] = None) -> UploadStats:
+    """
+    Decodes a base64 data URL (as produced by dcc.Upload) into a file chunk by chunk.
+
+    Only one chunk of encoded and decoded data is held in memory at a time. The size,
+    SHA-256 digest and line count are computed in the same pass, and decoding stops
+    as soon as the size limit is exceeded. Lines of gzip and zstd files are counted
+    in their decompressed content, in a second pass.
+
+    Args:
+        encoded_content (str): The "data:<mime>;base64,<data>" string.
+        local_path (str): Path of the file to write.
+        max_size (int): Maximum decoded size in bytes.
+        chunk_size (int): Approximate number of decoded bytes per chunk.
+        on_progress (Optional[Callable]): Called with the number of bytes decoded so far after each chunk.
+
+    Returns:
+        UploadStats: Size, hex SHA-256 digest and number of lines of the decoded content.
+    """
+    start = encoded_content.find(",") + 1
+    if start == 0:
+        raise ValueError("Invalid upload: expected a base64 data URL")
+
+    # The final size is known up front, so oversized files are rejected before any work
+    if decoded_size(encoded_content) > max_size:
+        raise ValueError(f"File size exceeds maximum limit of {max_size/1024/1024}MB")
+
+    # Base64 decodes in groups of 4 characters into 3 bytes
+    started = time.perf_counter()
+    step = max(4, (chunk_size // 3) * 4)
+    digest = hashlib.sha256()
+    size = 0
+    newlines = 0
+    last_byte = b""
+
+    with open(local_path, "wb") as f:
+        for offset in range(start, len(encoded_content), step):
+            try:
+                chunk = base64.b64decode(encoded_content[offset:offset + step])
+            except binascii.Error as e:
+                raise ValueError(f"Invalid upload: {str(e)}")
+
+            size += len(chunk)
+            if size > max_size:
+                raise ValueError(f"File size exceeds maximum limit of {max_size/1024/1024}MB")
+
+            digest.update(chunk)
+            newlines += chunk.count(b"\n")
+            if chunk:
+                last_byte = chunk[-1:]
+            f.write(chunk)
+            if on_progress is not None:
+                on_progress(size)
+
+    # A final line without a trailing newline still counts
+    line_count = newlines + (1 if size and last_byte != b"\n" else 0)
+    if compression_of(local_path) in ("gzip", "zstd"):
+        line_count = count_lines(local_path, chunk_size=chunk_size)
+
+    observe("upload_decode_seconds", time.perf_counter() - started)
+    observe("upload_size_bytes", size, source="data_url")
+    increment("upload_bytes_total", size, source="data_url")
+    current_span().set_attributes(**{"file.bytes": size, "file.lines": line_count})
+    return UploadStats(size=size, sha256=digest.hexdigest(), line_count=line_count)
+
+
+def file_stats(local_path: str, chunk_size: int = 1024 * 1024, file_name: Optional[str] = None) -> UploadStats:
+    """
+    Computes size, SHA-256 and line count of a local file in one streaming pass.
+
+    Lines of gzip and zstd files, by the extension of `file_name` or else `local_path`,
+    are counted in their decompressed content.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    newlines = 0
+    last_byte = b""
+    with open(local_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            size += len(chunk)
+            digest.update(chunk)
+            newlines += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+    line_count = newlines + (1 if size and last_byte != b"\n" else 0)
+    if compression_of(file_name or local_path) in ("gzip", "zstd"):
+        line_count = count_lines(local_path, file_name, chunk_size)
+    return UploadStats(size=size, sha256=digest.hexdigest(), line_count=line_count)
+
+
+def _staged_path(staging_dir: str, file_name: str) -> str:
+    return os.path.join(staging_dir, os.path.basename(file_name))
+
+
+def keep_staged_file(local_path: str, staging_dir: str, file_name: str, stats: UploadStats, max_bytes: int, pinned: bool = False) -> str:
+    """
+    Moves an uploaded file into the local staging directory so it can be previewed without the warehouse.
+
+    The stats are stored in a JSON sidecar next to the file. Least recently used staged
+    files are removed once the directory grows beyond `max_bytes`, except pinned files:
+    those are the only copy of an upload that has not been put to the volume yet.
+
+    Returns:
+        str: Path of the staged file.
+    """
+    os.makedirs(staging_dir, exist_ok=True)
+    staged_path = _staged_path(staging_dir, file_name)
+    os.replace(local_path, staged_path)
+    with open(staged_path + ".json", "w") as f:
+        json.dump(asdict(stats), f)
+    pin_staged_file(staging_dir, file_name, pinned)
+    _enforce_staging_budget(staging_dir, max_bytes, keep=staged_path)
+    return staged_path
+
+
+def staged_file_path(staging_dir: str, file_name: str) -> Optional[str]:
+    """
+    Returns the path of the local copy of a volume file, or None if it is not staged locally.
+    """
+    staged_path = _staged_path(staging_dir, file_name)
+    if not os.path.isfile(staged_path):
+        return None
+    # Mark as recently used for the eviction order
+    os.utime(staged_path)
+    return staged_path
+
+
+def staged_file_stats(staging_dir: str, file_name: str) -> Optional[UploadStats]:
+    """
+    Returns the stats recorded when the file was staged, or None if it is not staged locally.
+    """
+    try:
+        with open(_staged_path(staging_dir, file_name) + ".json") as f:
+            return UploadStats(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def pin_staged_file(staging_dir: str, file_name: str, pinned: bool = True) -> None:
+    """
+    Protects a staged file from eviction, or releases it again.
+    """
+    marker = _staged_path(staging_dir, file_name) + ".pinned"
+    if pinned:
+        open(marker, "w").close()
+    elif os.path.exists(marker):
+        os.remove(marker)
+
+
+def staged_file_pinned(staging_dir: str, file_name: str) -> bool:
+    """
+    Returns True if a staged file is pinned, i.e. it has not been put to the volume yet.
+    """
+    return os.path.exists(_staged_path(staging_dir, file_name) + ".pinned")
+
+
+def _enforce_staging_budget(staging_dir: str, max_bytes: int, keep: Optional[str] = None) -> None:
+    files = []
+    for name in os.listdir(staging_dir):
+        path = os.path.join(staging_dir, name)
+        if name.endswith((".json", ".pinned")) or not os.path.isfile(path) or os.path.exists(path + ".pinned"):
+            continue
+        stat = os.stat(path)
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        for stale in (path, path + ".json"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        total -= size
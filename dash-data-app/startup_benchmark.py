@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter per cold start; times are relative to the start of the script
+_IN_PROCESS_RUN = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.server.test_client()
+status = client.get("/").status_code
+first_response = time.perf_counter()
+client.get("/_dash-layout")
+client.get("/_dash-dependencies")
+page_ready = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "import_app": imported - started,
+    "first_response": first_response - imported,
+    "layout_and_dependencies": page_ready - first_response,
+}))
+"""
+
+# Modules that must not be imported before the first request; they load on first use
+DEFERRED_MODULES = ("pandas", "databricks.sql", "databricks.sql.client", "databricks.sdk")
+
+_DEFERRED_RUN = """
+import json, sys
+import app
+print(json.dumps([name for name in sys.argv[1:] if name in sys.modules]))
+"""
+
+_SERVER_RUN = """
+import sys
+import app
+app.app.run(debug=False, port=int(sys.argv[1]))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_in_process() -> Dict[str, float]:
+    """
+    Starts a fresh interpreter that imports the app and serves its first requests through the WSGI test client.
+    """
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", _IN_PROCESS_RUN],
+        cwd=_APP_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    total = time.perf_counter() - started
+    result = json.loads(output.strip().splitlines()[-1])
+    result["total"] = total
+    return result
+
+
+def measure_server(timeout: float = 120.0) -> Dict[str, float]:
+    """
+    Starts the Flask server in a fresh interpreter and polls it until GET / answers.
+    """
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _SERVER_RUN, str(port)],
+        cwd=_APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"No response within {timeout}s")
+            if process.poll() is not None:
+                raise RuntimeError(f"The server exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    return {"status": response.status, "total": time.perf_counter() - started}
+            except OSError:
+                time.sleep(0.02)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def eagerly_imported() -> List[str]:
+    """
+    Returns the DEFERRED_MODULES that `import app` loads, without the prewarm thread.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _DEFERRED_RUN, *DEFERRED_MODULES],
+        cwd=_APP_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "STARTUP_PREWARM": "false"}
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(limit: int = 15) -> List[str]:
+    """
+    Returns the modules with the largest cumulative import time, from python -X importtime.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=_APP_DIR, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in output.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    return [f"{micros / 1e6:8.3f}s {name}" for micros, name in rows[:limit]]
+
+
+def _summary(name: str, values: List[float]) -> str:
+    return f"{name:<26} median {statistics.median(values):6.3f}s  min {min(values):6.3f}s  max {max(values):6.3f}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures cold-start import time and time to first response.")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts to measure")
+    parser.add_argument("--server", action="store_true", help="also time a real server until GET / answers")
+    parser.add_argument("--imports", type=int, default=15, help="slowest imports to list; 0 to skip")
+    args = parser.parse_args()
+
+    runs = [measure_in_process() for _ in range(args.runs)]
+    print(f"Cold starts through the test client ({args.runs} runs):")
+    for key in ("import_app", "first_response", "layout_and_dependencies", "total"):
+        print("  " + _summary(key, [run[key] for run in runs]))
+
+    if args.server:
+        servers = [measure_server() for _ in range(args.runs)]
+        print(f"Cold starts of the server until GET / answers ({args.runs} runs):")
+        print("  " + _summary("process start to response", [run["total"] for run in servers]))
+
+    eager = eagerly_imported()
+    if eager:
+        print(f"Expected to be deferred but imported by `import app`: {', '.join(eager)}")
+    else:
+        print(f"Deferred until first use: {', '.join(DEFERRED_MODULES)}")
+
+    if args.imports:
+        print("Slowest imports (cumulative):")
+        for line in slowest_imports(args.imports):
+            print("  " + line)
+
+
+if __name__ == "__main__":
+    # python startup_benchmark.py --runs 5 --server
+    main()
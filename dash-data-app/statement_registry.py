@@ -0,0 +1,69 @@
+import uuid
+from typing import Any, Hashable, Optional, Tuple
+import diskcache
+
+# Entries outlive any statement they track; they only guard against leaks if a worker dies
+_ENTRY_EXPIRY = 3600
+
+
+class StatementRegistry:
+    """
+    Tracks the latest in-flight statement per (scope, session) across processes.
+
+    Background callbacks run in separate worker processes, so the registry lives in a
+    diskcache directory shared by all of them. Each invocation claims its slot with a
+    fresh token; claiming hands back the command id of the statement it supersedes so
+    the caller can cancel it, and the superseded worker sees that its token is no
+    longer current the next time it polls.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._cache: Optional[diskcache.Cache] = None
+
+    def _get_cache(self) -> diskcache.Cache:
+        if self._cache is None:
+            self._cache = diskcache.Cache(self._directory)
+        return self._cache
+
+    def claim(self, scope: str, session_id: Hashable) -> Tuple[str, Any]:
+        """
+        Makes a new invocation the current one for (scope, session_id).
+
+        Returns:
+            Tuple[str, Any]: The new token and the command id of the superseded statement, if any.
+        """
+        cache = self._get_cache()
+        token = uuid.uuid4().hex
+        with cache.transact():
+            previous = cache.get((scope, session_id))
+            cache.set((scope, session_id), {"token": token, "command_id": None}, expire=_ENTRY_EXPIRY)
+        return token, previous["command_id"] if previous else None
+
+    def attach(self, scope: str, session_id: Hashable, token: str, command_id: Any) -> bool:
+        """
+        Records the command id of a submitted statement.
+
+        Returns False if the invocation has been superseded in the meantime.
+        """
+        cache = self._get_cache()
+        with cache.transact():
+            entry = cache.get((scope, session_id))
+            if not entry or entry["token"] != token:
+                return False
+            cache.set((scope, session_id), {"token": token, "command_id": command_id}, expire=_ENTRY_EXPIRY)
+        return True
+
+    def is_current(self, scope: str, session_id: Hashable, token: str) -> bool:
+        entry = self._get_cache().get((scope, session_id))
+        return bool(entry) and entry["token"] == token
+
+    def release(self, scope: str, session_id: Hashable, token: str) -> None:
+        """
+        Removes the entry once its statement finished, unless a newer invocation took over.
+        """
+        cache = self._get_cache()
+        with cache.transact():
+            entry = cache.get((scope, session_id))
+            if entry and entry["token"] == token:
+                cache.delete((scope, session_id))
@@ -0,0 +1,15 @@
+from csv_dialect import detect_csv_dialect
+
+
+def test_tail_sample_starting_inside_a_utf8_character(tmp_path):
+    row = "Jörg Müller,Zürich\n".encode("utf-8")
+    path = tmp_path / "names.csv"
+    path.write_bytes(b"name,city\n" + row * 200)
+    size = path.stat().st_size
+    # Start the tail on the continuation byte of the last "ü"
+    sample_size = len(row) - row.index(b"\xbc")
+    assert path.read_bytes()[size - sample_size] == 0xBC
+
+    dialect = detect_csv_dialect(str(path), sample_size=sample_size)
+    assert dialect.encoding == "utf-8"
+    assert dialect.delimiter == ","
@@ -0,0 +1,37 @@
+import pyarrow as pa
+from validation_engine import invalid_mask, validate_csv_file
+
+
+def test_bigint_range_is_checked_exactly():
+    values = pa.array([
+        "-9223372036854775808", "9223372036854775807", "9223372036854775808",
+        "-9223372036854775809", "0000000000000000000000042", "1" * 40,
+    ])
+    assert invalid_mask(values, "bigint").to_pylist() == [False, False, True, True, False, True]
+
+
+def test_int_range():
+    values = pa.array(["2147483647", "2147483648", "-2147483648", " 7 ", "1.5"])
+    assert invalid_mask(values, "int").to_pylist() == [False, True, False, False, True]
+
+
+def test_nulls_are_never_invalid():
+    assert invalid_mask(pa.array(["1", None]), "int").to_pylist() == [False, False]
+    assert invalid_mask(pa.array(["yes", None, "maybe"]), "boolean").to_pylist() == [False, False, True]
+
+
+def test_validate_csv_file_with_bigint_and_empty_cells(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,count,flag\n9223372036854775807,,true\n-1,3,\n")
+    report = validate_csv_file(str(path), {"id": "bigint", "count": "int", "flag": "boolean"})
+    assert report.ok
+    assert report.rows == 2
+    assert report.columns["count"].null_count == 1
+    assert report.columns["flag"].invalid_count == 0
+
+
+def test_dates_and_timestamps_are_parsed():
+    dates = pa.array(["2024-1-5", "2024-02-29", "2023-02-29", "2024-13-45", "2024-02-30", None])
+    assert invalid_mask(dates, "DATE").to_pylist() == [False, False, True, True, True, False]
+    timestamps = pa.array(["2024-1-5 1:02:03", "2024-01-05T01:02:03.123456789Z", "2024-01-05 25:99:99", "2024-02-30 01:00"])
+    assert invalid_mask(timestamps, "TIMESTAMP").to_pylist() == [False, False, True, True]
@@ -0,0 +1,216 @@
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from dash.exceptions import PreventUpdate
+from config import TRACING_ENABLED, TRACE_FILE, TRACE_FILE_MAX_MB
+
+_SERVICE_NAME = "dash-data-app"
+# OTLP span kinds and status codes
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+_STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+
+
+class Span:
+    """
+    One timed operation of a trace, with attributes and events.
+
+    Spans follow the OpenTelemetry data model. A span whose parent runs in this
+    process is exported together with its local root; a local root (a callback, a
+    job, or a thread without a parent) writes its whole subtree as one OTLP JSON line.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str, local_root: Optional["Span"]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._local_root = local_root
+        self._finished: List["Span"] = []
+
+    @property
+    def traceparent(self) -> str:
+        """The W3C traceparent of this span, to continue the trace in another process."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def _end(self) -> None:
+        self.end_ns = time.time_ns()
+        if self._local_root is None:
+            _export([self] + self._finished)
+        else:
+            self._local_root._finished.append(self)
+
+
+class _NoopSpan:
+    # Returned while tracing is disabled or outside of any span
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def current_span() -> Any:
+    """
+    Returns the active span, or a span that ignores attributes if there is none.
+    """
+    return _current_span.get() or _NOOP_SPAN
+
+
+def current_traceparent() -> Optional[str]:
+    """
+    Returns the W3C traceparent of the active span, or None if there is none.
+    """
+    return current_span().traceparent
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Any]:
+    """
+    Runs the block in a new span, a child of the active span or else of `traceparent`.
+
+    Exceptions mark the span as failed and are re-raised; PreventUpdate is how Dash
+    callbacks skip an update, so it does not.
+
+    Args:
+        kind (str): "internal", "server" or "client" (for statements sent to the warehouse).
+        traceparent (Optional[str]): W3C traceparent of a parent in another process,
+            e.g. of the callback that queued a job; ignored inside an active span.
+    """
+    if not TRACING_ENABLED:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    if parent is not None:
+        new_span = Span(name, parent.trace_id, parent.span_id, kind, parent._local_root or parent)
+    else:
+        parts = (traceparent or "").split("-")
+        remote = len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16
+        new_span = Span(name, parts[1] if remote else secrets.token_hex(16), parts[2] if remote else None, kind, None)
+    new_span.set_attributes(**attributes)
+
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except PreventUpdate:
+        new_span.set_attribute("dash.prevent_update", True)
+        raise
+    except BaseException as e:
+        new_span.error = f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span._end()
+
+
+def traced(name: Optional[str] = None, kind: str = "internal") -> Callable[[Callable], Callable]:
+    """
+    Decorates a function to run in a span named after it (module.function by default).
+    """
+    def decorate(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return func(*args, **kwargs)
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _attribute_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_span(s: Span) -> Dict[str, Any]:
+    otlp = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": _KINDS.get(s.kind, 1),
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": _attributes(s.attributes),
+        "events": [
+            {"timeUnixNano": str(event["time_ns"]), "name": event["name"], "attributes": _attributes(event["attributes"])}
+            for event in s.events
+        ],
+        "status": {"code": _STATUS_ERROR, "message": s.error} if s.error else {},
+    }
+    if s.parent_id:
+        otlp["parentSpanId"] = s.parent_id
+    return otlp
+
+
+def _export(spans: List[Span]) -> None:
+    """
+    Appends the spans as one OTLP JSON ExportTraceServiceRequest line to TRACE_FILE.
+
+    The file can be read by an OpenTelemetry Collector's otlpjsonfile receiver, or
+    with jq. All processes append to the same file, one write per line.
+    """
+    request = {
+        "resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": _SERVICE_NAME, "process.pid": os.getpid()})},
+            "scopeSpans": [{"scope": {"name": _SERVICE_NAME}, "spans": [_otlp_span(s) for s in spans]}],
+        }]
+    }
+    line = (json.dumps(request, separators=(",", ":")) + "\n").encode("utf-8")
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+            if os.path.exists(TRACE_FILE) and os.path.getsize(TRACE_FILE) > TRACE_FILE_MAX_MB * 1024 * 1024:
+                os.replace(TRACE_FILE, f"{TRACE_FILE}.1")
+            fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+    except Exception as e:
+        print(f"Error writing trace: {str(e)}")
@@ -0,0 +1,197 @@
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from flask import Flask, jsonify, request
+from dbutils import stage_upload
+from progress import ProgressReporter
+from metrics import increment, observe
+from staging import file_stats
+from compressed_files import INVALID_FILE_MESSAGE, is_csv_file
+from config import (
+    DATABRICKS_VOLUME_PATH,
+    CHUNKED_UPLOAD_DIR,
+    CHUNKED_UPLOAD_CHUNK_SIZE,
+    CHUNKED_UPLOAD_MAX_SIZE_MB,
+    CHUNKED_UPLOAD_EXPIRY
+)
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _upload_dir(upload_id: str) -> str:
+    if not _UPLOAD_ID.match(upload_id):
+        raise ValueError("Invalid upload id")
+    return os.path.join(CHUNKED_UPLOAD_DIR, upload_id)
+
+
+def _load_meta(upload_id: str):
+    """
+    Returns the metadata of an upload, or None if it does not exist.
+    """
+    try:
+        with open(os.path.join(_upload_dir(upload_id), "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _received_chunks(upload_id: str):
+    """
+    Returns the sorted indices of chunks that have been fully written.
+    """
+    chunk_dir = os.path.join(_upload_dir(upload_id), "chunks")
+    return sorted(int(name) for name in os.listdir(chunk_dir) if name.isdigit())
+
+
+def _status(upload_id: str, meta: dict) -> dict:
+    received = _received_chunks(upload_id)
+    return {
+        "upload_id": upload_id,
+        "filename": meta["filename"],
+        "size": meta["size"],
+        "chunk_size": meta["chunk_size"],
+        "chunk_count": meta["chunk_count"],
+        "received": received,
+        "complete": len(received) == meta["chunk_count"],
+    }
+
+
+def _purge_expired_uploads() -> None:
+    """
+    Removes partial uploads that have not been touched for CHUNKED_UPLOAD_EXPIRY seconds.
+    """
+    if not os.path.isdir(CHUNKED_UPLOAD_DIR):
+        return
+    cutoff = time.time() - CHUNKED_UPLOAD_EXPIRY
+    for name in os.listdir(CHUNKED_UPLOAD_DIR):
+        path = os.path.join(CHUNKED_UPLOAD_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            continue
+
+
+def register_upload_routes(server: Flask) -> None:
+    """
+    Registers the resumable chunked upload API on the Flask server underlying the Dash app.
+
+    Protocol:
+        POST   /api/uploads                       {"filename", "size"} -> upload status
+        GET    /api/uploads/<id>                  -> upload status, including received chunk indices
+        PUT    /api/uploads/<id>/chunks?offset=N  raw chunk bytes, N a multiple of chunk_size
+        POST   /api/uploads/<id>/complete         -> {"file_path"} once the file is PUT to the volume
+        DELETE /api/uploads/<id>                  -> abort and discard the upload
+    """
+
+    @server.route("/api/uploads", methods=["POST"])
+    def create_upload():
+        body = request.get_json(silent=True) or {}
+        filename = os.path.basename(str(body.get("filename") or ""))
+        size = body.get("size")
+
+        if not is_csv_file(filename):
+            return jsonify(error=INVALID_FILE_MESSAGE), 400
+        if not isinstance(size, int) or size <= 0:
+            return jsonify(error="File size must be a positive integer."), 400
+        if size > CHUNKED_UPLOAD_MAX_SIZE_MB * 1024 * 1024:
+            return jsonify(error=f"File too large. Maximum size is {CHUNKED_UPLOAD_MAX_SIZE_MB}MB."), 413
+
+        _purge_expired_uploads()
+
+        upload_id = uuid.uuid4().hex
+        upload_dir = _upload_dir(upload_id)
+        os.makedirs(os.path.join(upload_dir, "chunks"))
+
+        # Pre-size the data file so chunks can be written at their offsets in any order
+        with open(os.path.join(upload_dir, "data"), "wb") as f:
+            f.truncate(size)
+
+        meta = {
+            "filename": filename,
+            "size": size,
+            "chunk_size": CHUNKED_UPLOAD_CHUNK_SIZE,
+            "chunk_count": -(-size // CHUNKED_UPLOAD_CHUNK_SIZE),
+            "created_at": time.time(),
+        }
+        with open(os.path.join(upload_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        return jsonify(_status(upload_id, meta)), 201
+
+    @server.route("/api/uploads/<upload_id>", methods=["GET"])
+    def get_upload(upload_id):
+        meta = _load_meta(upload_id)
+        if meta is None:
+            return jsonify(error="Upload not found."), 404
+        return jsonify(_status(upload_id, meta))
+
+    @server.route("/api/uploads/<upload_id>/chunks", methods=["PUT"])
+    def put_chunk(upload_id):
+        meta = _load_meta(upload_id)
+        if meta is None:
+            return jsonify(error="Upload not found."), 404
+
+        offset = request.args.get("offset", type=int)
+        chunk_size = meta["chunk_size"]
+        if offset is None or offset < 0 or offset >= meta["size"] or offset % chunk_size:
+            return jsonify(error=f"Offset must be a multiple of {chunk_size} below {meta['size']}."), 400
+
+        expected = min(chunk_size, meta["size"] - offset)
+        upload_dir = _upload_dir(upload_id)
+        written = 0
+        with open(os.path.join(upload_dir, "data"), "r+b") as f:
+            f.seek(offset)
+            while written < expected:
+                block = request.stream.read(min(_COPY_BUFFER_SIZE, expected - written))
+                if not block:
+                    break
+                f.write(block)
+                written += len(block)
+
+        if written != expected or request.stream.read(1):
+            return jsonify(error=f"Expected {expected} bytes at offset {offset}."), 400
+
+        # Mark the chunk as received only once it has been written completely
+        index = offset // chunk_size
+        open(os.path.join(upload_dir, "chunks", str(index)), "w").close()
+        os.utime(upload_dir)
+        increment("upload_bytes_total", written, source="chunked")
+        return jsonify(index=index, received=written)
+
+    @server.route("/api/uploads/<upload_id>/complete", methods=["POST"])
+    def complete_upload(upload_id):
+        meta = _load_meta(upload_id)
+        if meta is None:
+            return jsonify(error="Upload not found."), 404
+
+        status = _status(upload_id, meta)
+        if not status["complete"]:
+            missing = sorted(set(range(meta["chunk_count"])) - set(status["received"]))
+            return jsonify(error="Upload is incomplete.", missing=missing[:100]), 409
+
+        upload_dir = _upload_dir(upload_id)
+        data_path = os.path.join(upload_dir, "data")
+        # Polled by the client at /api/progress/<upload_id> while this request runs
+        progress = ProgressReporter(upload_id, [("put", "Uploading to the volume")], totals={"put": meta["size"]})
+        try:
+            file_path = stage_upload(data_path, DATABRICKS_VOLUME_PATH, meta["filename"], file_stats(data_path, file_name=meta["filename"]), progress=progress)
+        except Exception as e:
+            print(f"Error completing chunked upload {upload_id}: {str(e)}")
+            progress.fail("put", str(e))
+            return jsonify(error=f"Failed to upload file to volume: {str(e)}"), 502
+
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        observe("upload_size_bytes", meta["size"], source="chunked")
+        return jsonify(file_path=file_path, filename=meta["filename"], size=meta["size"])
+
+    @server.route("/api/uploads/<upload_id>", methods=["DELETE"])
+    def delete_upload(upload_id):
+        if _load_meta(upload_id) is None:
+            return jsonify(error="Upload not found."), 404
+        shutil.rmtree(_upload_dir(upload_id), ignore_errors=True)
+        return "", 204
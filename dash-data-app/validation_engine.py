@@ -0,0 +1,331 @@
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from tracing import current_span, traced
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Value sets and patterns mirror what the warehouse accepts when casting STRING columns
+BOOLEAN_VALUES = ["true", "false", "1", "0", "yes", "no", "t", "f", "y", "n"]
+INTEGER_PATTERN = r"^[+-]?\d+$"
+FLOAT_PATTERN = r"^([+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|(?i:[+-]?(nan|inf|infinity)))$"
+# Date and timestamp patterns apply to values after normalize_datetime
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+TIMESTAMP_PATTERN = (
+    r"^\d{4}-\d{2}-\d{2}"
+    r"([ T]([01]\d|2[0-3]):[0-5]\d(:[0-5]\d(\.\d{1,6})?)?"
+    r"(Z|[+-]([01]\d|2[0-3]):?[0-5]\d)?)?$"
+)
+OFFSET_PATTERN = r"(Z|[+-]\d{2}:?\d{2})$"
+INTEGER_RANGES = {
+    "TINYINT": (-2**7, 2**7 - 1),
+    "SMALLINT": (-2**15, 2**15 - 1),
+    "INT": (-2**31, 2**31 - 1),
+    "INTEGER": (-2**31, 2**31 - 1),
+    "BIGINT": (-2**63, 2**63 - 1),
+}
+_INTEGER_DECIMAL = pa.decimal128(38, 0)
+MAX_INVALID_SAMPLES = 3
+
+
+@dataclass
+class ColumnReport:
+    """Validation counts for one column of the file."""
+    name: str
+    expected_type: str
+    invalid_count: int = 0
+    null_count: int = 0
+    not_null_violations: int = 0
+    invalid_samples: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    """Result of validating a whole file against a table schema."""
+    rows: int = 0
+    missing_columns: List[str] = field(default_factory=list)
+    extra_columns: List[str] = field(default_factory=list)
+    columns: Dict[str, ColumnReport] = field(default_factory=dict)
+    rescued_rows: int = 0
+    mode: str = "local"
+
+    @property
+    def ok(self) -> bool:
+        return not (
+            self.missing_columns
+            or self.extra_columns
+            or self.rescued_rows
+            or any(col.invalid_count or col.not_null_violations for col in self.columns.values())
+        )
+
+
+def table_columns(schema_df: "pd.DataFrame") -> Dict[str, str]:
+    """
+    Returns {column name: data type} from a DESCRIBE TABLE result, without the partition section.
+    """
+    columns = {}
+    for row in schema_df.to_dict("records"):
+        name = row["col_name"]
+        if not name or str(name).startswith("#"):
+            break
+        columns[name] = row["data_type"]
+    return columns
+
+
+def base_type(data_type: str) -> str:
+    """
+    Returns the upper-case type name without parameters, e.g. "decimal(10,2)" -> "DECIMAL".
+    """
+    match = re.match(r"\s*([A-Za-z_]+)", data_type or "")
+    return match.group(1).upper() if match else ""
+
+
+def _decimal_pattern(data_type: str) -> str:
+    match = re.search(r"\((\d+)\s*,\s*(\d+)\)", data_type)
+    precision, scale = (int(match.group(1)), int(match.group(2))) if match else (10, 0)
+    integer_digits = precision - scale
+    if integer_digits <= 0:
+        return r"^[+-]?0*(\.\d*)?$"
+    return rf"^[+-]?0*(\d{{1,{integer_digits}}}(\.\d*)?|\.\d+)$"
+
+
+def normalize_datetime(values: pa.Array) -> pa.Array:
+    """
+    Rewrites trimmed date and timestamp strings into the ISO 8601 form Arrow casts from.
+
+    The warehouse accepts one-digit months, days and hours and up to nine fractional
+    digits; they are zero-padded and truncated to microseconds.
+    """
+    values = pc.replace_substring_regex(values, r"^(\d{4})-(\d)-", r"\1-0\2-")
+    values = pc.replace_substring_regex(values, r"^(\d{4}-\d{2})-(\d)(\D|$)", r"\1-0\2\3")
+    values = pc.replace_substring_regex(values, r"^(\d{4}-\d{2}-\d{2}[ T])(\d):", r"\10\2:")
+    return pc.replace_substring_regex(values, r"(:\d{2}\.\d{6})\d{1,3}", r"\1")
+
+
+def _valid_dates(values: pa.Array) -> pa.Array:
+    """
+    Returns whether the leading YYYY-MM-DD of each value is a calendar date.
+    """
+    dates = pc.utf8_slice_codeunits(values, 0, 10)
+    # strptime rolls invalid days over (2024-02-30 becomes 2024-03-01), so compare the round trip
+    parsed = pc.strptime(dates, format="%Y-%m-%d", unit="s", error_is_null=True)
+    return pc.fill_null(pc.equal(pc.strftime(parsed, format="%Y-%m-%d"), dates), False)
+
+
+def invalid_mask(values: pa.Array, data_type: str) -> Optional[pa.Array]:
+    """
+    Returns a boolean array marking non-null values that cannot be cast to `data_type`.
+
+    Returns None for types that accept any string (STRING, complex types, ...).
+    """
+    kind = base_type(data_type)
+    trimmed = pc.utf8_trim_whitespace(values)
+
+    if kind in INTEGER_RANGES:
+        # Without leading zeros, a value in range of any integer type has at most 19 digits
+        digits = pc.replace_substring_regex(trimmed, r"^([+-]?)0+(\d)", r"\1\2")
+        valid = pc.and_(
+            pc.match_substring_regex(digits, INTEGER_PATTERN),
+            pc.less_equal(pc.utf8_length(digits), 20)
+        )
+        # Range check on exact decimals; float64 cannot represent the BIGINT bounds
+        numbers = pc.cast(pc.if_else(valid, digits, pa.scalar(None, pa.string())), _INTEGER_DECIMAL)
+        low, high = INTEGER_RANGES[kind]
+        in_range = pc.and_(
+            pc.greater_equal(numbers, pa.scalar(low, _INTEGER_DECIMAL)),
+            pc.less_equal(numbers, pa.scalar(high, _INTEGER_DECIMAL))
+        )
+        valid = pc.and_kleene(valid, pc.fill_null(in_range, False))
+    elif kind in ("FLOAT", "DOUBLE", "REAL"):
+        valid = pc.match_substring_regex(trimmed, FLOAT_PATTERN)
+    elif kind in ("DECIMAL", "DEC", "NUMERIC"):
+        valid = pc.match_substring_regex(trimmed, _decimal_pattern(data_type))
+    elif kind == "BOOLEAN":
+        valid = pc.is_in(pc.utf8_lower(trimmed), value_set=pa.array(BOOLEAN_VALUES))
+    elif kind in ("DATE", "TIMESTAMP", "TIMESTAMP_NTZ", "TIMESTAMP_LTZ"):
+        normalized = normalize_datetime(trimmed)
+        pattern = DATE_PATTERN if kind == "DATE" else TIMESTAMP_PATTERN
+        valid = pc.and_(pc.match_substring_regex(normalized, pattern), _valid_dates(normalized))
+    else:
+        return None
+
+    # Nulls are counted separately and never reported as invalid
+    return pc.fill_null(pc.and_kleene(pc.invert(valid), pc.is_valid(values)), False)
+
+
+# Types whose values are checked with try_cast by the push-down validation
+PUSHDOWN_TYPES = set(INTEGER_RANGES) | {
+    "FLOAT", "DOUBLE", "REAL", "DECIMAL", "DEC", "NUMERIC",
+    "BOOLEAN", "DATE", "TIMESTAMP", "TIMESTAMP_NTZ", "TIMESTAMP_LTZ"
+}
+
+
+def quote_identifier(name: str) -> str:
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def build_pushdown_query(source: str, file_columns: List[str], expected_columns: Dict[str, str], header: bool = True) -> str:
+    """
+    Builds one aggregate statement that validates a whole file inside the warehouse.
+
+    For every column present in both the file and the table it counts nulls and, for
+    typed columns, values that are not NULL but fail `try_cast` to the table type.
+
+    Args:
+        source (str): A FROM-clause source reading the file with every column as STRING.
+        file_columns (List[str]): Column names as exposed by `source`, in file order.
+        expected_columns (Dict[str, str]): Column name -> data type of the table.
+        header (bool): Whether the file has a header; without one, _c0, _c1, ... are
+            matched against col_0, col_1, ... as in the file preview.
+
+    Returns:
+        str: The SQL statement; its single result row is read by parse_pushdown_result.
+    """
+    aggregates = ["count(*) AS `__rows`"]
+    if "_rescued_data" in file_columns:
+        aggregates.append("count_if(_rescued_data IS NOT NULL) AS `__rescued`")
+
+    for i, (source_name, name) in enumerate(_pushdown_columns(file_columns, expected_columns, header)):
+        column = quote_identifier(source_name)
+        aggregates.append(f"count_if({column} IS NULL) AS `c{i}_nulls`")
+        data_type = expected_columns[name]
+        if base_type(data_type) in PUSHDOWN_TYPES:
+            aggregates.append(
+                f"count_if(try_cast({column} AS {data_type}) IS NULL AND {column} IS NOT NULL) AS `c{i}_invalid`"
+            )
+
+    return "SELECT\n    " + ",\n    ".join(aggregates) + f"\nFROM {source}"
+
+
+def parse_pushdown_result(
+    result: "pd.DataFrame",
+    file_columns: List[str],
+    expected_columns: Dict[str, str],
+    not_null_columns: Optional[Set[str]] = None,
+    header: bool = True,
+) -> ValidationReport:
+    """
+    Turns the summary row of build_pushdown_query into a ValidationReport.
+    """
+    not_null_columns = not_null_columns or set()
+    row = result.iloc[0]
+    names = [name for _, name in _pushdown_columns(file_columns, None, header)]
+
+    report = ValidationReport(
+        rows=int(row["__rows"]),
+        rescued_rows=int(row["__rescued"]) if "__rescued" in result.columns else 0,
+        missing_columns=[col for col in expected_columns if col not in names],
+        extra_columns=[col for col in names if col not in expected_columns],
+        mode="warehouse",
+    )
+    for i, (_, name) in enumerate(_pushdown_columns(file_columns, expected_columns, header)):
+        nulls = int(row[f"c{i}_nulls"])
+        report.columns[name] = ColumnReport(
+            name=name,
+            expected_type=expected_columns[name],
+            invalid_count=int(row[f"c{i}_invalid"]) if f"c{i}_invalid" in result.columns else 0,
+            null_count=nulls,
+            not_null_violations=nulls if name in not_null_columns else 0,
+        )
+    return report
+
+
+def _pushdown_columns(file_columns: List[str], expected_columns: Optional[Dict[str, str]], header: bool):
+    """
+    Yields (source column, report column) pairs, restricted to the expected columns if given.
+    """
+    for source_name in file_columns:
+        if source_name == "_rescued_data":
+            continue
+        name = source_name if header else re.sub(r"^_c(\d+)$", r"col_\1", source_name)
+        if expected_columns is None or name in expected_columns:
+            yield source_name, name
+
+
+def _column_names(local_path: str, read_options, parse_options) -> List[str]:
+    with pa_csv.open_csv(local_path, read_options=read_options, parse_options=parse_options) as reader:
+        return reader.schema.names
+
+
+@traced()
+def validate_csv_file(
+    local_path: str,
+    expected_columns: Dict[str, str],
+    not_null_columns: Optional[Set[str]] = None,
+    delimiter: str = ",",
+    quote_char: str = '"',
+    header: bool = True,
+    encoding: str = "utf-8",
+    block_size: int = 8 * 1024 * 1024,
+) -> ValidationReport:
+    """
+    Validates every row of a local CSV file against the target table's column types.
+
+    The file is streamed in Arrow record batches of roughly `block_size` bytes with
+    every column read as a string, and each batch is checked with vectorized compute
+    kernels, so memory stays bounded by the block size regardless of the file size.
+
+    Args:
+        local_path (str): Path of the CSV file.
+        expected_columns (Dict[str, str]): Column name -> data type, as returned by table_columns.
+        not_null_columns (Optional[Set[str]]): Columns declared NOT NULL in the table.
+        delimiter (str): Column delimiter.
+        quote_char (str): Quote character; empty to disable quoting.
+        header (bool): Whether the first row contains column names.
+        encoding (str): File encoding.
+        block_size (int): Approximate bytes per record batch.
+
+    Returns:
+        ValidationReport: Row count, column mismatches and per-column error counts.
+    """
+    not_null_columns = not_null_columns or set()
+    read_options = pa_csv.ReadOptions(encoding=encoding, autogenerate_column_names=not header, block_size=block_size)
+    parse_options = pa_csv.ParseOptions(delimiter=delimiter, quote_char=quote_char or False)
+
+    raw_names = _column_names(local_path, read_options, parse_options)
+    names = [str(name).strip() for name in raw_names]
+    if not header:
+        names = [f"col_{i}" for i in range(len(names))]
+
+    report = ValidationReport(
+        missing_columns=[col for col in expected_columns if col not in names],
+        extra_columns=[col for col in names if col not in expected_columns],
+    )
+    checked = {
+        i: name for i, name in enumerate(names)
+        if name in expected_columns
+    }
+    for name in checked.values():
+        report.columns[name] = ColumnReport(name=name, expected_type=expected_columns[name])
+
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in raw_names},
+        null_values=[""],
+        strings_can_be_null=True,
+    )
+    with pa_csv.open_csv(local_path, read_options, parse_options, convert_options) as reader:
+        for batch in reader:
+            report.rows += batch.num_rows
+            for i, name in checked.items():
+                values = batch.column(i)
+                column = report.columns[name]
+                column.null_count += values.null_count
+                if name in not_null_columns:
+                    column.not_null_violations += values.null_count
+
+                invalid = invalid_mask(values, column.expected_type)
+                if invalid is None:
+                    continue
+                invalid_count = pc.sum(invalid).as_py() or 0
+                if invalid_count:
+                    column.invalid_count += invalid_count
+                    if len(column.invalid_samples) < MAX_INVALID_SAMPLES:
+                        samples = pc.filter(values, invalid).slice(0, MAX_INVALID_SAMPLES).to_pylist()
+                        column.invalid_samples.extend(samples[:MAX_INVALID_SAMPLES - len(column.invalid_samples)])
+
+    current_span().set_attributes(rows=report.rows, ok=report.ok)
+    return report